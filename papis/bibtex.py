@@ -8,6 +8,7 @@ the `manual`_).
 from __future__ import annotations
 
 import os
+import re
 import string
 from functools import cache
 from typing import TYPE_CHECKING, Any
@@ -16,6 +17,8 @@ import papis.config
 import papis.logging
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
     from papis.document import Document, DocumentLike, KeyConversionPair
     from papis.strings import AnyString
 
@@ -296,6 +299,22 @@ ref_allowed_characters = r"([^a-zA-Z0-9._:]+|(?<!\\)[._:])"
 bibtex_verbatim_fields = frozenset({"doi", "eprint", "file", "pdf", "url", "urlraw"})
 
 
+#: Number of entries that are parsed together when reading BibTeX files. For
+#: large files, these chunks are parsed in parallel (see
+#: :func:`papis.utils.parmap_iter`).
+BIBTEX_READ_CHUNK_SIZE = 500
+
+_BIBTEX_DELIMITER_RE = re.compile(r"[@{}()\"]")
+_BIBTEX_BLOCK_TYPE_RE = re.compile(r"@\s*(\w+)")
+
+_LATEX_COMMENT_RE = re.compile(r"(?<!\\)%.*")
+_LATEX_COMMAND_RE = re.compile(
+    r"\\(?P<name>[A-Za-z]*[Cc]ite[A-Za-z]*|input|include|subfile)(?![A-Za-z])\*?"
+    r"(?P<args>(?:\s*(?:\[[^\]]*\]|\([^)]*\)|\{[^}]*\}))*)"
+    r"(?:[ \t]+(?P<path>[^\s{}\\%]+))?")
+_LATEX_ARG_RE = re.compile(r"\[[^\]]*\]|\([^)]*\)|\{(?P<arg>[^}]*)\}")
+
+
 @cache
 def _get_bibtexparser_key_conversion() -> list[KeyConversionPair]:
     from bibtexparser.latexenc import latex_to_unicode
@@ -331,6 +350,162 @@ def bibtexparser_entry_to_papis(entry: dict[str, Any]) -> dict[str, Any]:
     return keyconversion_to_data(key_conversion, entry, keep_unknown_keys=True)
 
 
+def iter_bibtex_blocks(lines: Iterable[str]) -> Iterator[str]:
+    """Split BibTeX data into its top-level blocks.
+
+    A block starts with an ``@`` outside of any other block and ends at the
+    matching closing brace (or parenthesis, for blocks like ``@string(...)``).
+    Any text between the blocks is ignored, as done by BibTeX itself.
+
+    >>> list(iter_bibtex_blocks(["@string{j = {J. Phys.}}\\n", "% comment\\n",
+    ...                          "@article(ref, title = {A (B)} )\\n"]))
+    ['@string{j = {J. Phys.}}', '@article(ref, title = {A (B)} )']
+    >>> list(iter_bibtex_blocks(['@article(ref, title = "A (B) C", year = 2000)']))
+    ['@article(ref, title = "A (B) C", year = 2000)']
+
+    :param lines: an iterable over the (lines of) BibTeX data.
+    """
+    block: list[str] = []
+    in_block = False
+    closer = ""
+    depth = 0
+    in_string = False
+
+    for line in lines:
+        start = 0
+        for m in _BIBTEX_DELIMITER_RE.finditer(line):
+            c = m.group()
+            if not in_block:
+                if c == "@":
+                    in_block, closer, depth = True, "", 0
+                    start = m.start()
+            elif not closer:
+                if c == "@":
+                    # NOTE: not an actual block, so we start again from here
+                    block = []
+                    start = m.start()
+                elif c in {"{", "("}:
+                    closer = "}" if c == "{" else ")"
+                    depth = 1 if c == "{" else 0
+                    in_string = False
+            elif c == '"':
+                # NOTE: quoted values can only contain a closing parenthesis
+                # at depth 0 (braces in them are balanced anyway)
+                if closer == ")" and depth == 0:
+                    in_string = not in_string
+            elif c == "{":
+                depth += 1
+            elif c == "}":
+                depth -= 1
+                if closer == "}" and depth == 0:
+                    in_block = False
+            elif c == ")" and closer == ")" and depth == 0 and not in_string:
+                in_block = False
+
+            if closer and not in_block:
+                block.append(line[start:m.end()])
+                yield "".join(block)
+
+                block = []
+                closer = ""
+
+        if in_block:
+            block.append(line[start:])
+
+    if block:
+        yield "".join(block)
+
+
+def _make_bibtexparser(strings: dict[str, str]) -> Any:
+    from bibtexparser.bparser import BibTexParser
+
+    parser = BibTexParser(
+        common_strings=True,
+        ignore_nonstandard_types=False,
+        homogenize_fields=False,
+        interpolate_strings=True)
+    parser.expect_multiple_parse = True
+    parser.bib_database.strings.update(strings)
+
+    return parser
+
+
+def _parse_bibtex_chunk(chunk: tuple[list[str], dict[str, str]]) -> list[DocumentLike]:
+    blocks, strings = chunk
+    with papis.logging.quiet("bibtexparser.bparser"):
+        parser = _make_bibtexparser(strings)
+        entries = parser.parse("\n".join(blocks), partial=True).entries
+
+    return [bibtexparser_entry_to_papis(entry) for entry in entries]
+
+
+def _iter_bibtex_chunks(
+        lines: Iterable[str]) -> Iterator[tuple[list[str], dict[str, str]]]:
+    # NOTE: string macros are parsed here in order, so that each chunk is
+    # parsed with all the macros that were defined before its entries
+    with papis.logging.quiet("bibtexparser.bparser"):
+        string_parser = _make_bibtexparser({})
+    strings = dict(string_parser.bib_database.strings)
+
+    chunk: list[str] = []
+    for block in iter_bibtex_blocks(lines):
+        m = _BIBTEX_BLOCK_TYPE_RE.match(block)
+        block_type = m.group(1).lower() if m else ""
+
+        if block_type == "string":
+            if chunk:
+                yield chunk, strings
+                chunk = []
+
+            with papis.logging.quiet("bibtexparser.bparser"):
+                string_parser.parse(block, partial=True)
+            strings = dict(string_parser.bib_database.strings)
+        elif block_type in {"comment", "preamble"}:
+            continue
+        else:
+            chunk.append(block)
+            if len(chunk) >= BIBTEX_READ_CHUNK_SIZE:
+                yield chunk, strings
+                chunk = []
+
+    if chunk:
+        yield chunk, strings
+
+
+def _iter_bibtex_entries(lines: Iterable[str]) -> Iterator[DocumentLike]:
+    from papis.utils import parmap_iter
+
+    for entries in parmap_iter(_parse_bibtex_chunk, _iter_bibtex_chunks(lines)):
+        yield from entries
+
+
+def iter_bibtex_entries(bibtex: str) -> Iterator[DocumentLike]:
+    """Read the entries in a BibTeX file (or string) one by one.
+
+    The data is split into its top-level blocks (see :func:`iter_bibtex_blocks`)
+    without reading it all in memory. The entries are then parsed in chunks of
+    :data:`BIBTEX_READ_CHUNK_SIZE` by :class:`~bibtexparser.bparser.BibTexParser`,
+    in parallel for large files, and converted using
+    :func:`bibtexparser_entry_to_papis`. Any ``@string`` macros apply to all the
+    entries that come after them.
+
+    :param bibtex: a path to a BibTeX file or a string containing BibTeX
+        formatted data.
+    :returns: an iterator over the entries from the BibTeX data in a
+        compatible format, in the same order as in the data.
+    """
+    if isinstance(bibtex, bytes):
+        # NOTE: some callers pass in the raw body of an HTTP response
+        bibtex = bibtex.decode("utf-8")
+
+    if os.path.exists(bibtex):
+        logger.debug("Reading in file: '%s'.", bibtex)
+        with open(bibtex, encoding="utf-8") as fd:
+            yield from _iter_bibtex_entries(fd)
+    else:
+        yield from _iter_bibtex_entries(bibtex.splitlines(keepends=True))
+
+
 def bibtex_to_dict(bibtex: str) -> list[DocumentLike]:
     """Convert a BibTeX file (or string) to a list of Papis-compatible dictionaries.
 
@@ -350,30 +525,90 @@ def bibtex_to_dict(bibtex: str) -> list[DocumentLike]:
 
         { "type": "article", "author": "...", "title": "...", ...}
 
+    This is a wrapper around :func:`iter_bibtex_entries` that reads all the
+    entries at once.
+
     :param bibtex: a path to a BibTeX file or a string containing BibTeX
-        formatted data. If it is a file, its contents are passed to
-        :class:`~bibtexparser.bparser.BibTexParser`.
+        formatted data.
     :returns: a list of entries from the BibTeX data in a compatible format.
     """
-    from bibtexparser.bparser import BibTexParser
-
-    with papis.logging.quiet("bibtexparser.bparser"):
-        parser = BibTexParser(
-            common_strings=True,
-            ignore_nonstandard_types=False,
-            homogenize_fields=False,
-            interpolate_strings=True)
-
-        if os.path.exists(bibtex):
-            with open(bibtex, encoding="utf-8") as fd:
-                logger.debug("Reading in file: '%s'.", bibtex)
-                text = fd.read()
+    return list(iter_bibtex_entries(bibtex))
+
+
+def _find_latex_file(name: str, folders: Iterable[str]) -> str | None:
+    for folder in folders:
+        path = os.path.join(folder, name)
+        for candidate in (path, f"{path}.tex"):
+            if os.path.isfile(candidate):
+                return candidate
+
+    return None
+
+
+def _scan_latex_file(filename: str,
+                     keys: set[str],
+                     visited: set[str],
+                     root: str) -> None:
+    path = os.path.realpath(filename)
+    if path in visited:
+        return
+
+    visited.add(path)
+    logger.debug("Scanning LaTeX file for citations: '%s'.", filename)
+
+    try:
+        with open(path, encoding="utf-8", errors="replace") as fd:
+            text = _LATEX_COMMENT_RE.sub("", fd.read())
+    except OSError as exc:
+        logger.warning("Could not read LaTeX file '%s': %s", filename, exc)
+        return
+
+    # NOTE: LaTeX resolves included files relative to the main file, but we
+    # also look next to the current file for convenience
+    folders = dict.fromkeys([root, os.path.dirname(filename)])
+    for m in _LATEX_COMMAND_RE.finditer(text):
+        name = m.group("name")
+        args = [a.group("arg") for a in _LATEX_ARG_RE.finditer(m.group("args"))
+                if a.group("arg") is not None]
+
+        if name in {"input", "include", "subfile"}:
+            if not args and m.group("path"):
+                args = [m.group("path")]
+
+            for arg in args[:1]:
+                included = _find_latex_file(arg.strip(), folders)
+                if included is None:
+                    logger.debug("Included LaTeX file '%s' not found.", arg)
+                else:
+                    _scan_latex_file(included, keys, visited, root)
         else:
-            text = bibtex
+            # NOTE: only the biblatex multicite commands (e.g. '\parencites')
+            # take multiple groups of keys
+            if not name.endswith("cites"):
+                args = args[:1]
 
-        entries = parser.parse(text, partial=True).entries
+            keys.update(
+                key for arg in args for k in arg.split(",")
+                if (key := k.strip()))
 
-    return [bibtexparser_entry_to_papis(entry) for entry in entries]
+
+def get_cited_keys(filename: str) -> set[str]:
+    """Find all the citation keys used in a LaTeX file.
+
+    The file is scanned once for any citation command, i.e. any command with
+    ``cite`` in its name, such as ``\\cite``, ``\\citep`` or ``\\nocite``, and
+    the biblatex commands like ``\\parencite`` or ``\\textcites``. Commands
+    with multiple keys (e.g. ``\\cite{key1, key2}``) and optional arguments are
+    supported, while commented out citations are ignored. Files included
+    with ``\\input``, ``\\include`` or ``\\subfile`` are scanned as well.
+
+    :param filename: path to a LaTeX file.
+    :returns: a set of all the citation keys in the file.
+    """
+    keys: set[str] = set()
+    _scan_latex_file(filename, keys, set(), os.path.dirname(filename))
+
+    return keys
 
 
 def ref_cleanup(ref: str,
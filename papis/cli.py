@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import logging
-import re
 from collections.abc import Callable
 from typing import TYPE_CHECKING, Any
 
@@ -9,7 +8,6 @@ import click
 from click.shell_completion import CompletionItem
 
 import papis.config
-from papis.format import format
 from papis.strings import FormatPattern
 
 if TYPE_CHECKING:
@@ -94,14 +92,6 @@ def bool_flag(*args: Any, **kwargs: Any) -> DecoratorCallable:
         **kwargs)
 
 
-def _clean_completions(s: str) -> str:
-    """Remove certain characters that are treated as completion breaks."""
-
-    # NOTE: See http://tiswww.case.edu/php/chet/bash/FAQ, E13 for the colon.
-    # NOTE: The comma causes the same problem in fish for a reason.
-    return re.sub(r"[:,]", "", s)
-
-
 def _query_shell_complete(ctx: click.Context,
                           param: click.Parameter,
                           incomplete: str) -> list[CompletionItem]:
@@ -113,15 +103,18 @@ def _query_shell_complete(ctx: click.Context,
     # - the query is searched in the database using `match-format`, but only
     #   `completion-format` is sent to the shell.
     # - see other discussion in https://github.com/papis/papis/pull/1112
+    # - if `use-completion-index` is enabled, completions are taken from a
+    #   precomputed index (see `papis.database.completion`) instead, so that
+    #   documents are not queried and formatted on every TAB press. The index
+    #   is searched as plain text, without the query syntax or `match-format`
 
     # TODO:
     # - prevent a completion for A from matching B when fmt(A) is infix of fmt(B)
     # - allow selecting based on the document folder (need to allow access to it
     #   in the formatting)
 
-    fmt = papis.config.getformatpattern("completion-format")
-    help_fmt = papis.config.getformatpattern("completion-help-format")
     prefix_only = papis.config.getboolean("prefix-only-completions")
+    max_results = papis.config.getint("completion-max-results")
 
     lib = ctx.parent.params.get("lib") if ctx.parent else None
     query = (
@@ -132,22 +125,57 @@ def _query_shell_complete(ctx: click.Context,
 
     # NOTE: suppress all logging to avoid spamming the screen during completion
     with papis.logging.quiet("papis", level=logging.ERROR):
-        comps_and_helps = (
-            (
-                _clean_completions(format(fmt, doc)),
-                _clean_completions(format(help_fmt, doc))
-            ) for doc in handle_doc_folder_or_query(query, None, library_name=lib)
-        )
-
-    return [
-        CompletionItem(
-            comp,
-            help=help
-        )
-        for comp, help in comps_and_helps
-        # if prefix_only, only include matches that start with the query string
-        if not prefix_only or comp.startswith(incomplete)
-    ]
+        if papis.config.getboolean("use-completion-index"):
+            try:
+                library = (
+                    papis.config.get_lib() if lib is None
+                    else papis.config.get_lib_from_name(lib))
+            except RuntimeError:
+                # nonexistent library name
+                return []
+
+            from papis.database import get_all_query_string
+            from papis.database.completion import get_completion_index
+            from papis.id import ID_KEY_NAME
+
+            index = get_completion_index(library)
+            if prefix_only:
+                entries = index.search(incomplete, limit=max_results)
+            elif incomplete:
+                entries = index.search_substring(incomplete, limit=max_results)
+            elif query == get_all_query_string():
+                entries = index.search(limit=max_results)
+            else:
+                entries = []
+                for doc in handle_doc_folder_or_query(query, None, library_name=lib):
+                    entry = index.get(str(doc.get(ID_KEY_NAME)))
+                    if entry is None:
+                        continue
+
+                    entries.append(entry)
+                    if 0 < max_results <= len(entries):
+                        break
+
+            comps_and_helps = [(entry.completion, entry.help) for entry in entries]
+        else:
+            from papis.database.completion import clean_completion
+            from papis.format import format
+
+            fmt = papis.config.getformatpattern("completion-format")
+            help_fmt = papis.config.getformatpattern("completion-help-format")
+
+            comps_and_helps = []
+            for doc in handle_doc_folder_or_query(query, None, library_name=lib):
+                comp = clean_completion(format(fmt, doc))
+                # if prefix_only, only include matches that start with the query
+                if prefix_only and not comp.startswith(incomplete):
+                    continue
+
+                comps_and_helps.append((comp, clean_completion(format(help_fmt, doc))))
+                if 0 < max_results <= len(comps_and_helps):
+                    break
+
+    return [CompletionItem(comp, help=help) for comp, help in comps_and_helps]
 
 
 def query_argument(**attrs: Any) -> DecoratorCallable:
@@ -104,7 +104,7 @@ Command-line interface
 from __future__ import annotations
 
 import os
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Literal
 
 import click
 
@@ -113,6 +113,8 @@ import papis.config
 import papis.logging
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
     from papis.citations import Citations
     from papis.document import Document
     from papis.strings import AnyString
@@ -224,133 +226,356 @@ def run(paths: list[str],
         approved_files = list(in_document_paths)
 
     from papis.document import new as new_document
+    from papis.paths import remove_staging_folder
+
+    if base_path is None:
+        base_path = os.path.expanduser(papis.config.get_lib().path)
 
     tmp_document = new_document(
         data,
         approved_files,
-        mode="link" if link else "copy",
+        mode="link" if link else ("move" if move else "copy"),
         file_name_format=file_name,
-        auto_doctor=auto_doctor)
+        auto_doctor=auto_doctor,
+        base_path=base_path)
 
-    # Log per-file operations
-    if link:
-        verb = "Linking"
-    elif move:
-        verb = "Moving"
-    else:
-        verb = "Copying"
+    # NOTE: the staged folder is removed if the document is not added
+    staged_folder = tmp_document.get_main_folder()
+    try:
+        # Log per-file operations
+        if link:
+            verb = "Linking"
+        elif move:
+            verb = "Moving"
+        else:
+            verb = "Copying"
 
-    for in_file, out_name in zip(
-            approved_files, tmp_document["files"], strict=True):
-        logger.info(
-            "%s '%s' to '%s'.", verb, os.path.basename(in_file), out_name)
+        for in_file, out_name in zip(
+                approved_files, tmp_document["files"], strict=True):
+            logger.info(
+                "%s '%s' to '%s'.", verb, os.path.basename(in_file), out_name)
 
-    # create a nice folder name for the new document
-    if base_path is None:
-        base_path = os.path.expanduser(papis.config.get_lib().path)
+        # create a nice folder name for the new document
+        if subfolder:
+            base_path = os.path.join(base_path, subfolder)
 
-    if subfolder:
-        base_path = os.path.join(base_path, subfolder)
+        from papis.paths import get_document_unique_folder
 
-    from papis.paths import get_document_unique_folder
+        base_path = os.path.normpath(base_path)
+        out_folder_path = get_document_unique_folder(
+            tmp_document, base_path,
+            folder_name_format=folder_name)
 
-    base_path = os.path.normpath(base_path)
-    out_folder_path = get_document_unique_folder(
-        tmp_document, base_path,
-        folder_name_format=folder_name)
+        logger.info("Document folder is '%s'.", out_folder_path)
+        logger.debug("Document includes files: '%s'.",
+                     "', '".join(tmp_document["files"]))
 
-    logger.info("Document folder is '%s'.", out_folder_path)
-    logger.debug("Document includes files: '%s'.", "', '".join(tmp_document["files"]))
+        # Check if the user wants to edit before submitting the doc
+        # to the library
+        if edit:
+            from papis.api import edit_file
+            logger.info("Editing file before adding it.")
 
-    # Check if the user wants to edit before submitting the doc
-    # to the library
-    if edit:
-        from papis.api import edit_file
-        logger.info("Editing file before adding it.")
+            edit_file(tmp_document.get_info_file(), wait=True)
+            tmp_document.load()
 
-        edit_file(tmp_document.get_info_file(), wait=True)
-        tmp_document.load()
+        from papis.hooks import run as run_hook
+        run_hook("on_add_done", tmp_document)
 
-    from papis.hooks import run as run_hook
-    run_hook("on_add_done", tmp_document)
+        # Duplication checking
+        logger.info("Checking if this document is already in the library. "
+                    "This uses the keys ['%s'] to determine uniqueness.",
+                    "', '".join(papis.config.getlist("unique-document-keys")))
 
-    # Duplication checking
-    logger.info("Checking if this document is already in the library. "
-                "This uses the keys ['%s'] to determine uniqueness.",
-                "', '".join(papis.config.getlist("unique-document-keys")))
+        from papis.utils import locate_document_in_lib
 
-    from papis.utils import locate_document_in_lib
+        has_duplicate = False
+        try:
+            found_document = locate_document_in_lib(tmp_document)
+        except IndexError:
+            logger.info("No document matching the new metadata found in the "
+                        "'%s' library.", papis.config.get_lib_name())
+        else:
+            text_area(
+                dump(found_document),
+                title="This document is already in your library",
+                lexer_name="yaml")
 
-    has_duplicate = False
-    try:
-        found_document = locate_document_in_lib(tmp_document)
-    except IndexError:
-        logger.info("No document matching the new metadata found in the '%s' library.",
-                    papis.config.get_lib_name())
-    else:
-        text_area(
-            dump(found_document),
-            title="This document is already in your library",
-            lexer_name="yaml")
+            logger.warning("Duplication Warning")
+            logger.warning(
+                "A document (shown above) in the '%s' library seems to match the "
+                "one to be added.", papis.config.get_lib())
 
-        logger.warning("Duplication Warning")
-        logger.warning(
-            "A document (shown above) in the '%s' library seems to match the "
-            "one to be added.", papis.config.get_lib())
+            if batch:
+                logger.warning(
+                    "No new document is created! Add this document in "
+                    "interactive mode (no '--batch') or use 'papis update' instead.")
+                return
 
-        if batch:
             logger.warning(
-                "No new document is created! Add this document in "
-                "interactive mode (no '--batch') or use 'papis update' instead.")
-            return
+                "Hint: Use the 'papis update' command instead to update the "
+                "existing document.")
+
+            # NOTE: we always want the user to confirm if a duplicate is found!
+            confirm = True
+            has_duplicate = True
+
+        if citations:
+            from papis.citations import save_citations
+            save_citations(tmp_document, citations)
+
+        if not batch and confirm:
+            dup_text = " (duplicate) " if has_duplicate else " "
+            text_area(
+                dump(tmp_document),
+                title=f"This{dup_text}document will be added to the "
+                      f"'{papis.config.get_lib()}' library",
+                lexer_name="yaml")
+
+        if confirm:
+            if not ask_confirm("Do you want to add the new document?"):
+                return
+
+        from papis.document import move as move_doc
+
+        logger.info("Moving document to '%s'.", out_folder_path)
+        move_doc(tmp_document, out_folder_path)
+        db.add(tmp_document)
+    finally:
+        if staged_folder is not None:
+            remove_staging_folder(staged_folder)
+
+    if git:
+        from papis.git import GitError, add_and_commit as git_add_and_commit
+
+        try:
+            git_add_and_commit(
+                out_folder_path, ".",
+                f"Add document '{describe(tmp_document)}'")
+        except GitError as exc:
+            logger.error("%s", exc)
+
+    if move:
+        for in_file_path in approved_files:
+            try:
+                os.remove(in_file_path)
+            except Exception as exc:
+                logger.error("Failed to move file: '%s'.", in_file_path, exc_info=exc)
+
+
+#: Minimum number of documents for which :func:`run_many` creates the new
+#: documents in parallel (see :func:`papis.utils.parmap`).
+BULK_ADD_PARALLEL_THRESHOLD = 64
+
+
+def _stage_document(entry: tuple[dict[str, Any], list[str]], *,
+                    mode: Literal["copy", "link", "move"],
+                    file_name_format: AnyString | None,
+                    auto_doctor: bool,
+                    base_path: str) -> Document | None:
+    from papis.document import describe, new as new_document
+
+    data, files = entry
+    try:
+        return new_document(data, files,
+                            mode=mode,
+                            file_name_format=file_name_format,
+                            auto_doctor=auto_doctor,
+                            base_path=base_path)
+    except Exception as exc:
+        logger.error("Failed to create document: '%s'.", describe(data),
+                     exc_info=exc)
+        return None
+
+
+def run_many(entries: Iterable[tuple[dict[str, Any], Sequence[str]]],
+             folder_name: AnyString | None = None,
+             file_name: AnyString | None = None,
+             subfolder: str | None = None,
+             base_path: str | None = None,
+             batch: bool = False,
+             git: bool = False,
+             link: bool = False,
+             move: bool = False,
+             auto_doctor: bool = False) -> list[Document]:
+    """Add multiple documents to the current library at once.
+
+    This is a bulk version of :func:`run` that avoids most of the per-document
+    overhead when importing a large number of documents:
+
+    * Papis IDs are computed against the set of existing IDs, without querying
+      the database for each document.
+    * Documents are created in temporary folders in parallel.
+    * Duplicates are checked against an in-memory index of the
+      :confval:`unique-document-keys` of all the documents in the library
+      (and of the ones added before it), normalized with
+      :func:`~papis.database.unique.normalize_unique_value`.
+    * All documents are added to the database with a single call to
+      :meth:`~papis.database.base.Database.add_many` and committed to git
+      (if requested) in a single commit.
+
+    Unlike :func:`run`, this function does not open or edit the documents and
+    only asks for confirmation when a duplicate is found (and *batch* is
+    *False*). Otherwise, the arguments have the same meaning as in :func:`run`.
+
+    :param entries: an iterable of ``(data, files)`` tuples, one for each
+        document that should be added.
+    :returns: a list of the documents that were added to the library.
+    """
+    from functools import partial
+
+    from papis.database import get as get_database
+    from papis.database.unique import get_unique_values
+    from papis.document import describe, dump, from_data, move as move_doc
+    from papis.hooks import run_batch as run_hook_batch
+    from papis.id import ID_KEY_NAME, compute_an_id
+    from papis.paths import get_document_unique_folder, remove_staging_folder
+    from papis.tui.utils import confirm as ask_confirm, text_area
+    from papis.utils import parmap
+
+    staged_entries = []
+    for data, files in entries:
+        missing_files = [f for f in files if not os.path.exists(f)]
+        if missing_files:
+            logger.error("Skipping document with missing files ['%s']: '%s'.",
+                         "', '".join(missing_files), describe(data))
+            continue
+
+        staged_entries.append((dict(data), list(files)))
+
+    if not staged_entries:
+        return []
+
+    db = get_database()
+    existing_docs = db.get_all_documents()
 
-        logger.warning(
-            "Hint: Use the 'papis update' command instead to update the "
-            "existing document.")
+    # compute all the Papis IDs here, so that creating the documents does not
+    # need to query the database for each one of them
+    used_ids = {str(doc[ID_KEY_NAME]) for doc in existing_docs if ID_KEY_NAME in doc}
+    for data, _ in staged_entries:
+        if ID_KEY_NAME in data:
+            continue
 
-        # NOTE: we always want the user to confirm if a duplicate is found!
-        confirm = True
-        has_duplicate = True
+        new_id = compute_an_id(from_data(data))
+        while new_id in used_ids:
+            new_id = compute_an_id(from_data(data))
 
-    if citations:
-        from papis.citations import save_citations
-        save_citations(tmp_document, citations)
+        data[ID_KEY_NAME] = new_id
+        used_ids.add(new_id)
 
-    if not batch and confirm:
-        dup_text = " (duplicate) " if has_duplicate else " "
-        text_area(
-            dump(tmp_document),
-            title=f"This{dup_text}document will be added to the "
-                  f"'{papis.config.get_lib()}' library",
-            lexer_name="yaml")
+    unique_document_keys = papis.config.getlist("unique-document-keys")
+    known_documents: dict[tuple[str, str], Document] = {}
 
-    if confirm:
-        if not ask_confirm("Do you want to add the new document?"):
-            return
+    def add_known_document(doc: Document) -> None:
+        for item in get_unique_values(doc, unique_document_keys):
+            known_documents.setdefault(item, doc)
 
-    from papis.document import move as move_doc
+    def find_known_document(doc: Document) -> Document | None:
+        for item in get_unique_values(doc, unique_document_keys):
+            if item in known_documents:
+                return known_documents[item]
 
-    logger.info("Moving document to '%s'.", out_folder_path)
-    move_doc(tmp_document, out_folder_path)
-    db.add(tmp_document)
+        return None
+
+    for doc in existing_docs:
+        add_known_document(doc)
+
+    if base_path is None:
+        base_path = os.path.expanduser(papis.config.get_lib().path)
+
+    logger.info("Creating %d documents.", len(staged_entries))
+    stage = partial(_stage_document,
+                    mode="link" if link else ("move" if move else "copy"),
+                    file_name_format=file_name,
+                    auto_doctor=auto_doctor,
+                    base_path=base_path)
+    np = None if len(staged_entries) >= BULK_ADD_PARALLEL_THRESHOLD else 0
+    staged_docs = parmap(stage, staged_entries, np=np)
+
+    # NOTE: the staged folders are removed for documents that are not added
+    staged_folders = [doc.get_main_folder() for doc in staged_docs
+                      if doc is not None]
+    try:
+        if subfolder:
+            base_path = os.path.join(base_path, subfolder)
+
+        base_path = os.path.normpath(base_path)
+
+        run_hook_batch("on_add_done", [doc for doc in staged_docs if doc is not None])
+
+        added_docs = []
+        added_files = []
+        for tmp_document, (_, files) in zip(staged_docs, staged_entries, strict=True):
+            if tmp_document is None:
+                continue
+
+            found_document = find_known_document(tmp_document)
+            if found_document is not None:
+                logger.warning("Document '%s' seems to match the existing document "
+                               "'%s' in the '%s' library.",
+                               describe(tmp_document),
+                               describe(found_document),
+                               papis.config.get_lib())
+
+                if batch:
+                    is_confirmed = False
+                else:
+                    text_area(
+                        dump(found_document),
+                        title="This document is already in your library",
+                        lexer_name="yaml")
+                    is_confirmed = ask_confirm(
+                        f"Do you want to add the duplicate document "
+                        f"'{describe(tmp_document)}'?", yes=False)
+
+                if not is_confirmed:
+                    logger.warning("Skipping duplicate document '%s'.",
+                                   describe(tmp_document))
+                    continue
+
+            out_folder_path = get_document_unique_folder(
+                tmp_document, base_path,
+                folder_name_format=folder_name)
+
+            logger.info("Moving document '%s' to '%s'.",
+                        describe(tmp_document), out_folder_path)
+            move_doc(tmp_document, out_folder_path)
+
+            add_known_document(tmp_document)
+            added_docs.append(tmp_document)
+            added_files.extend(files)
+    finally:
+        for folder in staged_folders:
+            if folder is not None:
+                remove_staging_folder(folder)
+
+    if not added_docs:
+        return []
+
+    db.add_many(added_docs)
+    logger.info("Added %d documents to the '%s' library.",
+                len(added_docs), papis.config.get_lib())
 
     if git:
         from papis.git import GitError, add_and_commit as git_add_and_commit
 
         try:
             git_add_and_commit(
-                out_folder_path, ".",
-                f"Add document '{describe(tmp_document)}'")
+                base_path,
+                [str(doc.get_main_folder()) for doc in added_docs],
+                f"Add {len(added_docs)} documents")
         except GitError as exc:
             logger.error("%s", exc)
 
     if move:
-        for in_file_path in approved_files:
+        for in_file_path in added_files:
             try:
                 os.remove(in_file_path)
             except Exception as exc:
                 logger.error("Failed to move file: '%s'.", in_file_path, exc_info=exc)
 
+    return added_docs
+
 
 @click.command(
     "add",
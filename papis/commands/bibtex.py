@@ -123,7 +123,6 @@ Command-line interface
 from __future__ import annotations
 
 import os
-import re
 
 import click
 
@@ -607,14 +606,10 @@ def cli_filter_cited(ctx: click.Context, _files: list[str]) -> None:
 
         papis bibtex read main.bib filter-cited -f main.tex save cited.bib
     """
-    found = []
+    from papis.bibtex import get_cited_keys
 
-    for f in _files:
-        with open(f, encoding="utf-8") as fd:
-            text = fd.read()
-            for doc in ctx.obj["documents"]:
-                if re.search(doc["ref"], text):
-                    found.append(doc)
+    cited = set().union(*(get_cited_keys(f) for f in _files))
+    found = [doc for doc in ctx.obj["documents"] if doc.get("ref") in cited]
 
     logger.info("Found %d cited documents.", len(found))
     ctx.obj["documents"] = found
@@ -633,20 +628,16 @@ def cli_iscited(ctx: click.Context, _files: list[str]) -> None:
     Check which documents are not cited.
 
     For example, to print a list of documents that have not been cited in
-    both ``main.tex`` and ``chapter-2.tex``, run:
+    either ``main.tex`` or ``chapter-2.tex``, run:
 
     .. code:: sh
 
         papis bibtex iscited -f main.tex -f chapter-2.tex
     """
-    unfound = []
+    from papis.bibtex import get_cited_keys
 
-    for f in _files:
-        with open(f, encoding="utf-8") as fd:
-            text = fd.read()
-            for doc in ctx.obj["documents"]:
-                if not re.search(doc["ref"], text):
-                    unfound.append(doc)
+    cited = set().union(*(get_cited_keys(f) for f in _files))
+    unfound = [doc for doc in ctx.obj["documents"] if doc.get("ref") not in cited]
 
     logger.info("Found %s documents with no citations.", len(unfound))
 
@@ -692,29 +683,35 @@ def cli_import(ctx: click.Context,
 
         papis.config.set_lib_from_name(out)
 
-    from papis.commands.add import run
+    from papis.commands.add import run_many
+
+    entries = []
+    for doc in docs:
+        file_value = None
+        filepaths = []
+        for k in ("file", "FILE"):
+            if k in doc:
+                file_value = doc[k]
+                logger.debug("\tKey '%s' exists", k)
+                break
+
+        if file_value:
+            # NOTE: this matches the way Zotero adds files (i.e. colon-separated
+            # entries), but it's not an established practice probably.
+            filepaths = [f for f in file_value.split(":") if os.path.exists(f)]
+
+            if not filepaths:
+                logger.info(
+                    "\t{c.Fore.RED}Provided files do not exist{c.Style.RESET_ALL}: "
+                    "%s.", file_value)
+
+        entries.append((dict(doc), filepaths))
+
     from papis.document import describe
 
     with papis.logging.quiet("papis.commands.add"):
-        for j, doc in enumerate(docs):
-            file_value = None
-            filepaths = []
-            for k in ("file", "FILE"):
-                if k in doc:
-                    file_value = doc[k]
-                    logger.debug("\tKey '%s' exists", k)
-                    break
-
-            if file_value:
-                # NOTE: this matches the way Zotero adds files (i.e. colon-separated
-                # entries), but it's not an established practice probably.
-                filepaths = [f for f in file_value.split(":") if os.path.exists(f)]
-
-                if not filepaths:
-                    logger.info(
-                        "\t{c.Fore.RED}Provided files do not exist{c.Style.RESET_ALL}: "
-                        "%s.", file_value)
-
-            run(filepaths, data=doc, batch=batch)
-            logger.info("%d.\t{c.Fore.YELLOW}%-80.80s{c.Style.RESET_ALL}",
-                        j, describe(doc))
+        added_docs = run_many(entries, batch=batch)
+
+    for j, doc in enumerate(added_docs):
+        logger.info("%d.\t{c.Fore.YELLOW}%-80.80s{c.Style.RESET_ALL}",
+                    j, describe(doc))
@@ -96,9 +96,10 @@ def update(query: str,
         logger.warning(no_documents_retrieved_message)
         return
 
-    for doc in documents:
-        doc.load()
-        db.update(doc)
+    with db.batch():
+        for doc in documents:
+            doc.load()
+            db.update(doc)
 
     logger.info("Updated %d documents", len(documents))
 
@@ -176,8 +177,9 @@ def rm(query: str,
         query, doc_folder, sort_field, sort_reverse, _all)
 
     db = get_database()
-    for doc in documents:
-        db.delete(doc)
+    with db.batch():
+        for doc in documents:
+            db.delete(doc)
 
     logger.info("Removed %d documents from cache", len(documents))
 
@@ -225,17 +227,18 @@ def update_newer(query: str,
 
     from papis.document import describe
 
-    for doc in documents:
-        info = doc.get_info_file()
-        if not os.path.exists(info):
-            continue
+    with db.batch():
+        for doc in documents:
+            info = doc.get_info_file()
+            if not os.path.exists(info):
+                continue
 
-        info_mtime = os.stat(info).st_mtime
-        if cache_path_mtime < info_mtime:
-            updated_documents_count += 1
-            logger.info("Updating newer '%s'.", describe(doc))
+            info_mtime = os.stat(info).st_mtime
+            if cache_path_mtime < info_mtime:
+                updated_documents_count += 1
+                logger.info("Updating newer '%s'.", describe(doc))
 
-            doc.load()
-            db.update(doc)
+                doc.load()
+                db.update(doc)
 
     logger.info("Updated %d documents.", updated_documents_count)
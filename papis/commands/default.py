@@ -21,6 +21,17 @@ Examples
 
         papis --pick-lib open 'einstein relativity'
 
+- To see where time is spent by a slow command, use ``--stats``. This prints
+  a table with the time taken by expensive operations, such as loading the
+  database or fetching data from the network, when the command finishes.
+  Using ``--stats-trace`` additionally writes every operation to a file that
+  can be viewed as a flame graph (see :mod:`papis.stats`):
+
+    .. code:: sh
+
+        papis --stats list 'einstein relativity'
+        papis --stats-trace trace.json add --from doi 10.1103/PhysRev.47.777
+
 Command-line interface
 ^^^^^^^^^^^^^^^^^^^^^^
 
@@ -37,6 +48,7 @@ import click
 import papis.cli
 import papis.config
 import papis.logging
+import papis.stats
 from papis import __version__
 from papis.commands import CommandPluginLoaderGroup
 
@@ -53,6 +65,27 @@ def generate_profile_writing_function(profiler: cProfile.Profile,
         profiler.disable()
         profiler.dump_stats(filename)
 
+        stats = papis.config.get_settings_cache_stats()
+        logger.info("Configuration lookups: %d cached, %d resolved in %.1f ms.",
+                    stats.hits, stats.misses, 1000 * stats.time)
+
+    return _on_finish
+
+
+def generate_stats_writing_function(trace_filename: str | None) -> Callable[[], None]:
+    def _on_finish() -> None:
+        import sys
+
+        stats = papis.config.get_settings_cache_stats()
+        papis.stats.increment("config.lookups.cached", stats.hits)
+        papis.stats.increment("config.lookups.resolved", stats.misses)
+
+        print(papis.stats.format_stats(), file=sys.stderr)
+
+        if trace_filename is not None:
+            papis.stats.write_trace(trace_filename)
+            logger.info("Trace written to '%s'.", trace_filename)
+
     return _on_finish
 
 
@@ -70,6 +103,15 @@ def generate_profile_writing_function(profiler: cProfile.Profile,
     help="Print profiling information into file.",
     type=click.Path(),
     default=None)
+@papis.cli.bool_flag(
+    "--stats",
+    help="Print timing statistics of expensive operations on exit.")
+@click.option(
+    "--stats-trace",
+    help="Write timing statistics into file as Chrome trace events "
+         "(implies --stats).",
+    type=click.Path(),
+    default=None)
 @click.option(
     "-l", "--lib",
     help="Choose a library name or library path (unnamed library).",
@@ -114,6 +156,8 @@ def generate_profile_writing_function(profiler: cProfile.Profile,
 def run(ctx: click.Context,
         verbose: bool,
         profile: str,
+        stats: bool,
+        stats_trace: str | None,
         config: str,
         lib: str | None,
         log: str,
@@ -133,6 +177,12 @@ def run(ctx: click.Context,
         import atexit
         atexit.register(generate_profile_writing_function(profiler, profile))
 
+    if stats or stats_trace:
+        papis.stats.enable(trace=stats_trace is not None)
+
+        import atexit
+        atexit.register(generate_stats_writing_function(stats_trace))
+
     papis.logging.setup(log, color=color, logfile=logfile, verbose=verbose)
 
     # NOTE: order of the configurations is intentional based on priority
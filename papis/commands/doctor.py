@@ -359,8 +359,16 @@ def cli(query: str,
             indent=2))
         return
 
-    process_errors(errors,
-                   fix=fix,
-                   explain=explain,
-                   suggest=suggest,
-                   edit=edit)
+    from contextlib import nullcontext
+
+    from papis.database import get_database
+
+    # NOTE: fixed documents are committed to the database all at once, but
+    # documents that are edited interactively are committed one by one
+    db = get_database()
+    with db.batch() if fix and not edit else nullcontext():
+        process_errors(errors,
+                       fix=fix,
+                       explain=explain,
+                       suggest=suggest,
+                       edit=edit)
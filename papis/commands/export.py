@@ -66,6 +66,8 @@ import papis.cli
 import papis.logging
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
     from papis.document import Document
 
 logger = papis.logging.get_logger(__name__)
@@ -103,6 +105,46 @@ def run(documents: list[Document], to_format: str) -> str:
     return result
 
 
+def run_iter(documents: Iterable[Document], to_format: str) -> Iterator[str]:
+    """
+    Exports several documents into something else incrementally.
+
+    Unlike :func:`run`, the documents are consumed and converted one by one
+    (if the exporter supports it, see
+    :class:`~papis.exporters.StreamingExporter`), so that the output can be
+    written out as it is produced.
+
+    :param documents: An iterable of Papis documents
+    :param to_format: what format to use
+    :returns: an iterator over chunks of the exported documents.
+    :raises Exception: if the exporter fails. Since some chunks may have
+        already been produced, the error is logged and re-raised, so that
+        the caller can discard any partial output.
+    """
+    from papis.exporters import get_iter_exporter_by_name
+    from papis.plugin import PluginError
+
+    try:
+        export_iter = get_iter_exporter_by_name(to_format)
+    except PluginError as exc:
+        logger.error("Could not load exporter for format '%s'.",
+                     to_format, exc_info=exc)
+        return
+
+    try:
+        for chunk in export_iter(documents):
+            if not isinstance(chunk, str):
+                logger.warning("Exporter for format '%s' did not return a string. "
+                               "This is likely a bug!", to_format)
+                yield str(chunk)
+            else:
+                yield chunk
+    except Exception as exc:
+        logger.error("Failed to export documents to format '%s'.",
+                     to_format, exc_info=exc)
+        raise
+
+
 @click.command("export")
 @click.help_option("--help", "-h")
 @papis.cli.query_argument()
@@ -174,20 +216,38 @@ def cli(query: str,
     if fmt and folder:
         logger.warning("Only --folder flag will be considered (--fmt ignored).")
 
-    # Get the local folder of the document so that third-party apps
-    # can actually go to the folder without checking with papis
-    for d in documents:
-        d["_papis_local_folder"] = d.get_main_folder()
-
-    ret_string = run(documents, to_format=fmt)
+    def with_local_folder(docs: list[Document]) -> Iterator[Document]:
+        # Get the local folder of the document so that third-party apps
+        # can actually go to the folder without checking with papis
+        for d in docs:
+            d["_papis_local_folder"] = d.get_main_folder()
+            yield d
+
+    if not folder:
+        from itertools import chain
+
+        # NOTE: the output is written as it is produced by the exporter, but
+        # nothing is written at all if the exporter produces nothing
+        chunks = (chunk for chunk in run_iter(with_local_folder(documents), fmt)
+                  if chunk)
+        try:
+            first = next(chunks, None)
+        except Exception:
+            raise SystemExit(1) from None
+
+        if first is None:
+            return
 
-    if ret_string and not folder:
         if out is None:
             logger.info("Dumping to STDOUT.")
-            click.echo(ret_string)
-            return
+            try:
+                for chunk in chain([first], chunks):
+                    click.echo(chunk, nl=False)
+            except Exception:
+                raise SystemExit(1) from None
 
-        mode = "a" if append else "w"
+            click.echo()
+            return
 
         from papis.tui.utils import confirm
 
@@ -205,8 +265,32 @@ def cli(query: str,
             msg = f"Writing to '{out}'."
 
         logger.info(msg)
-        with open(out, mode, encoding="utf-8") as fd:
-            fd.write(ret_string)
+
+        # NOTE: the output is written to a temporary file first, so that the
+        # existing file is not left half-written if the exporter fails
+        import shutil
+
+        tmp_out = f"{out}.tmp"
+        try:
+            if append and os.path.exists(out):
+                shutil.copyfile(out, tmp_out)
+
+            with open(tmp_out, "a" if append else "w", encoding="utf-8") as fd:
+                fd.writelines(chain([first], chunks))
+
+            if os.path.exists(out):
+                shutil.copymode(out, tmp_out)
+
+            os.replace(tmp_out, out)
+        except OSError as exc:
+            logger.error("Could not write to '%s'.", out, exc_info=exc)
+            raise SystemExit(1) from None
+        except Exception:
+            # NOTE: exporter errors are already logged by `run_iter`
+            raise SystemExit(1) from None
+        finally:
+            if os.path.exists(tmp_out):
+                os.remove(tmp_out)
 
         return
 
@@ -39,6 +39,16 @@ Examples
 
         papis merge --git "prediction and subs"
 
+-   Find near-duplicate documents in the whole library (e.g. the same paper
+    added once from arXiv and once from the journal) and merge them one
+    cluster at a time:
+
+    .. code:: sh
+
+        papis merge --duplicates --threshold 0.9
+
+    See :mod:`papis.duplicates` for details on how duplicates are found.
+
 -   Choose which documents to keep:
 
     .. code:: sh
@@ -106,51 +116,24 @@ def run(keep: Document,
         logger.info("Keeping both documents.")
 
 
-@click.command("merge")
-@click.help_option("-h", "--help")
-@papis.cli.query_argument()
-@papis.cli.sort_option()
-@papis.cli.bool_flag(
-    "-s", "--second",
-    help="Keep the second document after merge and erase the first "
-         "(the default is to keep the first).")
-@papis.cli.bool_flag(
-    "-p", "--pick",
-    help="If your picker does not support picking two documents"
-         " at once, call the picker twice to get two documents.")
-@papis.cli.bool_flag(
-    "-k", "--keep", "keep_both",
-    help="Keep both documents.")
-@click.option("-o",
-              "--out",
-              help="Create the resulting document in this path.",
-              default=None)
-@papis.cli.git_option(help="Merge in git.")
-def cli(query: str,
-        sort_field: str | None,
-        out: str | None,
-        second: bool,
-        git: bool,
-        keep_both: bool,
-        sort_reverse: bool,
-        pick: bool) -> None:
-    """Merge two documents from a given library."""
-    from papis.database import get_database
-
-    db = get_database()
-    documents = db.query(query)
-
-    from papis.document import describe, from_folder, sort, to_dict
-
-    if sort_field:
-        documents = sort(documents, sort_field, sort_reverse)
+def merge_documents(documents: list[Document],
+                    out: str | None = None,
+                    second: bool = False,
+                    keep_both: bool = False,
+                    pick: bool = False,
+                    git: bool = False) -> tuple[Document, Document] | None:
+    """Interactively pick two of the *documents* and merge them.
 
-    if not documents:
-        from papis.strings import no_documents_retrieved_message
-        logger.warning(no_documents_retrieved_message)
-        return
+    The arguments have the same meaning as the corresponding command-line
+    flags of ``papis merge``.
 
+    :returns: a tuple ``(keep, erase)`` of the document that was kept and the
+        one that was merged into it or *None* if no documents were merged (or
+        the result was saved in *out*).
+    """
+    from papis.document import describe, from_folder, to_dict
     from papis.pick import pick_doc
+
     documents = pick_doc(documents)
 
     if pick:
@@ -161,7 +144,7 @@ def cli(query: str,
         logger.error(
             "You have to pick exactly two documents (picked %d)!",
             len(documents))
-        return
+        return None
 
     a = documents[0]
     data_a = to_dict(a)
@@ -188,7 +171,7 @@ def cli(query: str,
         files += [doc.get_files()[i] for i in indices]
 
     if not confirm("Are you sure you want to merge?"):
-        return
+        return None
 
     keep = b if second else a
     erase = a if second else b
@@ -205,6 +188,98 @@ def cli(query: str,
         keep.update(data_a)
         keep.save()
         logger.info("Saving the new document in '%s'.", out)
-        return
+        return None
 
     run(keep, erase, data_a, files, keep_both, git)
+    return keep, erase
+
+
+@click.command("merge")
+@click.help_option("-h", "--help")
+@papis.cli.query_argument()
+@papis.cli.sort_option()
+@papis.cli.bool_flag(
+    "-s", "--second",
+    help="Keep the second document after merge and erase the first "
+         "(the default is to keep the first).")
+@papis.cli.bool_flag(
+    "-p", "--pick",
+    help="If your picker does not support picking two documents"
+         " at once, call the picker twice to get two documents.")
+@papis.cli.bool_flag(
+    "-k", "--keep", "keep_both",
+    help="Keep both documents.")
+@click.option("-o",
+              "--out",
+              help="Create the resulting document in this path.",
+              default=None)
+@papis.cli.bool_flag(
+    "-d", "--duplicates",
+    help="Find clusters of duplicate documents among the matching documents "
+         "and merge each cluster in turn.")
+@click.option(
+    "--threshold",
+    help="Minimum similarity (between 0 and 1) of duplicate documents.",
+    type=click.FloatRange(0.0, 1.0),
+    default=None)
+@papis.cli.git_option(help="Merge in git.")
+def cli(query: str,
+        sort_field: str | None,
+        out: str | None,
+        second: bool,
+        git: bool,
+        keep_both: bool,
+        sort_reverse: bool,
+        pick: bool,
+        duplicates: bool,
+        threshold: float | None) -> None:
+    """Merge two documents from a given library."""
+    from papis.database import get_database
+
+    db = get_database()
+    documents = db.query(query)
+
+    from papis.document import describe, sort
+
+    if sort_field:
+        documents = sort(documents, sort_field, sort_reverse)
+
+    if not documents:
+        from papis.strings import no_documents_retrieved_message
+        logger.warning(no_documents_retrieved_message)
+        return
+
+    if not duplicates:
+        merge_documents(documents,
+                        out=out, second=second, keep_both=keep_both,
+                        pick=pick, git=git)
+        return
+
+    if out is not None:
+        logger.error("Cannot use '--out' together with '--duplicates'.")
+        return
+
+    from papis.duplicates import DUPLICATE_SIMILARITY_THRESHOLD, find_duplicates
+
+    if threshold is None:
+        threshold = DUPLICATE_SIMILARITY_THRESHOLD
+
+    clusters = find_duplicates(documents, threshold=threshold)
+    logger.info("Found %d clusters of duplicate documents.", len(clusters))
+
+    for i, cluster in enumerate(clusters):
+        logger.info("Merging cluster %d/%d: ['%s'].",
+                    i + 1, len(clusters),
+                    "', '".join(describe(doc) for doc in cluster))
+
+        # NOTE: documents are merged in pairs, so the cluster is merged again
+        # (without the erased document) until only one document is left
+        while len(cluster) > 1:
+            result = merge_documents(cluster,
+                                     second=second, keep_both=keep_both,
+                                     pick=pick, git=git)
+            if result is None or keep_both:
+                break
+
+            _, erase = result
+            cluster = [doc for doc in cluster if doc is not erase]
@@ -487,15 +487,19 @@ def cli(
 
     # Move
     papis.config.set_lib_from_name(source_library)
-    for move in moves.values():
-        try:
-            run(move.document, str(move.target), target_library=target_library, git=git)
-        except Exception as exc:
-            if batch:
-                logger.warning(
-                    "Failed to move '%s': %s",
-                    papis.document.describe(move.document),
-                    exc,
-                )
-                continue
-            raise
+    from papis.git import transaction as git_transaction
+
+    with git_transaction(f"Move {len(moves)} documents"):
+        for move in moves.values():
+            try:
+                run(move.document, str(move.target),
+                    target_library=target_library, git=git)
+            except Exception as exc:
+                if batch:
+                    logger.warning(
+                        "Failed to move '%s': %s",
+                        papis.document.describe(move.document),
+                        exc,
+                    )
+                    continue
+                raise
@@ -130,50 +130,52 @@ def cli(query: str,
         logger.warning(no_documents_retrieved_message)
         return
 
+    from papis.git import transaction as git_transaction
     from papis.tui.utils import confirm, text_area
 
-    if _file:
-        from papis.pick import pick
-
-        for document in documents:
-            filepaths = pick(document.get_files())
-            if not filepaths:
-                continue
-            filepath = filepaths[0]
-            if not force:
-                tbar = f"The file {filepath} would be removed"
-                if not confirm("Are you sure?", bottom_toolbar=tbar):
-                    continue
-            logger.info("Removing file '%s' from document.", filepath)
-            run(document, filepath=filepath, git=git)
-
-    if _notes:
-        for document in documents:
-            if "notes" not in document:
-                continue
-            notespath = os.path.join(
-                str(document.get_main_folder()),
-                document["notes"]
-            )
-            if not force:
-                tbar = f"The file {notespath} would be removed"
-                if not confirm("Are you sure?", bottom_toolbar=tbar):
+    with git_transaction():
+        if _file:
+            from papis.pick import pick
+
+            for document in documents:
+                filepaths = pick(document.get_files())
+                if not filepaths:
                     continue
-            logger.info("Removing notes: '%s'.", notespath)
-            run(document, notespath=notespath, git=git)
-
-    if not (_file or _notes):
-        from papis.document import describe, dump
-
-        for document in documents:
-            if not force:
-                logger.warning("Removing folder: '%s'.", document.get_main_folder())
-                text_area(
-                    text=dump(document),
-                    title="This document will be removed",
-                    lexer_name="yaml")
-                if not confirm("Do you want to remove the document?"):
+                filepath = filepaths[0]
+                if not force:
+                    tbar = f"The file {filepath} would be removed"
+                    if not confirm("Are you sure?", bottom_toolbar=tbar):
+                        continue
+                logger.info("Removing file '%s' from document.", filepath)
+                run(document, filepath=filepath, git=git)
+
+        if _notes:
+            for document in documents:
+                if "notes" not in document:
                     continue
-
-            run(document, git=git)
-            logger.warning("Document removed: '%s'.", describe(document))
+                notespath = os.path.join(
+                    str(document.get_main_folder()),
+                    document["notes"]
+                )
+                if not force:
+                    tbar = f"The file {notespath} would be removed"
+                    if not confirm("Are you sure?", bottom_toolbar=tbar):
+                        continue
+                logger.info("Removing notes: '%s'.", notespath)
+                run(document, notespath=notespath, git=git)
+
+        if not (_file or _notes):
+            from papis.document import describe, dump
+
+            for document in documents:
+                if not force:
+                    logger.warning("Removing folder: '%s'.", document.get_main_folder())
+                    text_area(
+                        text=dump(document),
+                        title="This document will be removed",
+                        lexer_name="yaml")
+                    if not confirm("Do you want to remove the document?"):
+                        continue
+
+                run(document, git=git)
+                logger.warning("Document removed: '%s'.", describe(document))
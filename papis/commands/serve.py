@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import collections
 import functools
 import http.server
 import json
@@ -23,7 +22,6 @@ if TYPE_CHECKING:
 logger = papis.logging.get_logger(__name__)
 
 USE_GIT = False
-TAGS_LIST: dict[str, dict[str, int] | None] = {}
 
 
 AnyFn = Callable[..., Any]
@@ -225,23 +223,16 @@ class PapisRequestHandler(http.server.BaseHTTPRequestHandler):
     @ok_html
     def page_tags(self, libname: str | None = None,
                   sort_by: str | None = None) -> None:
-        from papis.api import get_all_documents_in_lib, get_lib_name
+        from papis.api import get_lib_name
         libname = libname or get_lib_name()
         self._handle_lib(libname)
-        docs = get_all_documents_in_lib(libname)
 
-        from papis.web.tags import ensure_tags_list, html
-        tags_of_tags = [tag
-                        for d in docs
-                        for tag in ensure_tags_list(d["tags"])]
-        if TAGS_LIST.get(libname) is None:
-            TAGS_LIST[libname] = collections.defaultdict(int)
-            for tag in tags_of_tags:
-                TAGS_LIST[libname][tag] += 1  # type: ignore[index]
+        from papis.database import get_database
+        from papis.web.tags import html
 
         page = html(libname=libname,
                     pretitle="TAGS",
-                    tags=TAGS_LIST[libname] or {},
+                    tags=get_database(libname).facets("tags"),
                     sort_by=sort_by or "")
 
         self.wfile.write(bytes(str(page), "utf-8"))
@@ -253,7 +244,17 @@ class PapisRequestHandler(http.server.BaseHTTPRequestHandler):
         libname = libname or get_lib_name()
 
         self._handle_lib(libname)
-        TAGS_LIST[libname] = None
+
+        from papis.database import get_database
+        from papis.database.facets import FacetIndex
+
+        # NOTE: the counts are kept up to date by the database, but they can
+        # still be recomputed here if anything goes out of sync
+        db = get_database(libname)
+        for index in db.get_indices():
+            if isinstance(index, FacetIndex):
+                index.rebuild(db.get_all_documents())
+
         self.redirect(f"/library/{libname}/tags")
 
     @ok_html
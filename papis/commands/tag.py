@@ -39,6 +39,16 @@ Examples
   also use ``--drop`` by itself to simply remove all tags without adding new
   ones.
 
+- Use ``--list`` (or ``-l``) to list all the tags in the library together
+  with the number of documents that have them:
+
+    .. code:: sh
+
+        papis tag --list
+
+  The counts are kept up to date by the database (see :confval:`facet-keys`),
+  so this does not need to go through all the documents.
+
 - Use ``--all`` (or ``-a``) with any of the other options to apply the tagging
   operation to all matching documents:
 
@@ -67,11 +77,50 @@ import papis.logging
 from papis.commands.update import _OrderedCommand
 
 if TYPE_CHECKING:
+    from click.shell_completion import CompletionItem
+
     from papis.strings import AnyString
 
 logger = papis.logging.get_logger(__name__)
 
 
+def _tag_shell_complete(ctx: click.Context,
+                        param: click.Parameter,
+                        incomplete: str) -> list[CompletionItem]:
+    """Return completion items for the existing tags in the library."""
+    import logging
+
+    from click.shell_completion import CompletionItem
+
+    import papis.config
+    from papis.database.facets import get_facet_index
+
+    lib = ctx.parent.params.get("lib") if ctx.parent else None
+
+    # NOTE: suppress all logging to avoid spamming the screen during completion
+    with papis.logging.quiet("papis", level=logging.ERROR):
+        try:
+            library = (
+                papis.config.get_lib() if lib is None
+                else papis.config.get_lib_from_name(lib))
+        except RuntimeError:
+            # nonexistent library name
+            return []
+
+        if papis.config.getboolean("use-facet-index"):
+            counts = get_facet_index(library).get_counts("tags")
+        else:
+            from papis.database import get_database
+            counts = get_database(library.name).facets("tags")
+
+    if counts is None:
+        return []
+
+    return [CompletionItem(tag, help=f"{count} documents")
+            for tag, count in sorted(counts.items())
+            if tag.startswith(incomplete)]
+
+
 @click.command("tag", cls=_OrderedCommand)
 @click.help_option("--help", "-h")
 @papis.cli.git_option()
@@ -85,12 +134,14 @@ logger = papis.logging.get_logger(__name__)
     help="Add a tag.",
     multiple=True,
     type=papis.cli.FormatPatternParamType(),
+    shell_complete=_tag_shell_complete,
 )
 @click.option(
     "-r", "--remove", "to_remove",
     help="Remove a tag.",
     multiple=True,
     type=papis.cli.FormatPatternParamType(),
+    shell_complete=_tag_shell_complete,
 )
 @click.option(
     "-n", "--rename", "to_rename",
@@ -98,6 +149,10 @@ logger = papis.logging.get_logger(__name__)
     multiple=True,
     type=(papis.cli.FormatPatternParamType(), papis.cli.FormatPatternParamType()),
 )
+@papis.cli.bool_flag(
+    "-l", "--list", "_list",
+    help="List all the tags in the library and their number of documents.",
+)
 @papis.cli.bool_flag(
     "-b",
     "--batch",
@@ -115,6 +170,7 @@ def cli(
     to_append: list[AnyString],
     to_remove: list[AnyString],
     to_rename: list[tuple[AnyString, AnyString]],
+    _list: bool,
     batch: bool,
     sort_field: str | None,
     sort_reverse: bool,
@@ -126,6 +182,15 @@ def cli(
     Change a document's tags.
     """
 
+    if _list:
+        from papis.database import get_database
+
+        tags = get_database().facets("tags")
+        for tag, count in sorted(tags.items(), key=lambda item: (-item[1], item[0])):
+            click.echo(f"{count:>6} {tag}")
+
+        return
+
     # retrieve documents
     documents = papis.cli.handle_doc_folder_query_all_sort(
         query, doc_folder, sort_field, sort_reverse, _all
@@ -159,52 +224,58 @@ def cli(
 
     ret = 0
     updated = 0
-    for i, document in enumerate(documents):
-        logger.info("[%d/%d] Applying metadata changes for document: %s.",
-                    i + 1, len(documents), describe(document))
+    from papis.database import get_database
+    from papis.git import transaction as git_transaction
+
+    db = get_database()
+    with (git_transaction(f"Update tags for {len(documents)} documents"),
+          db.batch()):
+        for i, document in enumerate(documents):
+            logger.info("[%d/%d] Applying metadata changes for document: %s.",
+                        i + 1, len(documents), describe(document))
+
+            tags = document.get("tags", [])
+            if not isinstance(tags, list):
+                logger.info("Document tags are not a list: %s. You can use "
+                            "'papis doctor --checks field-type --fix' to automatically "
+                            "convert all tags to lists.",
+                            type(tags))
+                logger.error("'papis tag' only supports list tags. Skipping...")
+
+                ret = 1
+                continue
 
-        tags = document.get("tags", [])
-        if not isinstance(tags, list):
-            logger.info("Document tags are not a list: %s. You can use "
-                        "'papis doctor --checks field-type --fix' to automatically "
-                        "convert all tags to lists.",
-                        type(tags))
-            logger.error("'papis tag' only supports list tags. Skipping...")
+            try:
+                new_data, status = _apply_operations(
+                    document, operations,
+                    field_types=field_types)
+            except Exception as exc:
+                logger.error("Failed to apply metadata changes to document: %s.",
+                             describe(document), exc_info=exc)
+                ret = 1
+                continue
 
-            ret = 1
-            continue
+            if ApplyStatus.Failed in status:
+                ret = 1
 
-        try:
-            new_data, status = _apply_operations(
-                document, operations,
-                field_types=field_types)
-        except Exception as exc:
-            logger.error("Failed to apply metadata changes to document: %s.",
-                         describe(document), exc_info=exc)
-            ret = 1
-            continue
-
-        if ApplyStatus.Failed in status:
-            ret = 1
-
-        if ApplyStatus.Changed not in status:
-            continue
-
-        if ApplyStatus.Failed in status:
-            if not batch and ask_confirm(
-                "Encountered errors while updating document tags. Skip it?"
-            ):
+            if ApplyStatus.Changed not in status:
                 continue
 
-        try:
-            run(document, data=new_data, git=git, auto_doctor=False, overwrite=True)
-        except Exception as exc:
-            logger.error("Failed to apply metadata changes to document: %s.",
-                         describe(document), exc_info=exc)
-            ret = 1
-            continue
-
-        updated += 1
+            if ApplyStatus.Failed in status:
+                if not batch and ask_confirm(
+                    "Encountered errors while updating document tags. Skip it?"
+                ):
+                    continue
+
+            try:
+                run(document, data=new_data, git=git, auto_doctor=False, overwrite=True)
+            except Exception as exc:
+                logger.error("Failed to apply metadata changes to document: %s.",
+                             describe(document), exc_info=exc)
+                ret = 1
+                continue
+
+            updated += 1
 
     logger.info("Updated %d / %d documents.", updated, len(documents))
     ctx.exit(ret)
@@ -238,6 +238,15 @@ if TYPE_CHECKING:
 
 logger = papis.logging.get_logger(__name__)
 
+#: Interval (in seconds) at which the progress of a ``papis update`` run over
+#: multiple documents is reported.
+UPDATE_PROGRESS_INTERVAL = 30
+
+#: Number of documents that are updated in a single database batch (see
+#: :meth:`papis.database.base.Database.batch`). The checkpoint file is also
+#: written after each batch is committed.
+UPDATE_BATCH_SIZE = 100
+
 
 class OperationError(Exception):
     """Error occurring during validation or application of an operation."""
@@ -878,6 +887,48 @@ def run(
 # flags into lists for the same type, so any order is lost. Only the parser
 # seems to know the original order, so we get it from there.
 
+def get_checkpoint_path(params: dict[str, Any]) -> str:
+    """Get the path to the checkpoint file for a ``papis update`` run.
+
+    The checkpoint file contains the Papis IDs of all the documents that were
+    already processed by an interrupted run, one per line. Its name depends on
+    the current library and the given command-line *params*, so that only runs
+    of the same command share a checkpoint.
+    """
+    import hashlib
+
+    from papis.utils import get_cache_home
+
+    folder = os.path.join(get_cache_home(), "update")
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+
+    lib = papis.config.get_lib()
+    key = repr((lib.path, sorted(params.items())))
+    name = hashlib.md5(key.encode()).hexdigest()
+
+    return os.path.join(folder, f"{name}.txt")
+
+
+def _write_checkpoint(path: str | None, documents: Iterable[Document]) -> None:
+    if path is None:
+        return
+
+    from papis.id import ID_KEY_NAME
+
+    with open(path, "a", encoding="utf-8") as fd:
+        fd.writelines(f"{doc[ID_KEY_NAME]}\n"
+                      for doc in documents if ID_KEY_NAME in doc)
+
+
+def _read_checkpoint(path: str) -> set[str]:
+    if not os.path.exists(path):
+        return set()
+
+    with open(path, encoding="utf-8") as fd:
+        return {line.strip() for line in fd if line.strip()}
+
+
 class _Option(NamedTuple):
     """A :class:`click.Option` look-alike that remembers the argument name."""
     name: str | None
@@ -932,6 +983,12 @@ class _OrderedCommand(click.Command):
     default=(),
 )
 @papis.cli.bool_flag("--list-importers", help="List all supported importers.")
+@papis.cli.bool_flag(
+    "--resume/--no-resume",
+    help="Skip documents already updated by a previous interrupted run of "
+         "the same command with '--auto' or '--from'.",
+    default=False,
+)
 @click.option(
     "-s", "--set", "to_set",
     help="Set the key to the given value.",
@@ -983,6 +1040,7 @@ def cli(
     doc_folder: tuple[str, ...],
     from_importer: list[tuple[str, str]],
     list_importers: bool,
+    resume: bool,
     batch: bool,
     auto: bool,
     auto_doctor: bool,
@@ -1003,6 +1061,7 @@ def cli(
         get_available_importers,
         get_matching_importers_by_doc,
         get_matching_importers_by_name,
+        iter_fetched_importers,
     )
 
     if list_importers:
@@ -1031,7 +1090,10 @@ def cli(
         return
 
     if from_importer:
-        from_importers = get_matching_importers_by_name(from_importer)
+        # NOTE: these do not depend on the document, so they are only fetched once
+        from_importers = fetch_importers(
+            get_matching_importers_by_name(from_importer),
+            download_files=False)
     else:
         from_importers = []
 
@@ -1050,96 +1112,178 @@ def cli(
     known_field_types = get_document_field_types()
 
     from papis.document import describe
+    from papis.id import ID_KEY_NAME
     from papis.tui.utils import confirm as ask_confirm
 
+    # skip documents that were processed by a previous (interrupted) run
+    checkpoint_path = None
+    if auto or from_importer:
+        checkpoint_path = get_checkpoint_path({
+            k: v for k, v in ctx.params.items() if k != "resume"})
+
+        done = _read_checkpoint(checkpoint_path) if resume else set()
+        if done:
+            ndocuments = len(documents)
+            documents = [doc for doc in documents
+                         if str(doc.get(ID_KEY_NAME)) not in done]
+
+            logger.info("Resuming previous run: skipping %d already processed "
+                        "documents.", ndocuments - len(documents))
+
+        # NOTE: start a new checkpoint file (keeping the resumed documents), so
+        # that a checkpoint is never reused unless '--resume' is given
+        with open(checkpoint_path, "w", encoding="utf-8") as fd:
+            fd.writelines(f"{papis_id}\n" for papis_id in sorted(done))
+
+    # fetch metadata for the upcoming documents in the background
+    if auto and not from_importer:
+        fetched_importers = iter_fetched_importers(
+            (get_matching_importers_by_doc(doc) for doc in documents),
+            download_files=False,
+            max_workers=papis.config.getint("update-fetch-workers") or 1,
+            rate_limit=papis.config.getfloat("update-fetch-rate-limit") or 0.0)
+    else:
+        fetched_importers = (from_importers for _ in documents)
+
+    import time
+    from contextlib import ExitStack, closing
+
+    from papis.database import get_database
+
     ret = 0
     updated = 0
-    for i, document in enumerate(documents):
-        logger.info("[%d/%d] Gathering metadata changes for document: %s.",
-                    i + 1, len(documents), describe(document))
+    processed = 0
+    begin_t = last_t = time.time()
+    from papis.git import transaction as git_transaction
 
-        # apply changes to document
-        try:
-            new_data, status = _apply_operations(
-                document, operations,
-                field_types=known_field_types)
-        except Exception as exc:
-            # NOTE: this should generally not happen, unless there's a bug or
-            # the database is in an inconsistent state, so we just move on
-            logger.error("Failed to apply metadata changes to document: %s.",
-                         describe(document), exc_info=exc)
-            ret = 1
-            continue
-
-        if ApplyStatus.Failed in status:
-            ret = 1
-
-        # get metadata from importers and merge them all together
-        if from_importer:
-            importers = from_importers
-        elif auto:
-            importers = get_matching_importers_by_doc(document)
-        else:
-            importers = []
+    db = get_database()
+    done_documents: list[Document] = []
 
-        importers = fetch_importers(importers, download_files=False)
-        imported = collect_from_importers(importers, batch=batch, use_files=False)
+    # NOTE: the fetched importers are closed explicitly, so that the pending
+    # fetches are cancelled if the loop exits early (the `db_batch` stack is
+    # closed periodically, so it cannot be used for this)
+    completed = False
+    try:
+        with (git_transaction(f"Update information for {len(documents)} documents"),
+              closing(fetched_importers),
+              ExitStack() as db_batch):
+            db_batch.enter_context(db.batch())
+
+            for i, (document, importers) in enumerate(
+                    zip(documents, fetched_importers, strict=True)):
+                processed += 1
+
+                # NOTE: commit the database changes once in a while, so that an
+                # interrupted run can be resumed from the checkpoint
+                if len(done_documents) >= UPDATE_BATCH_SIZE:
+                    db_batch.close()
+                    _write_checkpoint(checkpoint_path, done_documents)
+                    done_documents.clear()
+                    db_batch.enter_context(db.batch())
+
+                now = time.time()
+                if i > 0 and now - last_t > UPDATE_PROGRESS_INTERVAL:
+                    rate = i / (now - begin_t)
+                    logger.info("Progress: %d / %d documents (%.1f documents/s, "
+                                "about %.0fs remaining).",
+                                i, len(documents), rate, (len(documents) - i) / rate)
+                    last_t = now
+
+                logger.info("[%d/%d] Gathering metadata changes for document: %s.",
+                            i + 1, len(documents), describe(document))
+
+                # apply changes to document
+                try:
+                    new_data, status = _apply_operations(
+                        document, operations,
+                        field_types=known_field_types)
+                except Exception as exc:
+                    # NOTE: this should generally not happen, unless there's a bug or
+                    # the database is in an inconsistent state, so we just move on
+                    logger.error("Failed to apply metadata changes to document: %s.",
+                                 describe(document), exc_info=exc)
+                    ret = 1
+                    continue
 
-        # merge user and importer data
-        # FIXME: add interactive merging to avoid overwriting user changes
-        for key, value in imported.data.items():
-            if new_data.get(key) == value:
-                continue
+                if ApplyStatus.Failed in status:
+                    ret = 1
 
-            new_data[key] = value
-            status |= ApplyStatus.Changed
+                # merge metadata from the (already fetched) importers
+                imported = collect_from_importers(importers,
+                                                  batch=batch,
+                                                  use_files=False)
 
-        if ApplyStatus.Changed not in status:
-            continue
+                # merge user and importer data
+                # FIXME: add interactive merging to avoid overwriting user changes
+                for key, value in imported.data.items():
+                    if new_data.get(key) == value:
+                        continue
 
-        if ApplyStatus.Failed in status:
-            if not batch and ask_confirm(
-                "Encountered errors while updating document. Skip it?"
-            ):
-                continue
+                    new_data[key] = value
+                    status |= ApplyStatus.Changed
 
-        logger.info("[%d/%d] Applying metadata changes to document: %s.",
-                    i + 1, len(documents), describe(document))
+                if ApplyStatus.Changed not in status:
+                    done_documents.append(document)
+                    continue
 
-        try:
-            # NOTE: data contains all the fields in doc (modified by the flags),
-            # so we want to just overwrite it with them => overwrite=True
-            run(document, new_data, git=git, auto_doctor=auto_doctor, overwrite=True)
-        except OSError as exc:
-            logger.error("Failed to rename files for document: %s",
-                         describe(document), exc_info=exc)
-            ret = 1
-            if batch:
-                continue
-
-            if ask_confirm(
-                "Failed to rename document files. Continue processing the "
-                "remaining documents?"
-            ):
-                continue
-            else:
-                break
-        except Exception as exc:
-            logger.error("Failed to apply changes to document: %s",
-                         describe(document), exc_info=exc)
-            ret = 1
-            if batch:
-                continue
-
-            if ask_confirm(
-                "Failed to update document. Continue processing the "
-                "remaining documents?"
-            ):
-                continue
-            else:
-                break
+                if ApplyStatus.Failed in status:
+                    if not batch and ask_confirm(
+                        "Encountered errors while updating document. Skip it?"
+                    ):
+                        continue
 
-        updated += 1
+                logger.info("[%d/%d] Applying metadata changes to document: %s.",
+                            i + 1, len(documents), describe(document))
+
+                try:
+                    # NOTE: data contains all the fields in doc (modified by the flags),
+                    # so we want to just overwrite it with them => overwrite=True
+                    run(document, new_data,
+                        git=git, auto_doctor=auto_doctor, overwrite=True)
+                except OSError as exc:
+                    logger.error("Failed to rename files for document: %s",
+                                 describe(document), exc_info=exc)
+                    ret = 1
+                    if batch:
+                        continue
+
+                    if ask_confirm(
+                        "Failed to rename document files. Continue processing the "
+                        "remaining documents?"
+                    ):
+                        continue
+                    else:
+                        break
+                except Exception as exc:
+                    logger.error("Failed to apply changes to document: %s",
+                                 describe(document), exc_info=exc)
+                    ret = 1
+                    if batch:
+                        continue
+
+                    if ask_confirm(
+                        "Failed to update document. Continue processing the "
+                        "remaining documents?"
+                    ):
+                        continue
+                    else:
+                        break
+
+                updated += 1
+                done_documents.append(document)
+            else:
+                completed = True
+    finally:
+        # NOTE: the database changes are committed when the batch exits, so the
+        # checkpoint is only written afterwards (also on errors or Ctrl-C)
+        _write_checkpoint(checkpoint_path, done_documents)
 
     logger.info("Updated %d / %d documents.", updated, len(documents))
+    logger.debug("Processed %d documents in %.1fs.",
+                 processed, time.time() - begin_t)
+
+    # NOTE: the run was not interrupted, so there is nothing left to resume
+    if checkpoint_path is not None and completed:
+        os.remove(checkpoint_path)
+
     ctx.exit(ret)
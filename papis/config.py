@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import configparser
 import os
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, NamedTuple
 
 import click
 import platformdirs
@@ -38,6 +38,99 @@ OVERRIDE_VARS: dict[str, str | None] = {
 GENERAL_SETTINGS_NAME = "settings"
 
 
+class SettingsCacheStats(NamedTuple):
+    """Statistics about the cache of resolved settings (see
+    :func:`get_settings_cache_stats`).
+    """
+
+    #: Number of lookups that were answered from the cache.
+    hits: int
+    #: Number of lookups that had to be resolved from the configuration.
+    misses: int
+    #: Total time (in seconds) spent resolving the misses.
+    time: float
+
+
+class _SettingsCache:
+    def __init__(self) -> None:
+        self.values: dict[tuple[str, str, str | None], Any] = {}
+
+        self.configuration: Configuration | None = None
+        self.library: Library | None = None
+        self.defaults: PapisConfigType | None = None
+
+        self.hits = 0
+        self.misses = 0
+        self.time = 0.0
+
+
+# NOTE: used to mark settings that are missing from the configuration
+_MISSING_SETTING = object()
+
+_SETTINGS_CACHE = _SettingsCache()
+
+
+def clear_settings_cache() -> None:
+    """Clear the cache of resolved settings.
+
+    Settings are resolved once (see :func:`general_get`) and then cached until
+    the configuration or the current library change. This is done
+    automatically, e.g. by :func:`set`, :func:`set_lib` or
+    :func:`reset_configuration`, so this function only needs to be called when
+    modifying the configuration in some other way.
+    """
+    _SETTINGS_CACHE.values.clear()
+
+
+def get_settings_cache_stats() -> SettingsCacheStats:
+    """Get statistics about the cache of resolved settings."""
+    cache = _SETTINGS_CACHE
+    return SettingsCacheStats(cache.hits, cache.misses, cache.time)
+
+
+def _get_cached_setting(kind: str,
+                        key: str,
+                        section: str | None,
+                        resolve: Callable[..., Any],
+                        *args: Any) -> Any:
+    cache = _SETTINGS_CACHE
+
+    # NOTE: also check the global state directly, since it can be replaced
+    # without going through the functions in this module (e.g. in tests)
+    if (cache.configuration is not CURRENT_CONFIGURATION
+            or cache.library is not CURRENT_LIBRARY
+            or cache.defaults is not DEFAULT_SETTINGS):
+        cache.values.clear()
+        cache.configuration = CURRENT_CONFIGURATION
+        cache.library = CURRENT_LIBRARY
+        cache.defaults = DEFAULT_SETTINGS
+
+    cache_key = (kind, key, section)
+    value = cache.values.get(cache_key, cache)
+    if value is not cache:
+        cache.hits += 1
+        if value is _MISSING_SETTING:
+            qualified_key = key if section is None else f"{section}-{key}"
+            raise DefaultSettingValueMissing(qualified_key)
+
+        return value
+
+    import time
+
+    begin_t = time.perf_counter()
+    try:
+        value = resolve(key, section, *args)
+    except DefaultSettingValueMissing:
+        cache.values[cache_key] = _MISSING_SETTING
+        raise
+    finally:
+        cache.misses += 1
+        cache.time += time.perf_counter() - begin_t
+
+    cache.values[cache_key] = value
+    return value
+
+
 def get_general_settings_name() -> str:
     """Get the section name of the general settings.
 
@@ -74,6 +167,25 @@ class Configuration(configparser.ConfigParser):
         }
         self.initialize()
 
+    # NOTE: modifications (other than reading files) go through these methods,
+    # so they are used to invalidate the cache of resolved settings
+
+    def set(self, section: str, option: str, value: str | None = None) -> None:
+        clear_settings_cache()
+        super().set(section, option, value)
+
+    def add_section(self, section: str) -> None:
+        clear_settings_cache()
+        super().add_section(section)
+
+    def remove_section(self, section: str) -> bool:
+        clear_settings_cache()
+        return super().remove_section(section)
+
+    def remove_option(self, section: str, option: str) -> bool:
+        clear_settings_cache()
+        return super().remove_option(section, option)
+
     def handle_includes(self) -> None:
         if "include" not in self:
             return
@@ -203,6 +315,7 @@ def register_default_settings(settings_dictionary: PapisConfigType) -> None:
         defines the actual configuration settings.
     """
     default_settings = get_default_settings()
+    clear_settings_cache()
 
     # NOTE: this updates existing sections in place
     for section, settings in settings_dictionary.items():
@@ -363,6 +476,14 @@ def general_get(key: str,
     :param data_type: the data type that should be expected for the value of
         the variable.
     """
+    return _get_cached_setting(
+        "raw" if data_type is None else data_type.__name__, key, section,
+        _resolve_setting, data_type)
+
+
+def _resolve_setting(key: str,
+                     section: str | None,
+                     data_type: type | None) -> Any | None:
     config = get_configuration()
     libname = get_lib_name()
     global_section = get_general_settings_name()
@@ -535,6 +656,11 @@ def getformatpattern(key: str,
         >>> r.formatter
         'python'
     """
+    return _get_cached_setting(  # type: ignore[no-any-return]
+        "formatpattern", key, section, _resolve_format_pattern)
+
+
+def _resolve_format_pattern(key: str, section: str | None) -> FormatPattern:
     from papis.format import get_available_formatters
 
     formatter = getstring("formatter")
@@ -577,6 +703,11 @@ def getlist(key: str, section: str | None = None) -> list[str]:
     :raises papis.exceptions.UnexpectedSettingTypeError: Whenever the parsed
         syntax is either not a valid python object or not a valid python list.
     """
+    # NOTE: return a copy, so that callers cannot modify the cached value
+    return list(_get_cached_setting("list", key, section, _resolve_list))
+
+
+def _resolve_list(key: str, section: str | None) -> list[str]:
     rawvalue: Any = general_get(key, section=section)
     if isinstance(rawvalue, list):
         return list(map(str, rawvalue))
@@ -628,6 +759,7 @@ def merge_configuration_from_path(path: str | None,
     logger.debug("Merging configuration from '%s'.", path)
     configuration.read(path)
     configuration.handle_includes()
+    clear_settings_cache()
 
 
 def set_lib(library: Library) -> None:
@@ -640,6 +772,14 @@ def set_lib(library: Library) -> None:
         # NOTE: can't use set(...) here due to cyclic dependencies
         config[library.name] = {"dir": escape_interp(library.path)}
 
+    # NOTE: this is called on every `get_lib` when `PAPIS_LIB` is set, so keep
+    # the same object (and the cached settings) if nothing changed
+    if (CURRENT_LIBRARY is not None
+            and CURRENT_LIBRARY.name == library.name
+            and CURRENT_LIBRARY.path == library.path):
+        return
+
+    clear_settings_cache()
     CURRENT_LIBRARY = library
 
 
@@ -834,6 +974,7 @@ def reset_configuration() -> Configuration:
 
     global CURRENT_CONFIGURATION
     CURRENT_CONFIGURATION = None
+    clear_settings_cache()
 
     logger.debug("Resetting configuration.")
     return get_configuration()
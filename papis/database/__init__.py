@@ -14,21 +14,25 @@ logger = papis.logging.get_logger(__name__)
 DATABASES: dict[str, Database] = {}
 
 
-def _instantiate_database(backend_name: str,
-                          library: Library) -> Database:
+def _get_database_class(backend_name: str) -> type[Database]:
     if backend_name == "papis":
         from papis.database.cache import PickleDatabase
-        return PickleDatabase(library)
+        return PickleDatabase
     elif backend_name == "sqlite":
         from papis.database.sqlite import SQLiteDatabase
-        return SQLiteDatabase(library)
+        return SQLiteDatabase
     elif backend_name == "whoosh":
         from papis.database.whoosh import WhooshDatabase
-        return WhooshDatabase(library)
+        return WhooshDatabase
     else:
         raise ValueError(f"Invalid database backend: '{backend_name}'")
 
 
+def _instantiate_database(backend_name: str,
+                          library: Library) -> Database:
+    return _get_database_class(backend_name)(library)
+
+
 def get_database(library_name: str | None = None) -> Database:
     """Get the database for the library *library_name*.
 
@@ -60,8 +64,13 @@ def get(library_name: str | None = None) -> Database:
 
 
 def get_all_query_string() -> str:
-    """Get the default query string for the current database."""
-    return get().get_all_query_string()
+    """Get the default query string for the current database.
+
+    This does not load the database, so it is cheap to call even if no database
+    was created yet.
+    """
+    backend = papis.config.getstring("database-backend") or "papis"
+    return _get_database_class(backend).get_all_query_string()
 
 
 def clear_cached() -> None:
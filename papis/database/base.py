@@ -1,13 +1,35 @@
 from __future__ import annotations
 
+import json
 import os
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, ClassVar
+
+import papis.logging
 
 if TYPE_CHECKING:
+    from collections.abc import Generator, Iterable, Sequence
+
     from papis.document import Document
     from papis.library import Library
 
+logger = papis.logging.get_logger(__name__)
+
+
+class JSONEncoder(json.JSONEncoder):
+    """A JSON encoder used to store documents in the database backends."""
+
+    def default(self, obj: object) -> Any:
+        import datetime
+
+        # NOTE: this is needed because PyYAML automatically transforms ISO dates to
+        # a `datetime.date` object, which the JSON encoder does not natively support.
+        if isinstance(obj, datetime.date):
+            return obj.isoformat()
+
+        return super().default(obj)
+
 
 def get_cache_file_name(libpath: str) -> str:
     """Create a cache file name out of the path of a given directory.
@@ -41,6 +63,302 @@ def get_cache_file_path(libpath: str) -> str:
     return os.path.join(folder, cache_name)
 
 
+class DatabaseIndex(ABC):
+    """Abstract base class for auxiliary indices kept in sync with a database.
+
+    Database backends notify their indices (see :meth:`Database.get_indices`)
+    whenever documents are added, updated or deleted, so that the indices can
+    be updated incrementally instead of being rebuilt from the full library.
+    Documents are identified by their Papis ID (see :data:`papis.id.ID_KEY_NAME`).
+    """
+
+    @abstractmethod
+    def rebuild(self, documents: Iterable[Document]) -> None:
+        """Recreate the index from scratch from the given *documents*."""
+
+    @abstractmethod
+    def add(self, document: Document) -> None:
+        """Add a new document to the index."""
+
+    @abstractmethod
+    def delete(self, document: Document) -> None:
+        """Remove a document from the index."""
+
+    def add_many(self, documents: Iterable[Document]) -> None:
+        """Add multiple new documents to the index.
+
+        By default, this calls :meth:`add` for each document, but indices can
+        override it to only write their changes to disk once.
+        """
+        for document in documents:
+            self.add(document)
+
+    def update(self, document: Document) -> None:
+        """Replace an existing document in the index."""
+        self.delete(document)
+        self.add(document)
+
+    def update_many(self, documents: Iterable[Document]) -> None:
+        """Replace (or add) multiple documents in the index.
+
+        By default, this calls :meth:`update` for each document, but indices can
+        override it to only write their changes to disk once.
+        """
+        for document in documents:
+            self.update(document)
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all the data (in memory and on disk) stored by the index."""
+
+
+#: Maximum number of records in the journal of a :class:`JSONDatabaseIndex`.
+#: Once the journal grows larger than this, it is merged into the index file
+#: the next time the index is loaded.
+INDEX_JOURNAL_MAX_RECORDS = 1000
+
+
+def _dump_journal_line(data: Any) -> str:
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":"))
+
+
+class JSONDatabaseIndex(DatabaseIndex):
+    """Base class for auxiliary indices that are stored as JSON files.
+
+    Rewriting the whole index file whenever a document changes would make each
+    modification of the database take a time proportional to the size of the
+    library. Instead, incremental changes are appended to a journal next to the
+    index file and replayed when the index is loaded, so that they do not need
+    to load the index at all. The journal is merged back into the index file
+    when it becomes longer than :data:`INDEX_JOURNAL_MAX_RECORDS`.
+
+    The index file contains a header (see :meth:`get_header`), e.g. a version
+    and the settings that the index depends on, that is checked when loading.
+    If it does not match, the index needs to be rebuilt. The journal is created
+    together with the index file and it starts with a copy of this header, so
+    that changes made with different settings are not added to it.
+
+    Incremental changes are ignored if the index does not exist yet. It is only
+    created by :meth:`rebuild`.
+
+    All the on-disk caches and indices (including the ones that are not stored
+    as JSON) have a format version. It should be increased whenever the format,
+    or the values that are stored, change, so that old files are rebuilt.
+    """
+
+    #: A short description of the index used in log messages.
+    name: ClassVar[str] = "index"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._loaded = False
+
+    @property
+    def journal_path(self) -> str:
+        """Path to the journal of incremental changes to the index."""
+        return f"{self.path}.journal"
+
+    @abstractmethod
+    def get_header(self) -> dict[str, Any]:
+        """Get the values that must match in the index file to load it."""
+
+    @abstractmethod
+    def _get_data(self) -> dict[str, Any]:
+        """Get the contents of the index that are stored in the index file."""
+
+    @abstractmethod
+    def _set_data(self, data: dict[str, Any] | None) -> None:
+        """Set the contents of the index from the index file (or reset them)."""
+
+    @abstractmethod
+    def _make_record(self, document: Document) -> Any:
+        """Get the data stored in the index for *document* (or *None*)."""
+
+    @abstractmethod
+    def _add_record(self, papis_id: str, record: Any) -> None:
+        """Add the *record* of a document to the index."""
+
+    @abstractmethod
+    def _delete_record(self, papis_id: str) -> None:
+        """Remove the record of a document from the index, if any."""
+
+    def load(self) -> bool:
+        """Load the index from disk, if it exists and it is up to date.
+
+        :returns: *True* if the index was loaded successfully and *False* if
+            it needs to be rebuilt using :meth:`rebuild`.
+        """
+        if self._loaded:
+            return True
+
+        if not os.path.exists(self.path):
+            return False
+
+        try:
+            with open(self.path, encoding="utf-8") as fd:
+                data = json.load(fd)
+        except (OSError, ValueError) as exc:
+            logger.debug("Failed to read %s at '%s'.",
+                         self.name, self.path, exc_info=exc)
+            return False
+
+        header = self.get_header()
+        if any(data.get(key) != value for key, value in header.items()):
+            logger.debug("The %s at '%s' is outdated.", self.name, self.path)
+            return False
+
+        self._set_data(data)
+        self._loaded = True
+
+        if self._replay_journal(header) > INDEX_JOURNAL_MAX_RECORDS:
+            self.save()
+
+        return True
+
+    def save(self) -> None:
+        """Write the index to disk and start a new (empty) journal."""
+        if not self._loaded:
+            return
+
+        header = self.get_header()
+        data = {**header, **self._get_data()}
+
+        # NOTE: write to a temporary file first so that a concurrent reader
+        # never sees a partially written index
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fd:
+            json.dump(data, fd, ensure_ascii=False, separators=(",", ":"))
+
+        tmp_journal_path = f"{self.journal_path}.tmp"
+        with open(tmp_journal_path, "w", encoding="utf-8") as fd:
+            fd.write(f"{_dump_journal_line(header)}\n")
+
+        os.replace(tmp_path, self.path)
+        os.replace(tmp_journal_path, self.journal_path)
+
+    def _replay_journal(self, header: dict[str, Any]) -> int:
+        try:
+            with open(self.journal_path, encoding="utf-8") as fd:
+                lines = fd.readlines()
+        except OSError as exc:
+            logger.debug("Failed to read %s journal at '%s'.",
+                         self.name, self.journal_path, exc_info=exc)
+            lines = []
+
+        if not lines or lines[0].rstrip("\n") != _dump_journal_line(header):
+            # NOTE: the journal is recreated, since it cannot be used anymore
+            logger.debug("Discarding outdated %s journal at '%s'.",
+                         self.name, self.journal_path)
+            self.save()
+            return 0
+
+        nrecords = 0
+        for line in lines[1:]:
+            try:
+                papis_id, record = json.loads(line)
+            except ValueError:
+                # NOTE: this can happen if a write was interrupted
+                logger.debug("Skipping invalid line in %s journal: '%s'.",
+                             self.name, line)
+                continue
+
+            self._apply(papis_id, record)
+            nrecords += 1
+
+        return nrecords
+
+    def _apply(self, papis_id: str, record: Any) -> None:
+        self._delete_record(papis_id)
+        if record is not None:
+            self._add_record(papis_id, record)
+
+    def _append_to_journal(self, changes: list[tuple[str, Any]]) -> None:
+        # NOTE: the journal is created together with the index, so if it does
+        # not exist, there is no index to update either
+        if not changes or not os.path.exists(self.journal_path):
+            return
+
+        with open(self.journal_path, encoding="utf-8") as fd:
+            if fd.readline().rstrip("\n") != _dump_journal_line(self.get_header()):
+                logger.debug("Not updating outdated %s journal at '%s'.",
+                             self.name, self.journal_path)
+                return
+
+        # NOTE: all the lines are written at once, so that concurrent writers
+        # are less likely to interleave their changes
+        with open(self.journal_path, "a", encoding="utf-8") as fd:
+            fd.write("".join(f"{_dump_journal_line(change)}\n" for change in changes))
+
+    def _update_many(self, documents: Iterable[Document]) -> None:
+        from papis.id import ID_KEY_NAME
+
+        changes = []
+        for document in documents:
+            papis_id = document.get(ID_KEY_NAME)
+            if papis_id is None:
+                continue
+
+            changes.append((str(papis_id), self._make_record(document)))
+
+        if self._loaded:
+            for papis_id, record in changes:
+                self._apply(papis_id, record)
+
+        self._append_to_journal(changes)
+
+    def rebuild(self, documents: Iterable[Document]) -> None:
+        logger.debug("Rebuilding %s at '%s'.", self.name, self.path)
+
+        from papis.id import ID_KEY_NAME
+
+        self._set_data(None)
+        self._loaded = True
+
+        for document in documents:
+            papis_id = document.get(ID_KEY_NAME)
+            if papis_id is None:
+                continue
+
+            record = self._make_record(document)
+            if record is not None:
+                self._add_record(str(papis_id), record)
+
+        self.save()
+
+    def add(self, document: Document) -> None:
+        self._update_many([document])
+
+    def add_many(self, documents: Iterable[Document]) -> None:
+        self._update_many(documents)
+
+    def update(self, document: Document) -> None:
+        self._update_many([document])
+
+    def update_many(self, documents: Iterable[Document]) -> None:
+        self._update_many(documents)
+
+    def delete(self, document: Document) -> None:
+        from papis.id import ID_KEY_NAME
+
+        papis_id = document.get(ID_KEY_NAME)
+        if papis_id is None:
+            return
+
+        change = (str(papis_id), None)
+        if self._loaded:
+            self._apply(*change)
+
+        self._append_to_journal([change])
+
+    def clear(self) -> None:
+        self._set_data(None)
+        self._loaded = False
+
+        for path in (self.path, self.journal_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
 class Database(ABC):
     """Abstract base class for Papis caching database backends."""
 
@@ -54,6 +372,10 @@ class Database(ABC):
             raise TypeError(f"Provided library has unsupported type: {type(library)}")
 
         self.lib = library
+        self._indices: list[DatabaseIndex] | None = None
+
+        self._in_batch = False
+        self._pending_index_changes: dict[Any, tuple[Document, bool]] = {}
 
     @abstractmethod
     def get_backend_name(self) -> str:
@@ -67,8 +389,9 @@ class Database(ABC):
     def get_cache_path(self) -> str:
         """Get the path to the database cache file (or directory)."""
 
+    @classmethod
     @abstractmethod
-    def get_all_query_string(self) -> str:
+    def get_all_query_string(cls) -> str:
         """Get the default query string that will match all documents."""
 
     @abstractmethod
@@ -92,6 +415,15 @@ class Database(ABC):
     def add(self, document: Document) -> None:
         """Add a new document to the database."""
 
+    def add_many(self, documents: Iterable[Document]) -> None:
+        """Add multiple new documents to the database.
+
+        By default, this calls :meth:`add` for each document. Backends should
+        override it to commit all the documents at once.
+        """
+        for document in documents:
+            self.add(document)
+
     @abstractmethod
     def update(self, document: Document) -> None:
         """Replace an existing document in the database."""
@@ -100,6 +432,45 @@ class Database(ABC):
     def delete(self, document: Document) -> None:
         """Remove a document from the database."""
 
+    @contextmanager
+    def batch(self) -> Generator[None, None, None]:
+        """A context manager that groups all modifications in a single commit.
+
+        All calls to :meth:`add`, :meth:`add_many`, :meth:`update` and
+        :meth:`delete` inside this context are written to the database storage
+        (and its auxiliary indices) only once, when the context exits. If an
+        exception is raised, the changes made before it are still written, since
+        callers usually modify the documents on disk as they go, and the
+        exception is propagated. Nested calls join the outermost batch.
+
+        .. code:: python
+
+            with db.batch():
+                for doc in documents:
+                    db.update(doc)
+        """
+        if self._in_batch:
+            yield
+            return
+
+        self._in_batch = True
+        try:
+            with self._batch():
+                yield
+        finally:
+            self._in_batch = False
+            self._flush_pending_index_changes()
+
+    @contextmanager
+    def _batch(self) -> Generator[None, None, None]:  # ruff:ignore[no-self-use]
+        """Group the modifications to the database storage made in a :meth:`batch`.
+
+        Backends should override this to commit all the changes made inside the
+        context at once (e.g. in a single transaction), also when an exception is
+        raised. By default, each change is committed on its own.
+        """
+        yield
+
     @abstractmethod
     def query(self, query_string: str) -> list[Document]:
         """Find a document in the database by the given *query_string*.
@@ -116,6 +487,128 @@ class Database(ABC):
     def get_all_documents(self) -> list[Document]:
         """Get all documents in the database."""
 
+    def get_indices(self) -> list[DatabaseIndex]:
+        """Get the auxiliary indices that are kept in sync with this database.
+
+        Backends are expected to call :meth:`_add_to_indices`,
+        :meth:`_update_indices`, :meth:`_delete_from_indices` and
+        :meth:`_clear_indices` whenever they modify their own storage.
+        """
+        if self._indices is None:
+            self._indices = self._create_indices()
+
+        return self._indices
+
+    def _create_indices(self) -> list[DatabaseIndex]:
+        """Create the auxiliary indices used by this database.
+
+        Backends can override this to add additional indices.
+        """
+        import papis.config
+
+        indices: list[DatabaseIndex] = []
+        if papis.config.getboolean("use-completion-index"):
+            from papis.database.completion import CompletionIndex
+            indices.append(CompletionIndex(self.lib))
+
+        if papis.config.getboolean("use-unique-key-index"):
+            from papis.database.unique import UniqueKeyIndex
+            indices.append(UniqueKeyIndex(self.lib))
+
+        if papis.config.getboolean("use-facet-index"):
+            from papis.database.facets import FacetIndex
+            indices.append(FacetIndex(self.lib))
+
+        return indices
+
+    def facets(self, key: str) -> dict[str, int]:
+        """Count the number of documents with each value of *key*.
+
+        If :confval:`use-facet-index` is enabled, the counts for the keys in
+        :confval:`facet-keys` are kept up to date in a
+        :class:`~papis.database.facets.FacetIndex`, so no documents need to be
+        loaded. Otherwise, all the documents in the library are counted.
+
+        :returns: a mapping from each distinct value of *key* (see
+            :func:`~papis.database.facets.get_facet_values`) to the number of
+            documents that have it.
+        """
+        from papis.database.facets import FacetIndex, count_facet_values
+
+        for index in self.get_indices():
+            if not isinstance(index, FacetIndex):
+                continue
+
+            if not index.load():
+                index.rebuild(self.get_all_documents())
+
+            counts = index.get_counts(key)
+            if counts is not None:
+                return counts
+
+        return count_facet_values(self.get_all_documents(), key)
+
+    def _defer_index_change(self, document: Document, deleted: bool) -> None:
+        from papis.id import ID_KEY_NAME
+
+        # NOTE: only the last change to each document needs to be applied
+        papis_id = document.get(ID_KEY_NAME)
+        key = id(document) if papis_id is None else str(papis_id)
+        self._pending_index_changes[key] = (document, deleted)
+
+    def _flush_pending_index_changes(self) -> None:
+        changes, self._pending_index_changes = self._pending_index_changes, {}
+        if not changes:
+            return
+
+        deleted = [doc for doc, is_deleted in changes.values() if is_deleted]
+        updated = [doc for doc, is_deleted in changes.values() if not is_deleted]
+
+        for index in self.get_indices():
+            for document in deleted:
+                index.delete(document)
+
+            if updated:
+                index.update_many(updated)
+
+    def _add_to_indices(self, document: Document) -> None:
+        if self._in_batch:
+            self._defer_index_change(document, deleted=False)
+            return
+
+        for index in self.get_indices():
+            index.add(document)
+
+    def _add_many_to_indices(self, documents: Sequence[Document]) -> None:
+        if self._in_batch:
+            for document in documents:
+                self._defer_index_change(document, deleted=False)
+            return
+
+        for index in self.get_indices():
+            index.add_many(documents)
+
+    def _update_indices(self, document: Document) -> None:
+        if self._in_batch:
+            self._defer_index_change(document, deleted=False)
+            return
+
+        for index in self.get_indices():
+            index.update(document)
+
+    def _delete_from_indices(self, document: Document) -> None:
+        if self._in_batch:
+            self._defer_index_change(document, deleted=True)
+            return
+
+        for index in self.get_indices():
+            index.delete(document)
+
+    def _clear_indices(self) -> None:
+        self._pending_index_changes = {}
+        for index in self.get_indices():
+            index.clear()
+
     def find_by_id(self, identifier: str) -> Document | None:
         """Find a document in the library by its Papis ID *identifier*."""
         from papis.id import ID_KEY_NAME
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
 import os
+from contextlib import contextmanager
 from typing import TYPE_CHECKING
 
 import papis.config
 import papis.logging
-from papis.database.base import Database, get_cache_file_path
+import papis.stats
+from papis.database.base import Database, DatabaseIndex, get_cache_file_path
 
 if TYPE_CHECKING:
     import re
+    from collections.abc import Generator, Iterable, Sequence
 
+    from papis.database.cachefile import DocumentList
+    from papis.database.trigram import TrigramIndex
+    from papis.docmatcher import DocumentIndex
     from papis.document import Document
     from papis.library import Library
     from papis.strings import AnyString
@@ -17,12 +23,25 @@ if TYPE_CHECKING:
 logger = papis.logging.get_logger(__name__)
 
 
-def filter_documents(documents: list[Document],
-                     search: str = "") -> list[Document]:
+def filter_documents(documents: Sequence[Document],
+                     search: str = "", *,
+                     index: DocumentIndex | None = None,
+                     candidates: set[int] | None = None) -> list[Document]:
     """Filter documents based on the *search* string.
 
+    The search string is parsed and reordered using
+    :func:`~papis.docmatcher.plan_query` and then evaluated using a
+    :class:`~papis.docmatcher.DocumentIndex`, so that cheap ``key:value`` pairs
+    are used to reduce the number of documents before matching any other terms.
+
     :param search: a search string that will be parsed by
         :class:`~papis.docmatcher.parse_query`.
+    :param index: an existing index for *documents*. If not given, a new index
+        is created for this query only.
+    :param candidates: positions of the documents in *documents* that can
+        match the search (e.g. as determined by a
+        :class:`~papis.database.trigram.TrigramIndex`). If not given, all the
+        documents are checked.
     :returns: a list of filtered documents.
 
     >>> document = papis.document.from_data({'author': 'einstein'})
@@ -34,26 +53,20 @@ def filter_documents(documents: list[Document],
     False
 
     """
-    from papis.docmatcher import make_document_matcher
+    from papis.docmatcher import DocumentIndex, parse_query, plan_query
 
-    match = make_document_matcher(search)
     logger.debug("Filtering %d docs (search '%s').", len(documents), search)
 
-    import sys
     import time
 
     t_start = time.time()
 
-    # FIXME: find a better solution for this that works for both OSes
-    if sys.platform == "win32":
-        filtered_docs = [d for d in documents if match(d)]
-    else:
-        from papis.utils import parmap
+    if index is None:
+        index = DocumentIndex(documents)
 
-        result = parmap(match, documents)
-        filtered_docs = [
-            d for matched, d in zip(result, documents, strict=True) if matched
-        ]
+    query = plan_query(parse_query(search))
+    match_format = papis.config.getformatpattern("match-format")
+    filtered_docs = index.filter(query, match_format, candidates=candidates)
 
     t_delta = 1000 * (time.time() - t_start)
     logger.debug("Finished querying in %.2fms (%d docs).", t_delta, len(filtered_docs))
@@ -82,6 +95,33 @@ def match_document(
     return search.match(match_string)
 
 
+def _maybe_compact_documents(documents: Iterable[Document]) -> list[Document]:
+    if not papis.config.getboolean("compact-documents"):
+        return list(documents)
+
+    from papis.document import CompactDocument
+
+    return [CompactDocument.from_document(doc) for doc in documents]
+
+
+def _load_legacy_cache(path: str) -> DocumentList | None:
+    import pickle
+
+    from papis.database.cachefile import DocumentList
+
+    try:
+        with open(path, "rb") as fd:
+            documents = pickle.load(fd)
+    except Exception as exc:
+        logger.debug("Failed to read legacy cache at '%s'.", path, exc_info=exc)
+        return None
+
+    if not isinstance(documents, list):
+        return None
+
+    return DocumentList(documents)
+
+
 class PickleDatabase(Database):
     """A caching database backend for Papis based on :mod:`pickle`."""
 
@@ -89,7 +129,12 @@ class PickleDatabase(Database):
         super().__init__(library)
 
         self.use_cache = papis.config.getboolean("use-cache")
-        self.documents: list[Document] | None = None
+        self.documents: DocumentList | None = None
+        self.document_index: DocumentIndex | None = None
+
+        self._defer_save = False
+        self._unsaved = False
+
         self.initialize()
 
     def get_backend_name(self) -> str:  # ruff:ignore[no-self-use]
@@ -98,7 +143,8 @@ class PickleDatabase(Database):
     def get_cache_path(self) -> str:
         return self._get_cache_file_path()
 
-    def get_all_query_string(self) -> str:  # ruff:ignore[no-self-use]
+    @classmethod
+    def get_all_query_string(cls) -> str:
         return "."
 
     def initialize(self) -> None:
@@ -107,14 +153,18 @@ class PickleDatabase(Database):
         _ = self._get_documents()
 
     def clear(self) -> None:
+        # NOTE: the cache file needs to be closed before it can be removed
+        if self.documents is not None:
+            self.documents.clear()
+            self.documents = None
+
         cache_path = self._get_cache_file_path()
         if os.path.exists(cache_path):
             logger.info("Clearing cache at '%s'.", cache_path)
             os.remove(cache_path)
 
-        if self.documents:
-            self.documents.clear()
-            self.documents = None
+        self.document_index = None
+        self._clear_indices()
 
     def add(self, document: Document) -> None:
         if not self.use_cache:
@@ -132,9 +182,37 @@ class PickleDatabase(Database):
         docs = self._get_documents()
 
         self.maybe_compute_id(document)
-        docs.append(document)
+        docs.extend(_maybe_compact_documents([document]))
+        self.document_index = None
+
+        self._save_documents()
+        self._add_to_indices(document)
+
+    def add_many(self, documents: Iterable[Document]) -> None:
+        if not self.use_cache:
+            return
+
+        documents = list(documents)
+        for document in documents:
+            folder = document.get_main_folder()
+            if folder is None:
+                raise ValueError(
+                    "Cannot add a document without a main folder to database")
+
+            if not os.path.exists(folder):
+                raise ValueError(f"Document folder '{folder}' does not exist")
+
+        logger.debug("Adding %d documents.", len(documents))
+        docs = self._get_documents()
+
+        for document in documents:
+            self.maybe_compute_id(document)
+
+        docs.extend(_maybe_compact_documents(documents))
+        self.document_index = None
 
         self._save_documents()
+        self._add_many_to_indices(documents)
 
     def update(self, document: Document) -> None:
         if not self.use_cache:
@@ -150,8 +228,10 @@ class PickleDatabase(Database):
             raise DocumentFolderNotFound(describe(document))
 
         index, _ = result[0]
-        docs[index] = document
+        docs[index] = _maybe_compact_documents([document])[0]
+        self.document_index = None
         self._save_documents()
+        self._update_indices(document)
 
     def delete(self, document: Document) -> None:
         if not self.use_cache:
@@ -168,41 +248,113 @@ class PickleDatabase(Database):
 
         index, _ = result[0]
         docs.pop(index)
+        self.document_index = None
         self._save_documents()
+        self._delete_from_indices(document)
+
+    @contextmanager
+    def _batch(self) -> Generator[None, None, None]:
+        """Only write the cache file once at the end of a batch."""
+        self._defer_save = True
+        try:
+            yield
+        finally:
+            self._defer_save = False
+            if self._unsaved:
+                self._save_documents()
 
+    @papis.stats.timed("database.query")
     def query(self, query_string: str) -> list[Document]:
         logger.debug("Querying database for '%s'.", query_string)
 
         docs = self._get_documents()
         if query_string == self.get_all_query_string():
-            return docs
+            return list(docs)
+
+        if self.document_index is None or self.document_index.documents is not docs:
+            from papis.docmatcher import DocumentIndex
+            self.document_index = DocumentIndex(docs,
+                                                match_string=docs.get_match_string)
 
-        return filter_documents(docs, query_string)
+        candidates = None
+        trigram_index = self._get_trigram_index()
+        if trigram_index is not None:
+            from papis.docmatcher import parse_query
+
+            ids = trigram_index.candidates(parse_query(query_string))
+            if ids is not None:
+                logger.debug("Found %d candidates in trigram index.", len(ids))
+                candidates = {
+                    i for i in range(len(docs)) if docs.get_papis_id(i) in ids
+                }
+
+        return filter_documents(docs, query_string,
+                                index=self.document_index,
+                                candidates=candidates)
 
     def query_dict(self, query: dict[str, str]) -> list[Document]:
         query_string = " ".join(f'{key}:"{val}" ' for key, val in query.items())
         return self.query(query_string)
 
     def get_all_documents(self) -> list[Document]:
-        return self._get_documents()
+        return list(self._get_documents())
+
+    def find_by_id(self, identifier: str) -> Document | None:
+        # NOTE: this does not need to decode any other documents in the cache
+        docs = self._get_documents()
+        result = [i for i in range(len(docs)) if docs.get_papis_id(i) == identifier]
+        if len(result) > 1:
+            raise ValueError(f"More than one document matches the ID '{identifier}'")
+
+        return docs[result[0]] if result else None
+
+    def _create_indices(self) -> list[DatabaseIndex]:
+        indices = super()._create_indices()
+        if self.use_cache and papis.config.getboolean("use-trigram-index"):
+            from papis.database.trigram import TrigramIndex
+            indices.append(TrigramIndex(self.lib))
+
+        return indices
 
-    def _get_documents(self) -> list[Document]:
+    def _get_trigram_index(self) -> TrigramIndex | None:
+        from papis.database.trigram import TrigramIndex
+
+        for index in self.get_indices():
+            if isinstance(index, TrigramIndex):
+                if not index.load():
+                    index.rebuild(self._get_documents())
+
+                return index
+
+        return None
+
+    def _get_documents(self) -> DocumentList:
         if self.documents is not None:
             return self.documents
 
+        from papis.database.cachefile import DocumentList
+
         cache_path = self._get_cache_file_path()
         if self.use_cache and os.path.exists(cache_path):
             logger.debug("Getting documents from cache at '%s'.", cache_path)
+            with papis.stats.span("database.load"):
+                self.documents = DocumentList.from_file(cache_path)
+
+            if self.documents is None:
+                self.documents = _load_legacy_cache(cache_path)
+                if self.documents is not None:
+                    logger.info("Migrating cache at '%s' to the new format.",
+                                cache_path)
+                    self._save_documents()
 
-            import pickle
-            with open(cache_path, "rb") as fd:
-                self.documents = pickle.load(fd)
+        if self.documents is not None:
+            logger.debug("Loaded %d documents.", len(self.documents))
         elif self.lib.path:
-            from papis.utils import folders_to_documents, get_folders
+            from papis.utils import folders_to_documents, iter_folders
 
             logger.info("Indexing library. This might take a while...")
-            folders = get_folders(self.lib.path)
-            self.documents = folders_to_documents(folders)
+            self.documents = DocumentList(
+                folders_to_documents(iter_folders(self.lib.path)))
 
             from papis.id import ID_KEY_NAME
             logger.debug("Computing '%s' for each document.", ID_KEY_NAME)
@@ -210,22 +362,36 @@ class PickleDatabase(Database):
             for doc in self.documents:
                 self.maybe_compute_id(doc)
 
+            self.documents = DocumentList(_maybe_compact_documents(self.documents))
             if self.use_cache:
                 self._save_documents()
+
+            # NOTE: any existing indices are out of date after a reindex
+            self._clear_indices()
         else:
-            self.documents = []
+            self.documents = DocumentList()
 
-        logger.debug("Loaded %d documents.", len(self.documents))
         return self.documents
 
     def _save_documents(self) -> None:
+        if self._defer_save:
+            self._unsaved = True
+            return
+
         docs = self._get_documents()
         logger.debug("Saving %d documents.", len(docs))
 
-        import pickle
-        path = self._get_cache_file_path()
-        with open(path, "wb+") as fd:
-            pickle.dump(docs, fd)
+        # NOTE: the trigram index is only valid for the current cache file, so
+        # it is loaded before the cache file changes and then updated in memory
+        from papis.database.trigram import TrigramIndex
+
+        for index in self.get_indices():
+            if isinstance(index, TrigramIndex):
+                index.load()
+
+        with papis.stats.span("database.save"):
+            docs.save(self._get_cache_file_path())
+        self._unsaved = False
 
     def _get_cache_file_path(self) -> str:
         return get_cache_file_path(self.lib.path)
@@ -237,17 +403,18 @@ class PickleDatabase(Database):
 
         # FIXME: Why are we iterating twice over the documents here?
         # first try to match by ID
+        docs = self._get_documents()
         result = [
-            (i, doc) for i, doc in enumerate(self._get_documents())
-            if doc[ID_KEY_NAME] == document[ID_KEY_NAME]
+            (i, docs[i]) for i in range(len(docs))
+            if docs.get_papis_id(i) == document[ID_KEY_NAME]
         ]
         if result:
             return result
 
         # if no documents match, try matching by main folder
         result = [
-            (i, doc) for i, doc in enumerate(self._get_documents())
-            if doc.get_main_folder() == document.get_main_folder()
+            (i, docs[i]) for i in range(len(docs))
+            if docs.get_folder(i) == document.get_main_folder()
         ]
         if result:
             return result
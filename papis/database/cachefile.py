@@ -0,0 +1,362 @@
+"""An on-disk format for the cache of the ``papis`` database backend.
+
+Unpickling all the documents in a large library can take a noticeable amount
+of time, even when a command only needs a single document (e.g. when looking
+it up by its Papis ID). Instead, the cache file stores each document as a
+separate pickled blob, together with a header that contains the Papis ID, the
+main folder, the :confval:`match-format` string and the location of each blob
+in the file::
+
+    +-------------+-----------+---------------+----------+------------------+
+    | magic bytes | version   | header size   | header   | document blobs   |
+    | (8 bytes)   | (4 bytes) | (8 bytes)     | (pickle) | (one pickle each)|
+    +-------------+-----------+---------------+----------+------------------+
+
+When loading the cache, only the header is read and the file is mapped into
+memory with :mod:`mmap`. Documents are then decoded on first access by
+:class:`DocumentList`. Queries that only match the :confval:`match-format` of
+the documents do not need to decode them at all (see
+:meth:`DocumentList.get_match_string`). When the cache is saved again, documents
+that were never accessed are copied over as raw bytes, without decoding them.
+
+Cache files written by older versions of Papis (a single pickle of all the
+documents) are not recognized by :meth:`DocumentList.from_file`, so that they
+can be migrated by the backend.
+"""
+from __future__ import annotations
+
+import os
+import pickle
+import struct
+from collections.abc import MutableSequence
+from typing import TYPE_CHECKING, Any, NamedTuple, overload
+
+import papis.config
+import papis.logging
+
+if TYPE_CHECKING:
+    import mmap
+    from collections.abc import Iterable, Iterator
+    from typing import BinaryIO
+
+    from papis.document import Document
+    from papis.strings import FormatPattern
+
+logger = papis.logging.get_logger(__name__)
+
+#: Magic bytes at the start of every cache file.
+CACHE_FILE_MAGIC = b"PAPISDB\x00"
+
+#: Version of the cache file format.
+CACHE_FILE_VERSION = 2
+
+# NOTE: magic bytes, version and header size (little-endian)
+_PREAMBLE = struct.Struct("<8sIQ")
+
+
+class CacheEntry(NamedTuple):
+    #: Papis ID of the document, if any.
+    papis_id: str | None
+    #: Main folder of the document, if any.
+    folder: str | None
+    #: Offset of the pickled document data from the start of the file.
+    offset: int
+    #: Size of the pickled document data.
+    size: int
+    #: The :confval:`match-format` of the document, if known.
+    match_string: str | None = None
+
+
+def _get_format_key(match_format: FormatPattern) -> tuple[str, str]:
+    formatter = match_format.formatter or papis.config.getstring("formatter")
+    return formatter, match_format.pattern
+
+
+def _to_dict(doc: Document) -> dict[str, Any]:
+    from papis.document import CompactDocument
+
+    # NOTE: compact documents would keep all their lazy values decoded otherwise
+    return doc.to_dict() if isinstance(doc, CompactDocument) else dict(doc)
+
+
+class DocumentList(MutableSequence["Document"]):
+    """A list of documents that are (possibly) decoded lazily from a cache file.
+
+    This behaves like a standard :class:`list` of documents. Additionally, the
+    Papis ID, main folder and match string of every document can be retrieved
+    without decoding it using :meth:`get_papis_id`, :meth:`get_folder` and
+    :meth:`get_match_string`.
+    """
+
+    def __init__(self, documents: Iterable[Document] = ()) -> None:
+        self._docs: list[Document | None] = list(documents)
+        self._entries: list[CacheEntry | None] = [None] * len(self._docs)
+        # NOTE: the (formatter, pattern) used for the match strings in the file
+        self._match_format: tuple[str, str] | None = None
+
+        self._fd: BinaryIO | None = None
+        self._mmap: mmap.mmap | None = None
+
+    @classmethod
+    def from_file(cls, path: str) -> DocumentList | None:
+        """Load the header of the cache file at *path*.
+
+        :returns: a list of lazily decoded documents or *None* if the file does
+            not exist or it is not a cache file in the current format.
+        """
+        if not os.path.exists(path):
+            return None
+
+        result = cls()
+        try:
+            result._open(path)
+        except Exception as exc:
+            logger.debug("Failed to read cache file at '%s': %s.", path, exc)
+            result.close()
+            return None
+
+        return result
+
+    def _open(self, path: str) -> None:
+        import mmap
+
+        self.close()
+
+        fd = open(path, "rb")
+        try:
+            preamble = fd.read(_PREAMBLE.size)
+            if len(preamble) < _PREAMBLE.size:
+                raise ValueError("file is too short")
+
+            magic, version, header_size = _PREAMBLE.unpack(preamble)
+            if magic != CACHE_FILE_MAGIC:
+                raise ValueError("file is not a cache file")
+
+            if version != CACHE_FILE_VERSION:
+                raise ValueError(f"unsupported version {version}")
+
+            header = pickle.loads(fd.read(header_size))
+            entries = [CacheEntry(*e) for e in header["entries"]]
+            self._mmap = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            fd.close()
+            raise
+
+        self._fd = fd
+        self._docs = [None] * len(entries)
+        self._entries = list(entries)
+        self._match_format = header["match_format"]
+
+    def close(self) -> None:
+        """Close the underlying cache file, if any.
+
+        All the documents that have not been decoded yet are decoded first, so
+        that the list can still be used afterwards.
+        """
+        if self._mmap is not None:
+            for i in range(len(self._docs)):
+                self._decode(i)
+
+            self._mmap.close()
+            self._mmap = None
+
+        if self._fd is not None:
+            self._fd.close()
+            self._fd = None
+
+    def _decode(self, i: int) -> Document:
+        doc = self._docs[i]
+        if doc is not None:
+            return doc
+
+        entry = self._entries[i]
+        assert entry is not None
+        assert self._mmap is not None
+
+        from papis.document import CompactDocument, Document
+
+        data = pickle.loads(self._mmap[entry.offset:entry.offset + entry.size])
+
+        # NOTE: the data was saved from a document, so it does not need to go
+        # through `Document.update` again
+        doc = Document()
+        dict.update(doc, data)
+        if entry.folder is not None:
+            doc.set_folder(entry.folder)
+
+        if papis.config.getboolean("compact-documents"):
+            doc = CompactDocument.from_document(doc)
+
+        self._docs[i] = doc
+        return doc
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __iter__(self) -> Iterator[Document]:
+        for i in range(len(self._docs)):
+            yield self._decode(i)
+
+    @overload
+    def __getitem__(self, i: int) -> Document: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> list[Document]: ...
+
+    def __getitem__(self, i: int | slice) -> Document | list[Document]:
+        if isinstance(i, slice):
+            return [self._decode(j) for j in range(*i.indices(len(self._docs)))]
+
+        if i < 0:
+            i += len(self._docs)
+
+        if not 0 <= i < len(self._docs):
+            raise IndexError("document index out of range")
+
+        return self._decode(i)
+
+    @overload
+    def __setitem__(self, i: int, doc: Document) -> None: ...
+
+    @overload
+    def __setitem__(self, i: slice, doc: Iterable[Document]) -> None: ...
+
+    def __setitem__(self, i: int | slice, doc: Any) -> None:
+        if isinstance(i, slice):
+            docs = list(doc)
+            self._docs[i] = docs
+            self._entries[i] = [None] * len(docs)
+        else:
+            self._docs[i] = doc
+            self._entries[i] = None
+
+    def __delitem__(self, i: int | slice) -> None:
+        del self._docs[i]
+        del self._entries[i]
+
+    def insert(self, i: int, doc: Document) -> None:
+        self._docs.insert(i, doc)
+        self._entries.insert(i, None)
+
+    def clear(self) -> None:
+        """Remove all the documents and close the underlying cache file."""
+        self._docs = []
+        self._entries = []
+        self.close()
+
+    def get_papis_id(self, i: int) -> str | None:
+        """Get the Papis ID of the *i*-th document without decoding it."""
+        doc = self._docs[i]
+        if doc is None:
+            entry = self._entries[i]
+            assert entry is not None
+            return entry.papis_id
+
+        from papis.id import ID_KEY_NAME
+
+        papis_id = doc.get(ID_KEY_NAME)
+        return None if papis_id is None else str(papis_id)
+
+    def get_folder(self, i: int) -> str | None:
+        """Get the main folder of the *i*-th document without decoding it."""
+        doc = self._docs[i]
+        if doc is None:
+            entry = self._entries[i]
+            assert entry is not None
+            return entry.folder
+
+        return doc.get_main_folder()
+
+    def get_match_string(self, i: int, match_format: FormatPattern) -> str:
+        """Get the *match_format* string of the *i*-th document.
+
+        If the string was stored in the cache file with the same format, the
+        document is not decoded. Otherwise, it is formatted from the document.
+        """
+        entry = self._entries[i]
+        if (entry is not None
+                and entry.match_string is not None
+                and self._match_format == _get_format_key(match_format)):
+            return entry.match_string
+
+        from papis.format import format
+
+        return format(match_format, self._decode(i))
+
+    def save(self, path: str) -> None:
+        """Write all the documents to a cache file at *path*.
+
+        Documents that have not been decoded are copied directly from the
+        current cache file. Afterwards, the list is backed by the new file.
+        """
+        import tempfile
+
+        match_format = papis.config.getformatpattern("match-format")
+
+        blobs: list[bytes] = []
+        entries: list[tuple[str | None, str | None, int, str]] = []
+        for i, doc in enumerate(self._docs):
+            entry = self._entries[i]
+            if doc is None:
+                assert entry is not None
+                assert self._mmap is not None
+
+                blob = self._mmap[entry.offset:entry.offset + entry.size]
+            else:
+                blob = pickle.dumps(_to_dict(doc), protocol=pickle.HIGHEST_PROTOCOL)
+
+            blobs.append(blob)
+            entries.append((self.get_papis_id(i), self.get_folder(i), len(blob),
+                            self.get_match_string(i, match_format)))
+
+        # NOTE: the header contains the offsets, which depend on its own size,
+        # so these are computed relative to the header first and then shifted
+        relative_entries = []
+        offset = 0
+        for papis_id, folder, size, match_string in entries:
+            relative_entries.append((papis_id, folder, offset, size, match_string))
+            offset += size
+
+        header_size = 0
+        while True:
+            start = _PREAMBLE.size + header_size
+            header = pickle.dumps({
+                "match_format": _get_format_key(match_format),
+                "entries": [
+                    (papis_id, folder, start + offset, size, match_string)
+                    for papis_id, folder, offset, size, match_string
+                    in relative_entries],
+                }, protocol=pickle.HIGHEST_PROTOCOL)
+
+            if len(header) == header_size:
+                break
+
+            header_size = len(header)
+
+        folder = os.path.dirname(path)
+        with tempfile.NamedTemporaryFile(
+                "wb", dir=folder, prefix=".cache-", delete=False) as fd:
+            fd.write(_PREAMBLE.pack(CACHE_FILE_MAGIC, CACHE_FILE_VERSION, header_size))
+            fd.write(header)
+            for blob in blobs:
+                fd.write(blob)
+
+        # NOTE: the old file cannot be replaced while it is still open on Windows,
+        # but all the documents that we need from it are in `blobs` now
+        docs = self._docs
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+        if self._fd is not None:
+            self._fd.close()
+            self._fd = None
+
+        os.replace(fd.name, path)
+        self._open(path)
+
+        # NOTE: keep the documents that were already decoded, since callers may
+        # hold references to them
+        for i, doc in enumerate(docs):
+            if doc is not None:
+                self._docs[i] = doc
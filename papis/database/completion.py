@@ -0,0 +1,217 @@
+"""A persistent index used to provide shell completions for documents.
+
+Shell completion is triggered every time the user presses TAB, so it should
+not query the database and format every matching document on each call. Instead,
+the completion strings (see :confval:`completion-format`) and their help text
+(see :confval:`completion-help-format`) are formatted once and stored in a
+sorted list in the cache directory. Prefix lookups are then a simple
+:func:`bisect.bisect_left` on that list, while substring lookups only need to
+go through the stored strings.
+
+If :confval:`use-completion-index` is enabled, the index is kept up to date by
+the database backends (see :class:`~papis.database.base.JSONDatabaseIndex`) and
+it is rebuilt from scratch whenever it is missing or the completion formats
+change.
+"""
+from __future__ import annotations
+
+import os
+import re
+from bisect import bisect_left, insort
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+import papis.config
+import papis.logging
+from papis.database.base import JSONDatabaseIndex, get_cache_file_name
+
+if TYPE_CHECKING:
+    from papis.document import Document
+    from papis.library import Library
+    from papis.strings import FormatPattern
+
+logger = papis.logging.get_logger(__name__)
+
+#: Version of the completion index format.
+COMPLETION_INDEX_VERSION = 1
+
+
+class CompletionEntry(NamedTuple):
+    #: Completion string sent to the shell (see :confval:`completion-format`).
+    completion: str
+    #: Papis ID of the document that the completion refers to.
+    papis_id: str
+    #: Help string sent to the shell (see :confval:`completion-help-format`).
+    help: str
+
+
+def clean_completion(s: str) -> str:
+    """Remove certain characters that are treated as completion breaks."""
+
+    # NOTE: See http://tiswww.case.edu/php/chet/bash/FAQ, E13 for the colon.
+    # NOTE: The comma causes the same problem in fish for a reason.
+    return re.sub(r"[:,]", "", s)
+
+
+def get_completion_index_path(libpath: str) -> str:
+    """Get the full path to the completion index file.
+
+    :param libpath: the path of the library for which to create the index.
+    """
+    from papis.utils import get_cache_home
+
+    folder = os.path.join(get_cache_home(), "database", "completion")
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+
+    return os.path.join(folder, f"{get_cache_file_name(libpath)}.json")
+
+
+def _format_key(fmt: FormatPattern) -> list[str | None]:
+    return [fmt.formatter, fmt.pattern]
+
+
+class CompletionIndex(JSONDatabaseIndex):
+    """A sorted list of completion entries for all the documents in a library.
+
+    The index is only loaded from disk when needed and it is never created by
+    the incremental update methods: if it does not exist yet, it will be
+    created from the full list of documents by :func:`get_completion_index`.
+    """
+
+    name = "completion index"
+
+    def __init__(self, library: Library) -> None:
+        super().__init__(get_completion_index_path(library.path))
+        self.lib = library
+
+        self._entries: list[CompletionEntry] | None = None
+        self._completion_by_id: dict[str, str] = {}
+
+    @property
+    def fmt(self) -> FormatPattern:
+        return papis.config.getformatpattern("completion-format")
+
+    @property
+    def help_fmt(self) -> FormatPattern:
+        return papis.config.getformatpattern("completion-help-format")
+
+    def get_header(self) -> dict[str, Any]:
+        return {
+            "version": COMPLETION_INDEX_VERSION,
+            "format": _format_key(self.fmt),
+            "help-format": _format_key(self.help_fmt),
+        }
+
+    def _get_data(self) -> dict[str, Any]:
+        return {"entries": self._entries}
+
+    def _set_data(self, data: dict[str, Any] | None) -> None:
+        entries = [] if data is None else [CompletionEntry(*e) for e in data["entries"]]
+
+        self._entries = entries
+        self._completion_by_id = {e.papis_id: e.completion for e in entries}
+
+    def _make_record(self, document: Document) -> list[str]:
+        from papis.format import format
+
+        return [clean_completion(format(self.fmt, document)),
+                clean_completion(format(self.help_fmt, document))]
+
+    def _add_record(self, papis_id: str, record: list[str]) -> None:
+        assert self._entries is not None
+
+        completion, help = record
+        insort(self._entries, CompletionEntry(completion, papis_id, help))
+        self._completion_by_id[papis_id] = completion
+
+    def _delete_record(self, papis_id: str) -> None:
+        self._remove_entry(papis_id)
+
+    def _remove_entry(self, papis_id: str) -> bool:
+        assert self._entries is not None
+
+        completion = self._completion_by_id.pop(papis_id, None)
+        if completion is None:
+            return False
+
+        i = bisect_left(self._entries, (completion, papis_id))
+        if i < len(self._entries) and self._entries[i].papis_id == papis_id:
+            del self._entries[i]
+
+        return True
+
+    def get(self, papis_id: str) -> CompletionEntry | None:
+        """Get the completion entry for the document with the given ID."""
+        assert self._entries is not None
+
+        completion = self._completion_by_id.get(papis_id)
+        if completion is None:
+            return None
+
+        i = bisect_left(self._entries, (completion, papis_id))
+        return self._entries[i]
+
+    def search(self,
+               prefix: str = "",
+               limit: int | None = None) -> list[CompletionEntry]:
+        """Find all completion entries that start with *prefix*.
+
+        :param prefix: a prefix for the completion strings. If empty, all the
+            entries in the index are returned.
+        :param limit: maximum number of entries to return. If *None* or not
+            positive, all matching entries are returned.
+        """
+        assert self._entries is not None
+
+        entries = self._entries
+        i = bisect_left(entries, (prefix,))
+
+        result = []
+        while i < len(entries) and entries[i].completion.startswith(prefix):
+            result.append(entries[i])
+            if limit and limit > 0 and len(result) >= limit:
+                break
+
+            i += 1
+
+        return result
+
+    def search_substring(self,
+                         text: str,
+                         limit: int | None = None) -> list[CompletionEntry]:
+        """Find all completion entries that contain *text*.
+
+        Unlike :meth:`search`, this goes through all the entries and matches
+        *text* case-insensitively in both the completion and the help strings.
+
+        :param limit: maximum number of entries to return. If *None* or not
+            positive, all matching entries are returned.
+        """
+        assert self._entries is not None
+
+        text = text.casefold()
+
+        result = []
+        for entry in self._entries:
+            if text in entry.completion.casefold() or text in entry.help.casefold():
+                result.append(entry)
+                if limit and limit > 0 and len(result) >= limit:
+                    break
+
+        return result
+
+
+def get_completion_index(library: Library) -> CompletionIndex:
+    """Get an up to date completion index for *library*.
+
+    If no index exists (or it is outdated), it is rebuilt from the documents in
+    the library database. Otherwise, the database is not touched at all.
+    """
+    index = CompletionIndex(library)
+    if not index.load():
+        from papis.database import get_database
+
+        db = get_database(library.name)
+        index.rebuild(db.get_all_documents())
+
+    return index
@@ -0,0 +1,202 @@
+"""A persistent index of the number of documents with each value of some keys.
+
+Some views of a library, such as the tag list in the web interface or the
+shell completion of tags, need to know all the distinct values of a key (a
+facet) and how many documents have each of them. Instead of loading every
+document to count them, the counts for the keys in :confval:`facet-keys` are
+stored in the cache directory, so that they can be retrieved in a time that
+only depends on the number of distinct values.
+
+Values are extracted from the documents by :func:`get_facet_values`. If
+:confval:`use-facet-index` is enabled, the index is kept up to date by the
+database backends (see :class:`~papis.database.base.JSONDatabaseIndex`) and it
+is rebuilt from scratch whenever it is missing or :confval:`facet-keys` changes.
+"""
+from __future__ import annotations
+
+import os
+import re
+from typing import TYPE_CHECKING, Any
+
+import papis.config
+import papis.logging
+from papis.database.base import JSONDatabaseIndex, get_cache_file_name
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from papis.document import Document, DocumentLike
+    from papis.library import Library
+
+logger = papis.logging.get_logger(__name__)
+
+#: Version of the facet index format (including the value extraction).
+FACET_INDEX_VERSION = 1
+
+#: Regular expression used to split tags given as a string. This is also used
+#: by the web interface (see :func:`papis.web.tags.ensure_tags_list`), so that
+#: the rendered tags always match the facet counts.
+TAGS_SPLIT_RX = re.compile(r"\s*[,\s]\s*")
+
+
+def get_facet_values(document: DocumentLike, key: str) -> list[str]:
+    """Get the distinct values of *key* in *document*.
+
+    Lists are split into their items. Additionally, some known keys get special
+    treatment: tags given as a string are split at commas and whitespace and
+    authors are taken from the ``author_list``, if available.
+
+    >>> get_facet_values({"tags": "physics, gravity physics"}, "tags")
+    ['physics', 'gravity']
+    >>> get_facet_values({"author_list": [{"family": "Einstein", "given": "A."}]},
+    ...                  "author")
+    ['Einstein, A.']
+    >>> get_facet_values({"year": 1905}, "year")
+    ['1905']
+    """
+    if key == "author" and document.get("author_list"):
+        values = [
+            ", ".join(str(a[k]) for k in ("family", "given") if a.get(k))
+            for a in document["author_list"]
+        ]
+    else:
+        value = document.get(key)
+        if value is None:
+            return []
+
+        if isinstance(value, list):
+            values = [str(v) for v in value]
+        elif key == "tags" and isinstance(value, str):
+            values = TAGS_SPLIT_RX.split(value)
+        else:
+            values = [str(value)]
+
+    return list(dict.fromkeys(v.strip() for v in values if v and v.strip()))
+
+
+def count_facet_values(documents: Iterable[DocumentLike], key: str) -> dict[str, int]:
+    """Count the number of documents with each value of *key*.
+
+    This goes through all the *documents*, so it should only be used for keys
+    that are not in a :class:`FacetIndex`.
+    """
+    result: dict[str, int] = {}
+    for doc in documents:
+        for value in get_facet_values(doc, key):
+            result[value] = result.get(value, 0) + 1
+
+    return result
+
+
+def get_facet_index_path(libpath: str) -> str:
+    """Get the full path to the facet index file.
+
+    :param libpath: the path of the library for which to create the index.
+    """
+    from papis.utils import get_cache_home
+
+    folder = os.path.join(get_cache_home(), "database", "facets")
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+
+    return os.path.join(folder, f"{get_cache_file_name(libpath)}.json")
+
+
+class FacetIndex(JSONDatabaseIndex):
+    """A mapping from the values of the :confval:`facet-keys` to their counts.
+
+    The values of each document are also stored (by Papis ID), so that the
+    counts can be decremented when a document is updated or deleted. The index
+    is only loaded from disk when needed and it is never created by the
+    incremental update methods: if it does not exist yet, it will be created
+    from the full list of documents by :func:`get_facet_index`.
+    """
+
+    name = "facet index"
+
+    def __init__(self, library: Library) -> None:
+        super().__init__(get_facet_index_path(library.path))
+        self.lib = library
+
+        self._counts: dict[str, dict[str, int]] | None = None
+        self._values_by_id: dict[str, dict[str, list[str]]] = {}
+
+    @property
+    def keys(self) -> list[str]:
+        return papis.config.getlist("facet-keys")
+
+    def get_header(self) -> dict[str, Any]:
+        return {"version": FACET_INDEX_VERSION, "keys": self.keys}
+
+    def _get_data(self) -> dict[str, Any]:
+        return {"counts": self._counts, "documents": self._values_by_id}
+
+    def _set_data(self, data: dict[str, Any] | None) -> None:
+        if data is None:
+            self._counts = {key: {} for key in self.keys}
+            self._values_by_id = {}
+        else:
+            self._counts = data["counts"]
+            self._values_by_id = data["documents"]
+
+    def _make_record(self, document: Document) -> dict[str, list[str]] | None:
+        values_by_key = {}
+        for key in self.keys:
+            values = get_facet_values(document, key)
+            if values:
+                values_by_key[key] = values
+
+        return values_by_key or None
+
+    def _add_record(self, papis_id: str, record: dict[str, list[str]]) -> None:
+        assert self._counts is not None
+
+        for key, values in record.items():
+            counts = self._counts.setdefault(key, {})
+            for value in values:
+                counts[value] = counts.get(value, 0) + 1
+
+        self._values_by_id[papis_id] = record
+
+    def _delete_record(self, papis_id: str) -> None:
+        assert self._counts is not None
+
+        values_by_key = self._values_by_id.pop(papis_id, None)
+        if values_by_key is None:
+            return
+
+        for key, values in values_by_key.items():
+            counts = self._counts[key]
+            for value in values:
+                counts[value] -= 1
+                if counts[value] <= 0:
+                    del counts[value]
+
+    def get_counts(self, key: str) -> dict[str, int] | None:
+        """Get the number of documents with each value of *key*.
+
+        :returns: a mapping from values to their counts or *None* if *key* is
+            not one of the :confval:`facet-keys`.
+        """
+        assert self._counts is not None
+
+        if key not in self.keys:
+            return None
+
+        return dict(self._counts.get(key, {}))
+
+
+def get_facet_index(library: Library) -> FacetIndex:
+    """Get an up to date facet index for *library*.
+
+    If no index exists (or it is outdated), it is rebuilt from the documents in
+    the library database. Otherwise, the database is not touched at all.
+    """
+    index = FacetIndex(library)
+    if not index.load():
+        from papis.database import get_database
+
+        db = get_database(library.name)
+        index.rebuild(db.get_all_documents())
+
+    return index
@@ -7,14 +7,15 @@ import sqlite3
 import time
 from contextlib import contextmanager
 from functools import cached_property
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING
 
 import papis.config
 import papis.logging
-from papis.database.base import Database
+import papis.stats
+from papis.database.base import Database, JSONEncoder
 
 if TYPE_CHECKING:
-    from collections.abc import Iterator, Sequence
+    from collections.abc import Generator, Iterable, Iterator, Sequence
 
     from papis.document import Document
     from papis.library import Library
@@ -145,18 +146,6 @@ def transaction(conn: sqlite3.Connection, mode: str = "DEFERRED") -> Iterator[No
         conn.commit()
 
 
-class JSONEncoder(json.JSONEncoder):
-    def default(self, obj: object) -> Any:
-        import datetime
-
-        # NOTE: this is needed because PyYAML automatically transforms ISO dates to
-        # a `datetime.date` object, which the JSON encoder does not natively support.
-        if isinstance(obj, datetime.date):
-            return obj.isoformat()
-
-        return super().default(obj)
-
-
 class SQLiteDatabase(Database):
     def __init__(self, library: Library | None = None) -> None:
         super().__init__(library)
@@ -213,7 +202,8 @@ class SQLiteDatabase(Database):
     def get_cache_path(self) -> str:
         return self.cache_file_name
 
-    def get_all_query_string(self) -> str:  # ruff:ignore[no-self-use]
+    @classmethod
+    def get_all_query_string(cls) -> str:
         return "*"
 
     def initialize(self) -> None:
@@ -245,6 +235,34 @@ class SQLiteDatabase(Database):
                 if os.path.exists(filename):
                     os.remove(filename)
 
+        self._clear_indices()
+
+    @contextmanager
+    def _batch(self) -> Generator[None, None, None]:
+        """Run all the modifications in a batch in a single transaction."""
+        conn = self.connection
+        if conn.in_transaction:
+            yield
+            return
+
+        # NOTE: the changes are also committed if an exception is raised, since
+        # the documents on disk have already been modified by the caller
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        finally:
+            conn.commit()
+
+    @contextmanager
+    def _transaction(self) -> Generator[None, None, None]:
+        # NOTE: the changes are committed by `_batch` if one is in progress
+        if self.connection.in_transaction:
+            yield
+            return
+
+        with transaction(self.connection):
+            yield
+
     def add(self, doc: Document) -> None:
         from papis.document import describe
         logger.debug("Adding document: '%s'.", describe(doc))
@@ -255,7 +273,7 @@ class SQLiteDatabase(Database):
             raise DocumentFolderNotFound(describe(doc))
 
         conn = self.connection
-        with transaction(conn):
+        with self._transaction():
             conn.execute(
                 f"INSERT INTO {SQLITE_TABLE_NAME}(papis_id, doc_folder, doc) "
                     "VALUES(?, ?, ?)",
@@ -263,6 +281,34 @@ class SQLiteDatabase(Database):
                  folder,
                  json.dumps(doc, cls=JSONEncoder)))
 
+        self._add_to_indices(doc)
+
+    def add_many(self, documents: Iterable[Document]) -> None:
+        from papis.document import describe
+
+        documents = list(documents)
+        logger.debug("Adding %d documents.", len(documents))
+
+        values = []
+        for doc in documents:
+            folder = doc.get_main_folder()
+            if folder is None:
+                from papis.exceptions import DocumentFolderNotFound
+                raise DocumentFolderNotFound(describe(doc))
+
+            values.append((self.maybe_compute_id(doc),
+                           folder,
+                           json.dumps(doc, cls=JSONEncoder)))
+
+        conn = self.connection
+        with self._transaction():
+            conn.executemany(
+                f"INSERT INTO {SQLITE_TABLE_NAME}(papis_id, doc_folder, doc) "
+                    "VALUES(?, ?, ?)",
+                values)
+
+        self._add_many_to_indices(documents)
+
     def update(self, doc: Document) -> None:
         from papis.document import describe
         logger.debug("Updating document: '%s'.", describe(doc))
@@ -273,7 +319,7 @@ class SQLiteDatabase(Database):
             raise DocumentFolderNotFound(describe(doc))
 
         conn = self.connection
-        with transaction(conn):
+        with self._transaction():
             conn.execute(
                 f"UPDATE {SQLITE_TABLE_NAME} "
                 "    SET doc_folder = ?, doc = ?"
@@ -282,12 +328,14 @@ class SQLiteDatabase(Database):
                  json.dumps(doc, cls=JSONEncoder),
                  self.maybe_compute_id(doc)))
 
+        self._update_indices(doc)
+
     def delete(self, doc: Document) -> None:
         from papis.document import describe
         logger.debug("Deleting document: '%s'.", describe(doc))
 
         conn = self.connection
-        with transaction(conn):
+        with self._transaction():
             cursor = conn.execute(
                 f"DELETE FROM {SQLITE_TABLE_NAME} WHERE papis_id = ?",
                 (self.maybe_compute_id(doc),))
@@ -296,6 +344,9 @@ class SQLiteDatabase(Database):
             from papis.exceptions import DocumentFolderNotFound
             raise DocumentFolderNotFound(describe(doc))
 
+        self._delete_from_indices(doc)
+
+    @papis.stats.timed("database.query")
     def query(self, query_string: str) -> list[Document]:
         logger.debug("Querying database for '%s'.", query_string)
 
@@ -351,11 +402,10 @@ class SQLiteDatabase(Database):
         conn.commit()
 
     def _index_documents(self) -> None:
-        from papis.utils import folders_to_documents, get_folders
+        from papis.utils import iter_documents_from_folders, iter_folders
 
         logger.info("Indexing library. This might take a while...")
-        folders = get_folders(self.lib.path)
-        documents = folders_to_documents(folders)
+        documents = iter_documents_from_folders(iter_folders(self.lib.path))
 
         from papis.document import describe
 
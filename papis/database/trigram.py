@@ -0,0 +1,402 @@
+"""A trigram index used to speed up queries in the ``papis`` database backend.
+
+The ``papis`` backend answers queries by matching a regular expression against
+the :confval:`match-format` of every document in the library. For large
+libraries, this can be quite slow, since every document needs to be formatted.
+
+The trigram index stores, for every sequence of three characters (a trigram),
+the set of documents that contain it. A query term such as ``einstein`` can
+only match documents that contain all of the trigrams ``ein``, ``ins``, ``nst``,
+``ste`` and ``tei``, so the candidate documents are given by the intersection
+of the corresponding posting lists. The regular expressions are then only evaluated
+on these candidates. Terms that do not contain any literal text (e.g. ``20[0-9]``)
+cannot be accelerated and fall back to checking all the documents.
+
+The index covers the :confval:`match-format` of each document (used by plain
+terms) and the values of the keys in :confval:`trigram-index-keys` (used by
+``key:value`` pairs). It is enabled with :confval:`use-trigram-index`.
+
+The index records the modification time and size of the database cache file it
+was last synchronized with. If the cache file was modified without updating the
+index (e.g. while :confval:`use-trigram-index` was disabled), it is rebuilt.
+"""
+from __future__ import annotations
+
+import os
+import sys
+from typing import TYPE_CHECKING, Any
+
+import papis.config
+import papis.logging
+from papis.database.base import (
+    DatabaseIndex,
+    get_cache_file_name,
+    get_cache_file_path,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from papis.docmatcher import QueryItem
+    from papis.document import Document
+    from papis.library import Library
+
+logger = papis.logging.get_logger(__name__)
+
+#: Version of the trigram index format.
+TRIGRAM_INDEX_VERSION = 2
+
+#: Characters that have a special meaning in a regular expression. Query words
+#: that contain any of these are not used to compute trigrams.
+_REGEX_SPECIAL_CHARS = frozenset(".^$*+?{}[]\\|()")
+
+# NOTE: with re.IGNORECASE, Python also matches some non-ASCII characters to
+# ASCII letters (e.g. the long s U+017F matches 's'). These are normalized here,
+# so that the index never misses a document that the regex would match.
+_CASEFOLD_TABLE = str.maketrans({
+    "\u017f": "s",     # LATIN SMALL LETTER LONG S
+    "\u0131": "i",     # LATIN SMALL LETTER DOTLESS I
+    "\u0130": "i",     # LATIN CAPITAL LETTER I WITH DOT ABOVE
+    "\u212a": "k",     # KELVIN SIGN
+})
+
+
+def _normalize(text: str) -> str:
+    return text.translate(_CASEFOLD_TABLE).lower()
+
+
+def get_trigrams(text: str) -> set[str]:
+    """Get all the (case-insensitive) trigrams in *text*.
+
+    >>> sorted(get_trigrams("Einstein"))
+    ['ein', 'ins', 'nst', 'ste', 'tei']
+    """
+    text = _normalize(text)
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def get_query_trigrams(query: str) -> set[str]:
+    """Get the trigrams that must be present in any string matching *query*.
+
+    The *query* is a search string as used by
+    :func:`~papis.docmatcher.get_regex_from_search`, i.e. each word must
+    appear in the matched string. Words that contain regex characters are
+    skipped, since their literal text need not appear in the matched string.
+
+    >>> sorted(get_query_trigrams('"albert einst"'))
+    ['alb', 'ber', 'ein', 'ert', 'ins', 'lbe', 'nst']
+    >>> get_query_trigrams("20[0-9] ab")
+    set()
+    """
+    query = query.strip("'").strip('"')
+
+    result: set[str] = set()
+    for word in query.split():
+        if not _REGEX_SPECIAL_CHARS.isdisjoint(word):
+            continue
+
+        result.update(get_trigrams(word))
+
+    return result
+
+
+def get_trigram_index_path(libpath: str) -> str:
+    """Get the full path to the trigram index file.
+
+    :param libpath: the path of the library for which to create the index.
+    """
+    from papis.utils import get_cache_home
+
+    folder = os.path.join(get_cache_home(), "database", "trigram")
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+
+    return os.path.join(folder, f"{get_cache_file_name(libpath)}.pickle")
+
+
+class TrigramIndex(DatabaseIndex):
+    """A persistent trigram index of the documents in a library.
+
+    Posting lists are stored as sets of small integers, which are mapped to the
+    Papis IDs of the documents. Keys are prefixed to the trigrams of their
+    values (e.g. ``"author:ein"``), while the trigrams of the
+    :confval:`match-format` have no prefix. The trigrams of each document are
+    also stored, so that it can be removed from its own posting lists only.
+    """
+
+    def __init__(self, library: Library) -> None:
+        self.lib = library
+        self.path = get_trigram_index_path(library.path)
+
+        self._postings: dict[str, set[int]] | None = None
+        self._trigrams: dict[int, frozenset[str]] = {}
+        self._id_to_num: dict[str, int] = {}
+        self._num_to_id: dict[int, str] = {}
+        self._next_num = 0
+
+    @property
+    def keys(self) -> list[str]:
+        return papis.config.getlist("trigram-index-keys")
+
+    def _get_cache_stamp(self) -> tuple[int, int] | None:
+        try:
+            st = os.stat(get_cache_file_path(self.lib.path))
+        except OSError:
+            return None
+
+        return st.st_mtime_ns, st.st_size
+
+    def _get_signature(self) -> dict[str, Any]:
+        fmt = papis.config.getformatpattern("match-format")
+        return {
+            "version": TRIGRAM_INDEX_VERSION,
+            "match-format": [fmt.formatter, fmt.pattern],
+            "keys": self.keys,
+            "cache": self._get_cache_stamp(),
+        }
+
+    def _get_document_trigrams(self, document: Document) -> set[str]:
+        from papis.format import format
+
+        match_format = papis.config.getformatpattern("match-format")
+        result = get_trigrams(format(match_format, document))
+
+        for key in self.keys:
+            value = document.get(key)
+            if value is not None:
+                result.update(f"{key}:{t}" for t in get_trigrams(str(value)))
+
+        return result
+
+    def load(self) -> bool:
+        """Load the index from disk, if it exists and it is up to date.
+
+        Note that the index is only valid for the current state of the database
+        cache file, so it should be loaded before the cache file is modified.
+
+        :returns: *True* if the index was loaded successfully and *False* if
+            it needs to be rebuilt using :meth:`rebuild`.
+        """
+        if self._postings is not None:
+            return True
+
+        if not os.path.exists(self.path):
+            return False
+
+        import pickle
+
+        try:
+            with open(self.path, "rb") as fd:
+                data = pickle.load(fd)
+        except Exception as exc:
+            logger.debug("Failed to read trigram index at '%s'.",
+                         self.path, exc_info=exc)
+            return False
+
+        if data.get("signature") != self._get_signature():
+            logger.debug("Trigram index at '%s' is outdated.", self.path)
+            return False
+
+        self._postings = data["postings"]
+        self._trigrams = data["trigrams"]
+        self._id_to_num = data["ids"]
+        self._num_to_id = {num: papis_id for papis_id, num in self._id_to_num.items()}
+        self._next_num = data["next"]
+
+        return True
+
+    def save(self) -> None:
+        """Write the index to disk."""
+        if self._postings is None:
+            return
+
+        import pickle
+
+        data = {
+            "signature": self._get_signature(),
+            "postings": self._postings,
+            "trigrams": self._trigrams,
+            "ids": self._id_to_num,
+            "next": self._next_num,
+        }
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as fd:
+            pickle.dump(data, fd, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def _add(self, document: Document) -> None:
+        from papis.id import ID_KEY_NAME
+
+        papis_id = document.get(ID_KEY_NAME)
+        if papis_id is None:
+            return
+
+        assert self._postings is not None
+        papis_id = str(papis_id)
+
+        num = self._id_to_num.get(papis_id)
+        if num is None:
+            num = self._next_num
+            self._next_num += 1
+
+            self._id_to_num[papis_id] = num
+            self._num_to_id[num] = papis_id
+
+        # NOTE: interning the trigrams shares them between the posting lists
+        # and the document trigrams (also when pickling the index)
+        trigrams = frozenset(
+            sys.intern(t) for t in self._get_document_trigrams(document))
+        for trigram in trigrams:
+            self._postings.setdefault(trigram, set()).add(num)
+
+        self._trigrams[num] = trigrams
+
+    def _delete(self, document: Document) -> bool:
+        from papis.id import ID_KEY_NAME
+
+        assert self._postings is not None
+
+        num = self._id_to_num.pop(str(document.get(ID_KEY_NAME)), None)
+        if num is None:
+            return False
+
+        del self._num_to_id[num]
+
+        for trigram in self._trigrams.pop(num, ()):
+            nums = self._postings.get(trigram)
+            if nums is None:
+                continue
+
+            nums.discard(num)
+            if not nums:
+                del self._postings[trigram]
+
+        return True
+
+    def rebuild(self, documents: Iterable[Document]) -> None:
+        logger.debug("Rebuilding trigram index at '%s'.", self.path)
+
+        self._postings = {}
+        self._trigrams = {}
+        self._id_to_num = {}
+        self._num_to_id = {}
+        self._next_num = 0
+
+        for doc in documents:
+            self._add(doc)
+
+        self.save()
+
+    def add(self, document: Document) -> None:
+        if not self.load():
+            return
+
+        self._delete(document)
+        self._add(document)
+        self.save()
+
+    def add_many(self, documents: Iterable[Document]) -> None:
+        if not self.load():
+            return
+
+        for document in documents:
+            self._delete(document)
+            self._add(document)
+
+        self.save()
+
+    def delete(self, document: Document) -> None:
+        if not self.load():
+            return
+
+        if self._delete(document):
+            self.save()
+
+    def update(self, document: Document) -> None:
+        # NOTE: add already removes the old trigrams of the document
+        self.add(document)
+
+    def update_many(self, documents: Iterable[Document]) -> None:
+        self.add_many(documents)
+
+    def clear(self) -> None:
+        self._postings = None
+        self._trigrams = {}
+        self._id_to_num = {}
+        self._num_to_id = {}
+        self._next_num = 0
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _lookup(self, trigrams: set[str]) -> set[int] | None:
+        assert self._postings is not None
+
+        if not trigrams:
+            return None
+
+        # NOTE: start with the shortest posting lists to keep the sets small
+        postings = sorted(
+            (self._postings.get(t, set()) for t in trigrams), key=len)
+
+        result = set(postings[0])
+        for nums in postings[1:]:
+            if not result:
+                break
+
+            result &= nums
+
+        return result
+
+    def _candidates(self, query: QueryItem) -> set[int] | None:
+        from papis.docmatcher import And, Or, Pair, Term
+
+        if isinstance(query, Term):
+            return self._lookup(get_query_trigrams(query.query))
+        elif isinstance(query, Pair):
+            if query.key not in self.keys:
+                return None
+
+            return self._lookup({
+                f"{query.key}:{t}" for t in get_query_trigrams(query.query)
+            })
+        elif isinstance(query, And):
+            result: set[int] | None = None
+            for child in query.children:
+                candidates = self._candidates(child)
+                if candidates is None:
+                    continue
+
+                result = candidates if result is None else result & candidates
+
+            return result
+        elif isinstance(query, Or):
+            result = set()
+            for child in query.children:
+                candidates = self._candidates(child)
+                if candidates is None:
+                    return None
+
+                result |= candidates
+
+            return result
+        else:
+            # NOTE: a `Not` can match documents that are not in the index at all
+            return None
+
+    def candidates(self, query: QueryItem) -> set[str] | None:
+        """Find all the documents that can possibly match *query*.
+
+        :returns: a set of Papis IDs that is guaranteed to contain all the
+            documents matching *query*, but may contain others as well. If the
+            index cannot be used to accelerate the query, *None* is returned
+            and all the documents need to be checked.
+        """
+        assert self._postings is not None
+
+        nums = self._candidates(query)
+        if nums is None:
+            return None
+
+        return {self._num_to_id[num] for num in nums}
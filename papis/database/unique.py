@@ -0,0 +1,249 @@
+"""A persistent index of the unique keys of all the documents in a library.
+
+Duplicate detection (e.g. when adding a new document or importing a BibTeX
+file) checks if any of the :confval:`unique-document-keys` of a document
+matches the ones of an existing document in the library. Instead of querying
+the database for each key, the normalized values of these keys are stored in
+a mapping to the Papis IDs of the documents that have them, so that each
+lookup is a single dictionary access.
+
+The values are normalized by :func:`normalize_unique_value`, so that, e.g.,
+``https://doi.org/10.1000/XYZ`` and ``10.1000/xyz`` are considered the same
+DOI. If :confval:`use-unique-key-index` is enabled, the index is kept up to
+date by the database backends (see :class:`~papis.database.base.JSONDatabaseIndex`)
+and it is rebuilt from scratch whenever it is missing or
+:confval:`unique-document-keys` changes.
+"""
+from __future__ import annotations
+
+import os
+import re
+from typing import TYPE_CHECKING, Any
+
+import papis.config
+import papis.logging
+from papis.database.base import JSONDatabaseIndex, get_cache_file_name
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from papis.document import Document, DocumentLike
+    from papis.library import Library
+
+logger = papis.logging.get_logger(__name__)
+
+#: Version of the unique key index format (including the normalization).
+UNIQUE_KEY_INDEX_VERSION = 1
+
+_DOI_PREFIX_RE = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)")
+_ARXIV_PREFIX_RE = re.compile(r"^(?:https?://(?:www\.)?arxiv\.org/(?:abs|pdf)/|arxiv:\s*)")
+_ARXIV_VERSION_RE = re.compile(r"(?:v\d+)?(?:\.pdf)?$")
+_URL_PREFIX_RE = re.compile(r"^(?:https?://)?(?:www\.)?")
+
+
+def normalize_unique_value(key: str, value: Any) -> str | None:
+    """Normalize the *value* of a unique document key for comparison.
+
+    All values are case-folded and stripped of whitespace. Additionally, some
+    known keys get special treatment: URL prefixes are removed from DOIs and
+    arXiv identifiers (along with the arXiv version), dashes and spaces are
+    removed from ISBNs and the scheme is removed from URLs.
+
+    >>> normalize_unique_value("doi", "https://doi.org/10.1000/XYZ")
+    '10.1000/xyz'
+    >>> normalize_unique_value("eprint", "arXiv:1712.03134v2")
+    '1712.03134'
+    >>> normalize_unique_value("isbn", "978-3-16-148410-0")
+    '9783161484100'
+
+    :returns: a normalized string or *None* if the value is empty.
+    """
+    if value is None:
+        return None
+
+    result = str(value).strip().casefold()
+    if key == "doi":
+        result = _DOI_PREFIX_RE.sub("", result)
+    elif key == "eprint":
+        result = _ARXIV_VERSION_RE.sub("", _ARXIV_PREFIX_RE.sub("", result))
+    elif key in {"isbn", "isbn10"}:
+        result = "".join(c for c in result if c in "0123456789x")
+    elif key in {"url", "doc_url"}:
+        result = _URL_PREFIX_RE.sub("", result).rstrip("/")
+
+    return result or None
+
+
+def get_unique_values(document: DocumentLike,
+                      keys: Iterable[str]) -> list[tuple[str, str]]:
+    """Get all the normalized ``(key, value)`` pairs of *document*.
+
+    :param keys: the keys to look at, usually given by
+        :confval:`unique-document-keys`.
+    """
+    result = []
+    for key in keys:
+        value = normalize_unique_value(key, document.get(key))
+        if value is not None:
+            result.append((key, value))
+
+    return result
+
+
+def get_unique_key_index_path(libpath: str) -> str:
+    """Get the full path to the unique key index file.
+
+    :param libpath: the path of the library for which to create the index.
+    """
+    from papis.utils import get_cache_home
+
+    folder = os.path.join(get_cache_home(), "database", "unique")
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+
+    return os.path.join(folder, f"{get_cache_file_name(libpath)}.json")
+
+
+class UniqueKeyIndex(JSONDatabaseIndex):
+    """A mapping from normalized unique key values to Papis IDs.
+
+    The index is only loaded from disk when needed and it is never created by
+    the incremental update methods: if it does not exist yet, it will be
+    created from the full list of documents by :func:`get_unique_key_index`.
+    """
+
+    name = "unique key index"
+
+    def __init__(self, library: Library) -> None:
+        super().__init__(get_unique_key_index_path(library.path))
+        self.lib = library
+
+        self._values: dict[str, dict[str, list[str]]] | None = None
+        self._values_by_id: dict[str, list[tuple[str, str]]] = {}
+
+    @property
+    def keys(self) -> list[str]:
+        return papis.config.getlist("unique-document-keys")
+
+    def get_header(self) -> dict[str, Any]:
+        return {"version": UNIQUE_KEY_INDEX_VERSION, "keys": self.keys}
+
+    def _get_data(self) -> dict[str, Any]:
+        return {"values": self._values}
+
+    def _set_data(self, data: dict[str, Any] | None) -> None:
+        self._values = {} if data is None else data["values"]
+        self._values_by_id = {}
+
+        for key, values in self._values.items():
+            for value, papis_ids in values.items():
+                for papis_id in papis_ids:
+                    self._values_by_id.setdefault(papis_id, []).append((key, value))
+
+    def _make_record(self, document: Document) -> list[tuple[str, str]] | None:
+        return get_unique_values(document, self.keys) or None
+
+    def _add_record(self, papis_id: str, record: list[tuple[str, str]]) -> None:
+        assert self._values is not None
+
+        values = [(key, value) for key, value in record]
+        for key, value in values:
+            self._values.setdefault(key, {}).setdefault(value, []).append(papis_id)
+
+        self._values_by_id[papis_id] = values
+
+    def _delete_record(self, papis_id: str) -> None:
+        assert self._values is not None
+
+        values = self._values_by_id.pop(papis_id, None)
+        if values is None:
+            return
+
+        for key, value in values:
+            papis_ids = self._values[key][value]
+            papis_ids.remove(papis_id)
+            if not papis_ids:
+                del self._values[key][value]
+
+    def find(self,
+             document: DocumentLike,
+             keys: Iterable[str] | None = None) -> list[str]:
+        """Find all the documents in the index that match *document*.
+
+        :param keys: a list of keys to check, in order. This defaults to
+            :confval:`unique-document-keys`. Keys that are not in the index
+            are ignored.
+        :returns: a list of Papis IDs of the matching documents. The documents
+            that match the first key in *keys* come first.
+        """
+        assert self._values is not None
+
+        if keys is None:
+            keys = self.keys
+
+        result: list[str] = []
+        for key, value in get_unique_values(document, keys):
+            for papis_id in self._values.get(key, {}).get(value, ()):
+                if papis_id not in result:
+                    result.append(papis_id)
+
+        return result
+
+    def find_duplicates(self) -> list[list[str]]:
+        """Find all groups of documents in the index that share a unique key.
+
+        Two documents are in the same group if they have the same value for any
+        of the :confval:`unique-document-keys`. Groups are transitive, i.e. if
+        *A* and *B* share a DOI and *B* and *C* share an ISBN, then all three
+        documents are in the same group.
+
+        :returns: a list of groups of Papis IDs, each with at least two
+            documents.
+        """
+        assert self._values is not None
+
+        parent: dict[str, str] = {}
+
+        def find_root(papis_id: str) -> str:
+            root = parent.setdefault(papis_id, papis_id)
+            while parent[root] != root:
+                root = parent[root]
+
+            # NOTE: compress the path, so that later lookups are faster
+            while papis_id != root:
+                parent[papis_id], papis_id = root, parent[papis_id]
+
+            return root
+
+        for values in self._values.values():
+            for papis_ids in values.values():
+                if len(papis_ids) < 2:
+                    continue
+
+                root = find_root(papis_ids[0])
+                for papis_id in papis_ids[1:]:
+                    other = find_root(papis_id)
+                    if other != root:
+                        parent[other] = root
+
+        groups: dict[str, list[str]] = {}
+        for papis_id in parent:
+            groups.setdefault(find_root(papis_id), []).append(papis_id)
+
+        return [sorted(group) for group in groups.values()]
+
+
+def get_unique_key_index(library: Library) -> UniqueKeyIndex:
+    """Get an up to date unique key index for *library*.
+
+    If no index exists (or it is outdated), it is rebuilt from the documents in
+    the library database. Otherwise, the database is not touched at all.
+    """
+    index = UniqueKeyIndex(library)
+    if not index.load():
+        from papis.database import get_database
+
+        db = get_database(library.name)
+        index.rebuild(db.get_all_documents())
+
+    return index
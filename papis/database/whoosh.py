@@ -29,23 +29,41 @@ where all the fields are explained in the Whoosh
 
 After this Schema is created, the folders of the library are traversed
 and the documents are added to the database. When adding documents, only the
-keys in the schema are stored. This means that, e.g., if ``publisher`` is not in
+keys in the schema are indexed. This means that, e.g., if ``publisher`` is not in
 the schema you will not be able to search for the publisher through a query.
+
+Besides the indexed keys, the whole document is serialized to JSON and kept in
+a stored field, so that query results can be reconstructed without reading the
+:ref:`info.yaml <info-file>` files of every hit from disk. If the info files
+can be modified outside of Papis, :confval:`whoosh-verify-mtime` can be used
+to reload the documents that have changed since they were indexed.
+
+Every modification of the index (e.g. :meth:`WhooshDatabase.add`) creates a new
+writer and commits a new segment, merging it with other small segments using
+the default Whoosh merge policy. For bulk operations, all the modifications
+should be grouped using :meth:`WhooshDatabase.batch`, so that only a single
+commit is made. At the end of a batch (and after indexing the library with
+multiple processes), the small segments are merged synchronously if there are
+more than :data:`WHOOSH_MAX_SEGMENTS` of them.
 """
 from __future__ import annotations
 
+import json
 import os
-from typing import TYPE_CHECKING
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
 
 import papis.config
 import papis.logging
-from papis.database.base import Database, get_cache_file_name
+import papis.stats
+from papis.database.base import Database, JSONEncoder, get_cache_file_name
 
 if TYPE_CHECKING:
-    from collections.abc import KeysView
+    from collections.abc import Generator, Iterable
 
     from whoosh.fields import FieldType, Schema
     from whoosh.index import Index
+    from whoosh.searching import Hit
     from whoosh.writing import IndexWriter
 
     from papis.document import Document
@@ -55,6 +73,25 @@ logger = papis.logging.get_logger(__name__)
 
 #: Field name used to store the document main folder the the Whoosh database.
 WHOOSH_FOLDER_FIELD = "papis-folder"
+#: Field name used to store the serialized document in the Whoosh database.
+WHOOSH_DOCUMENT_FIELD = "papis-document"
+#: Field name used to store the modification time of the document info file.
+WHOOSH_MTIME_FIELD = "papis-mtime"
+
+#: Number of segments in the index after which they are merged at the end of a
+#: :meth:`WhooshDatabase.batch`.
+WHOOSH_MAX_SEGMENTS = 8
+#: Minimum number of documents that each process should index when building
+#: the index from scratch. Smaller libraries are indexed in a single process.
+WHOOSH_MIN_DOCUMENTS_PER_PROCESS = 1000
+
+
+def _get_info_file_mtime(document: Document) -> float | None:
+    info_file = document.get_info_file()
+    try:
+        return os.path.getmtime(info_file) if info_file else None
+    except OSError:
+        return None
 
 
 class WhooshDatabase(Database):
@@ -68,6 +105,8 @@ class WhooshDatabase(Database):
             os.path.join(self.cache_dir, get_cache_file_name(self.lib.path))
             )
 
+        self._batch_writer: IndexWriter | None = None
+
         self.initialize()
 
     def get_backend_name(self) -> str:  # ruff:ignore[no-self-use]
@@ -76,7 +115,8 @@ class WhooshDatabase(Database):
     def get_cache_path(self) -> str:
         return self.index_dir
 
-    def get_all_query_string(self) -> str:  # ruff:ignore[no-self-use]
+    @classmethod
+    def get_all_query_string(cls) -> str:
         return "*"
 
     def initialize(self) -> None:
@@ -110,32 +150,122 @@ class WhooshDatabase(Database):
             logger.warning("Clearing the database at '%s'...", self.get_cache_path())
             shutil.rmtree(self.index_dir)
 
+        self._clear_indices()
+
     def add(self, document: Document) -> None:
         from papis.document import describe
         logger.debug("Adding document: '%s'.", describe(document))
 
-        schema_keys = self._get_schema_init_fields().keys()
-        index = self._get_index()
-        writer = index.writer()
+        with self._get_writer() as writer:
+            self._add_document_with_writer(document, writer, self._get_schema_keys())
 
-        self._add_document_with_writer(document, writer, schema_keys)
-        writer.commit()
+        self._add_to_indices(document)
+
+    def add_many(self, documents: Iterable[Document]) -> None:
+        documents = list(documents)
+        logger.debug("Adding %d documents.", len(documents))
+
+        with self._get_writer() as writer:
+            keys = self._get_schema_keys()
+            for document in documents:
+                self._add_document_with_writer(document, writer, keys)
+
+        self._add_many_to_indices(documents)
 
     def update(self, document: Document) -> None:
-        self.delete(document)
-        self.add(document)
+        from papis.document import describe
+        logger.debug("Updating document: '%s'.", describe(document))
+
+        from papis.id import ID_KEY_NAME
+        with self._get_writer() as writer:
+            writer.delete_by_term(ID_KEY_NAME, document[ID_KEY_NAME])
+            self._add_document_with_writer(document, writer, self._get_schema_keys())
+
+        self._update_indices(document)
 
     def delete(self, document: Document) -> None:
         from papis.document import describe
         logger.debug("Deleting document: '%s'.", describe(document))
 
+        from papis.id import ID_KEY_NAME
+        with self._get_writer() as writer:
+            writer.delete_by_term(ID_KEY_NAME, document[ID_KEY_NAME])
+
+        self._delete_from_indices(document)
+
+    @contextmanager
+    def _batch(self) -> Generator[None, None, None]:
+        """Share a single index writer between all the modifications in a batch.
+
+        The writer is only committed when the batch exits, including when an
+        exception is raised, so that the changes made before it are kept.
+        """
+        if self._batch_writer is not None:
+            yield
+            return
+
+        from whoosh.writing import AsyncWriter
+
+        # NOTE: the AsyncWriter buffers the changes and commits them in a
+        # separate thread if the index is locked by another process
+        writer = self._batch_writer = AsyncWriter(self._get_index())
+        try:
+            yield
+        finally:
+            self._batch_writer = None
+
+            # NOTE: segments are only merged afterwards if there are too many
+            writer.commit(merge=False)
+            self._merge_segments()
+
+    @contextmanager
+    def _get_writer(self) -> Generator[IndexWriter, None, None]:
+        """Get a writer for the index.
+
+        If a :meth:`batch` is in progress, its writer is returned and it is not
+        committed here. Otherwise, a new writer is committed on exit.
+        """
+        if self._batch_writer is not None:
+            yield self._batch_writer
+            return
+
+        from whoosh.writing import AsyncWriter
+
+        writer = AsyncWriter(self._get_index())
+        try:
+            yield writer
+        except BaseException:
+            writer.cancel()
+            raise
+        else:
+            writer.commit()
+
+    def _merge_segments(self) -> None:
+        """Merge the small segments of the index.
+
+        This is only done when the index has more than :data:`WHOOSH_MAX_SEGMENTS`
+        segments, as counting them requires opening a reader. It is meant to be
+        called after commits that can add many segments, e.g. at the end of a
+        :meth:`batch` or when indexing the library with multiple processes.
+        """
         index = self._get_index()
-        writer = index.writer()
+        with index.reader() as reader:
+            nsegments = len(reader.leaf_readers())
 
-        from papis.id import ID_KEY_NAME
-        writer.delete_by_term(ID_KEY_NAME, document[ID_KEY_NAME])
-        writer.commit()
+        if nsegments <= WHOOSH_MAX_SEGMENTS:
+            return
+
+        from whoosh.index import LockError
 
+        logger.debug("Merging %d index segments.", nsegments)
+        try:
+            # NOTE: an empty commit runs the default merge policy, which only
+            # merges the smaller segments
+            index.writer().commit(merge=True)
+        except LockError:
+            logger.debug("Index is locked. Skipping segment merge.")
+
+    @papis.stats.timed("database.query")
     def query(self, query_string: str) -> list[Document]:
         logger.debug("Querying database for '%s'.", query_string)
 
@@ -147,13 +277,15 @@ class WhooshDatabase(Database):
         qp = MultifieldParser(["title", "author", "tags"], schema=index.schema)
         qp.add_plugin(FuzzyTermPlugin())
 
-        from papis.document import from_folder
+        verify_mtime = bool(papis.config.getboolean("whoosh-verify-mtime"))
 
         t_start = time.time()
         query = qp.parse(query_string)
         with index.searcher() as searcher:
             results = searcher.search(query, limit=None)
-            documents = [from_folder(r.get(WHOOSH_FOLDER_FIELD)) for r in results]
+            documents = [
+                self._document_from_hit(r, verify_mtime=verify_mtime)
+                for r in results]
 
         t_delta = 1000 * (time.time() - t_start)
         logger.debug("Finished querying in %.2fms (%d docs).", t_delta, len(documents))
@@ -188,7 +320,7 @@ class WhooshDatabase(Database):
     def _add_document_with_writer(self,
                                   document: Document,
                                   writer: IndexWriter,
-                                  schema_keys: KeysView[str]) -> None:
+                                  schema_keys: Iterable[str]) -> None:
         """Helper function that adds a document document (without committing).
 
         This function does only two things: creates a suitable dictionary to be
@@ -205,12 +337,43 @@ class WhooshDatabase(Database):
             from papis.exceptions import DocumentFolderNotFound
             raise DocumentFolderNotFound(describe(document))
 
-        doc_schema = {
-            k: (folder if k == WHOOSH_FOLDER_FIELD else str(document[k]))
-            for k in schema_keys
+        doc_schema: dict[str, Any] = {
+            k: str(document[k]) for k in schema_keys
+            if k not in {WHOOSH_FOLDER_FIELD, WHOOSH_DOCUMENT_FIELD, WHOOSH_MTIME_FIELD}
         }
+        doc_schema[WHOOSH_FOLDER_FIELD] = folder
+        doc_schema[WHOOSH_DOCUMENT_FIELD] = json.dumps(document, cls=JSONEncoder)
+        doc_schema[WHOOSH_MTIME_FIELD] = _get_info_file_mtime(document)
+
         writer.add_document(**doc_schema)
 
+    def _document_from_hit(self,  # ruff:ignore[no-self-use]
+                           hit: Hit, *,
+                           verify_mtime: bool = False) -> Document:
+        """Reconstruct a document from the stored fields of a search *hit*.
+
+        :param verify_mtime: if *True*, the modification time of the document
+            info file is compared to the one recorded when the document was
+            indexed and the document is reloaded from disk if they differ.
+        """
+        from papis.document import from_data, from_folder
+
+        folder = hit.get(WHOOSH_FOLDER_FIELD)
+        data = hit.get(WHOOSH_DOCUMENT_FIELD)
+        if data is None:
+            return from_folder(folder)
+
+        doc = from_data(json.loads(data))
+        doc.set_folder(folder)
+
+        if verify_mtime:
+            mtime = _get_info_file_mtime(doc)
+            if mtime is None or mtime != hit.get(WHOOSH_MTIME_FIELD):
+                logger.debug("Document changed since it was indexed: '%s'.", folder)
+                return from_folder(folder)
+
+        return doc
+
     def _index_documents(self) -> None:
         """Initializes the database with an index of all the documents.
 
@@ -219,20 +382,42 @@ class WhooshDatabase(Database):
         index. It is quite expensive and will only be called if no index is present
         or a rebuild is necessary.
         """
-        from papis.utils import folders_to_documents, get_folders
+        from papis.utils import folders_to_documents, iter_folders
 
         logger.debug("Indexing the library, this might take a while...")
-        folders = get_folders(self.lib.path)
-        documents = folders_to_documents(folders)
+        documents = folders_to_documents(iter_folders(self.lib.path))
+
+        # NOTE: `maybe_compute_id` may need to query the database, so make sure
+        # that all the documents have an ID before the writer locks the index
+        for doc in documents:
+            self.maybe_compute_id(doc)
+
+        from papis.utils import get_process_count
+        procs = min(
+            get_process_count(),
+            len(documents) // WHOOSH_MIN_DOCUMENTS_PER_PROCESS)
 
-        schema_keys = self._get_schema_init_fields().keys()
         index = self._get_index()
-        writer = index.writer()
+        if procs > 1:
+            logger.debug("Indexing %d documents using %d processes.",
+                         len(documents), procs)
+            writer = index.writer(procs=procs, multisegment=True)
+        else:
+            writer = index.writer()
 
+        schema_keys = index.schema.names()
         for doc in documents:
             self._add_document_with_writer(doc, writer, schema_keys)
         writer.commit()
 
+        # NOTE: each process writes its own segment when indexing in parallel
+        if procs > 1:
+            self._merge_segments()
+
+    def _get_schema_keys(self) -> list[str]:
+        """Get the names of all the fields in the current index schema."""
+        return list(self._get_index().schema.names())
+
     def _get_index(self) -> Index:
         """Gets the index for the current library
         """
@@ -267,7 +452,9 @@ class WhooshDatabase(Database):
         from papis.id import ID_KEY_NAME
         fields = {
             ID_KEY_NAME: ID(stored=True, unique=True),
-            WHOOSH_FOLDER_FIELD: TEXT(stored=True)
+            WHOOSH_FOLDER_FIELD: TEXT(stored=True),
+            WHOOSH_DOCUMENT_FIELD: STORED(),
+            WHOOSH_MTIME_FIELD: STORED(),
         }
         # add user provided fields
         fields.update(user_prototype)
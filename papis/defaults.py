@@ -100,6 +100,7 @@ settings: dict[str, Any] = {
     "prefix-only-completions": False,
     "completion-format": _f("{doc[ref]}"),
     "completion-help-format": _f("{doc[title]} - {doc[author]}"),
+    "completion-max-results": 100,
 
     # tools
     "opentool": get_default_opener(),
@@ -118,6 +119,7 @@ settings: dict[str, Any] = {
     "extra-bibtex-types": [],
     "bibtex-unicode": False,
     "bibtex-export-file": False,
+    "bibtex-export-cache": True,
     "multiple-authors-separator": " and ",
     "multiple-authors-format": _f("{au[family]}, {au[given]}"),
 
@@ -144,6 +146,10 @@ settings: dict[str, Any] = {
     "auto-doctor": False,
     "time-stamp": True,
 
+    # update
+    "update-fetch-workers": 4,
+    "update-fetch-rate-limit": 1.0,
+
     # browse
     "browse-key": "auto",
     "browse-query-format": _f("{doc[title]} {doc[author]}"),
@@ -248,9 +254,20 @@ settings: dict[str, Any] = {
     "default-query-string": ".",
     "database-backend": "papis",
     "use-cache": True,
+    "use-trigram-index": False,
+    "trigram-index-keys": ["author", "title", "tags", "ref", "doi", "journal"],
+    "use-completion-index": False,
+    "use-unique-key-index": False,
+    "use-facet-index": False,
+    "facet-keys": ["tags"],
+    "compact-documents": False,
+    "crawler-ignore": [".git", ".hg", ".svn", "__pycache__"],
+    "crawler-descend-into-documents": True,
+    "crawler-threads": 8,
     "cache-dir": None,
 
     "whoosh-schema-fields": ["doi"],
+    "whoosh-verify-mtime": False,
     "whoosh-schema-prototype":
     "{\n"
     '"author": TEXT(stored=True),\n'
@@ -11,6 +11,7 @@ from lark import Token, Transformer
 
 import papis.config
 import papis.logging
+import papis.stats
 from papis.format import format
 from papis.strings import AnyString, FormatPattern
 
@@ -90,7 +91,7 @@ def make_document_matcher(
     if isinstance(match_format, str):
         match_format = FormatPattern(None, match_format)
 
-    query = parse_query(search)
+    query = plan_query(parse_query(search))
     return DocumentMatcher(
         search=search, query=query, match_format=match_format, matcher=None
     )
@@ -154,11 +155,28 @@ ESCAPED_STRING: /"([^"\\]|\\.)*"|'([^'\\]|\\.)*'/
 """
 
 
+#: Estimated cost of matching a :class:`Pair` against a single document. This
+#: only requires a dictionary lookup and a regex match on the value.
+PAIR_MATCH_COST = 1.0
+#: Estimated cost of matching a :class:`Term` against a single document. This
+#: requires formatting the :confval:`match-format` for the document, which is
+#: considerably more expensive than a :class:`Pair`.
+TERM_MATCH_COST = 50.0
+
+
 class QueryItem(ABC):
     @abstractmethod
     def match(self, doc: Document, match_format: FormatPattern) -> bool:
         pass
 
+    @property
+    @abstractmethod
+    def cost(self) -> float:
+        """An estimate of the cost of matching this item against a document.
+
+        This is used by :func:`plan_query` to evaluate cheaper items first.
+        """
+
 
 @dataclass
 class And(QueryItem):
@@ -167,6 +185,10 @@ class And(QueryItem):
     def match(self, doc: Document, match_format: FormatPattern) -> bool:
         return all(child.match(doc, match_format) for child in self.children)
 
+    @property
+    def cost(self) -> float:
+        return sum(child.cost for child in self.children)
+
 
 @dataclass
 class Or(QueryItem):
@@ -175,6 +197,10 @@ class Or(QueryItem):
     def match(self, doc: Document, match_format: FormatPattern) -> bool:
         return any(child.match(doc, match_format) for child in self.children)
 
+    @property
+    def cost(self) -> float:
+        return sum(child.cost for child in self.children)
+
 
 @dataclass
 class Not(QueryItem):
@@ -183,6 +209,10 @@ class Not(QueryItem):
     def match(self, doc: Document, match_format: FormatPattern) -> bool:
         return not self.child.match(doc, match_format)
 
+    @property
+    def cost(self) -> float:
+        return self.child.cost
+
 
 @dataclass
 class Term(QueryItem):
@@ -192,6 +222,10 @@ class Term(QueryItem):
     def match(self, doc: Document, match_format: FormatPattern) -> bool:
         return self.pattern.match(format(match_format, doc)) is not None
 
+    @property
+    def cost(self) -> float:
+        return TERM_MATCH_COST
+
 
 @dataclass
 class Pair(QueryItem):
@@ -206,6 +240,10 @@ class Pair(QueryItem):
 
         return self.pattern.match(str(value)) is not None
 
+    @property
+    def cost(self) -> float:
+        return PAIR_MATCH_COST
+
 
 class QueryTransformer(Transformer[Any, QueryItem]):
     def start(self, children: list[QueryItem]) -> QueryItem:  # ruff:ignore[no-self-use]
@@ -244,6 +282,7 @@ def _get_cached_parser() -> Lark:
     return lark.Lark(_QUERY_GRAMMAR, parser="lalr")
 
 
+@papis.stats.timed("docmatcher.parse")
 def parse_query(query_string: str) -> QueryItem:
     r"""Parse a query string to a structured query language.
 
@@ -280,3 +319,173 @@ def parse_query(query_string: str) -> QueryItem:
     logger.debug("Parsed query:\n%s", tree.pretty())
 
     return query
+
+
+def plan_query(query: QueryItem) -> QueryItem:
+    """Reorder the items in *query* so that cheaper items are evaluated first.
+
+    The children of :class:`And` and :class:`Or` items are sorted by their
+    estimated :attr:`~QueryItem.cost`, so that e.g. in ``quantum year:2023``
+    the :class:`Pair` is checked first and the expensive :class:`Term` is only
+    evaluated for documents from 2023. The sort is stable, so items with the
+    same cost keep their order in the query string.
+
+        >>> plan_query(parse_query('quantum year:2023'))
+        And(children=[Pair(key='year', ...), Term(query='quantum', ...)])
+
+    :returns: a new query that matches the same documents as *query*.
+    """
+    if isinstance(query, And):
+        return And(sorted(map(plan_query, query.children), key=lambda q: q.cost))
+    elif isinstance(query, Or):
+        return Or(sorted(map(plan_query, query.children), key=lambda q: q.cost))
+    elif isinstance(query, Not):
+        return Not(plan_query(query.child))
+    else:
+        return query
+
+
+#: Number of documents above which :class:`Term` items are matched in parallel
+#: (see :func:`papis.utils.parmap`).
+PARALLEL_MATCH_THRESHOLD = 512
+
+
+class DocumentIndex:
+    """An index over a fixed sequence of documents used to evaluate queries.
+
+    For every key used in a :class:`Pair`, the index groups the documents by
+    the (string) value of that key. A :class:`Pair` is then answered by matching
+    its pattern once per distinct value instead of once per document, e.g.
+    ``year:2023`` only needs to check the few distinct years in a library.
+    The per-key tables are created lazily, on first use.
+
+    The index is only valid as long as *documents* is not modified, so it
+    should be recreated (or discarded) when documents are added or removed.
+    """
+
+    def __init__(self,
+                 documents: Sequence[Document],
+                 match_string: Callable[[int, FormatPattern], str] | None = None,
+                 ) -> None:
+        #: The documents in the index. Documents are identified by their position
+        #: in this sequence.
+        self.documents = documents
+        #: A function that returns the formatted match format of the document at
+        #: a given position (e.g. from a cache), so that :class:`Term` items can
+        #: be matched without formatting the documents.
+        self.match_string = match_string
+
+        self._keys: dict[str, dict[str, list[int]]] = {}
+
+    def _get_key_table(self, key: str) -> dict[str, list[int]]:
+        table = self._keys.get(key)
+        if table is None:
+            table = {}
+            for i, doc in enumerate(self.documents):
+                value = doc.get(key)
+                if value is not None:
+                    table.setdefault(str(value), []).append(i)
+
+            self._keys[key] = table
+
+        return table
+
+    def lookup(self, key: str, pattern: re.Pattern[str]) -> set[int]:
+        """Find all the documents whose value at *key* matches *pattern*."""
+        result: set[int] = set()
+        for value, indices in self._get_key_table(key).items():
+            if pattern.match(value) is not None:
+                result.update(indices)
+
+        return result
+
+    def select(self,
+               query: QueryItem,
+               match_format: FormatPattern,
+               candidates: set[int] | None = None) -> set[int]:
+        """Find all the documents in *candidates* that match *query*.
+
+        :param candidates: a set of document positions to check. If *None*,
+            all the documents in the index are checked.
+        :returns: the positions of the matching documents.
+        """
+        if candidates is None:
+            candidates = set(range(len(self.documents)))
+
+        if not candidates:
+            return candidates
+
+        if isinstance(query, And):
+            for child in sorted(query.children, key=lambda q: q.cost):
+                candidates = self.select(child, match_format, candidates)
+                if not candidates:
+                    break
+
+            return candidates
+        elif isinstance(query, Or):
+            result: set[int] = set()
+            remaining = set(candidates)
+            for child in sorted(query.children, key=lambda q: q.cost):
+                matched = self.select(child, match_format, remaining)
+                result |= matched
+                remaining -= matched
+                if not remaining:
+                    break
+
+            return result
+        elif isinstance(query, Not):
+            return candidates - self.select(query.child, match_format, candidates)
+        elif isinstance(query, Pair):
+            # NOTE: the lookup matches all distinct values of the key, so it is
+            # only worth it if there are fewer of them than candidates. The table
+            # itself is only created when checking all the documents.
+            table = self._keys.get(query.key)
+            if table is None:
+                use_lookup = len(candidates) == len(self.documents)
+            else:
+                use_lookup = len(candidates) > len(table)
+
+            if use_lookup:
+                return candidates & self.lookup(query.key, query.pattern)
+        elif isinstance(query, Term) and self.match_string is not None:
+            return {
+                i for i in candidates
+                if query.pattern.match(self.match_string(i, match_format)) is not None
+            }
+        elif isinstance(query, Term) and len(candidates) > PARALLEL_MATCH_THRESHOLD:
+            import sys
+
+            if sys.platform != "win32":
+                from functools import partial
+
+                from papis.utils import parmap
+
+                indices = sorted(candidates)
+                is_match = parmap(
+                    partial(_match_query, query, match_format),
+                    [self.documents[i] for i in indices])
+
+                return {i for i, m in zip(indices, is_match, strict=True) if m}
+
+        return {i for i in candidates if query.match(self.documents[i], match_format)}
+
+    @papis.stats.timed("docmatcher.filter")
+    def filter(self,
+               query: QueryItem,
+               match_format: FormatPattern,
+               candidates: set[int] | None = None) -> list[Document]:
+        """Find all the documents in the index that match *query*.
+
+        :param candidates: a set of document positions to check (see
+            :meth:`select`).
+        :returns: a list of matching documents, in the same order as they
+            appear in :attr:`documents`.
+        """
+        return [
+            self.documents[i]
+            for i in sorted(self.select(query, match_format, candidates))
+        ]
+
+
+def _match_query(query: QueryItem, match_format: FormatPattern, doc: Document) -> bool:
+    return query.match(doc, match_format)
@@ -4,6 +4,7 @@ from __future__ import annotations
 import enum
 import os
 import re
+import sys
 from typing import TYPE_CHECKING, Any, NamedTuple, TypeAlias, TypedDict
 
 import papis.config
@@ -11,7 +12,14 @@ import papis.logging
 
 if TYPE_CHECKING:
     import pathlib
-    from collections.abc import Callable, Sequence
+    from collections.abc import (
+        Callable,
+        ItemsView,
+        Iterator,
+        KeysView,
+        Sequence,
+        ValuesView,
+    )
     from typing import Literal
 
     from papis.strings import AnyString
@@ -592,6 +600,293 @@ def from_folder(folder_path: str) -> Document:
     return Document(folder=folder_path)
 
 
+#: Maximum length of string values that are shared between documents by
+#: :func:`compact`. Longer values (e.g. abstracts) are rarely repeated.
+COMPACT_STRING_MAX_LENGTH = 64
+
+
+def _compact_value(value: Any) -> Any:
+    if isinstance(value, str):
+        return sys.intern(value) if len(value) <= COMPACT_STRING_MAX_LENGTH else value
+    elif isinstance(value, list):
+        return [_compact_value(v) for v in value]
+    elif isinstance(value, dict):
+        return {sys.intern(str(k)): _compact_value(v) for k, v in value.items()}
+    else:
+        return value
+
+
+def compact(document: Document) -> None:
+    """Reduce the memory used by *document* (in place).
+
+    All the keys (also in nested dictionaries, such as the ``author_list``) and
+    short string values (e.g. author names, journals or tags) are interned with
+    :func:`sys.intern`, so that they are shared by all the documents in a
+    library. The underlying dictionaries are also rebuilt, so that they do not
+    keep any space left over from earlier modifications. This does not change
+    the contents of the document in any way.
+
+    This is also done for every :class:`CompactDocument`.
+    """
+    items = [(sys.intern(str(k)), _compact_value(v)) for k, v in document.items()]
+
+    dict.clear(document)
+    dict.update(document, items)
+
+
+#: Keys that are stored in an encoded form by :class:`CompactDocument` and only
+#: decoded when they are accessed.
+COMPACT_LAZY_KEYS = frozenset({"abstract", "author_list"})
+
+
+def _encode_value(value: Any) -> bytes:
+    import pickle
+    import zlib
+
+    return zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 1)
+
+
+def _decode_value(value: bytes) -> Any:
+    import pickle
+    import zlib
+
+    return pickle.loads(zlib.decompress(value))
+
+
+class CompactDocument(Document):
+    """A :class:`Document` that uses less memory.
+
+    This class is used by the ``papis`` database backend for the documents it
+    keeps in memory if :confval:`compact-documents` is enabled. It differs from
+    a :class:`Document` in the following ways:
+
+    * The main folder is stored as its parent folder, which is shared by all
+      the documents in the same folder, and its name. The info file path and
+      the :attr:`subfolder` are computed from it when needed and cannot be set.
+    * The keys in :data:`COMPACT_LAZY_KEYS` are stored in a compressed form.
+      They are only decoded when accessed individually (e.g. ``doc["abstract"]``
+      or ``doc.get("author_list")``). Operations that go over all the values
+      (e.g. :meth:`items` or comparisons) decode all of them.
+    * Keys and short values are shared between documents (see :func:`compact`).
+
+    Use :meth:`from_document` to construct a compact copy of a document.
+    """
+
+    __slots__ = ("_encoded", "_name", "_parent")
+
+    def __init__(self,
+                 folder: str | None = None,
+                 data: dict[str, Any] | None = None) -> None:
+        dict.__init__(self)
+
+        self._parent: str | None = None
+        self._name: str | None = None
+        self._encoded: dict[str, bytes] = {}
+
+        if folder is not None:
+            self.set_folder(folder)
+            self.load()
+
+        if data is not None:
+            self.update(data)
+
+    @classmethod
+    def from_document(cls, document: Document) -> CompactDocument:
+        """Construct a compact copy of *document*.
+
+        The values in *document* are not copied, so they are shared with the
+        new document (except for the ones that are encoded).
+        """
+        doc = cls()
+
+        folder = document.get_main_folder()
+        if folder is not None:
+            doc.set_folder(folder)
+
+        for key, value in document.items():
+            key = sys.intern(str(key))
+            if key in COMPACT_LAZY_KEYS:
+                doc._encoded[key] = _encode_value(value)
+            else:
+                dict.__setitem__(doc, key, _compact_value(value))
+
+        return doc
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (_rebuild_compact_document,
+                (dict(dict.items(self)), self._encoded, self.get_main_folder()))
+
+    # {{{ folder
+
+    @property
+    def _folder(self) -> str | None:  # type: ignore[override]
+        if self._name is None:
+            return None
+
+        assert self._parent is not None
+        return os.path.join(self._parent, self._name)
+
+    @property
+    def _info_file_path(self) -> str:  # type: ignore[override]
+        folder = self._folder
+        if folder is None:
+            return ""
+
+        return os.path.join(folder, papis.config.getstring("info-name"))
+
+    @property
+    def subfolder(self) -> str:  # type: ignore[override]
+        folder = self._folder
+        if folder is None:
+            return ""
+
+        return folder.replace(os.path.expanduser("~"), "").replace("/", " ")
+
+    def set_folder(self, folder: str) -> None:
+        parent, name = os.path.split(os.path.expanduser(folder))
+        self._parent = sys.intern(parent)
+        self._name = name
+
+    # }}}
+
+    # {{{ lazy values
+
+    def _decode(self, key: str) -> Any:
+        value = _decode_value(self._encoded.pop(key))
+        dict.__setitem__(self, key, value)
+
+        return value
+
+    def _decode_all(self) -> None:
+        for key in list(self._encoded):
+            self._decode(key)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the document to a standard :class:`dict`.
+
+        Unlike ``dict(doc)``, this does not keep the decoded values in the
+        document, so it remains compact.
+        """
+        result = dict(dict.items(self))
+        for key, value in self._encoded.items():
+            result[key] = _decode_value(value)
+
+        return result
+
+    def __missing__(self, key: str) -> Any:
+        if key in self._encoded:
+            return self._decode(key)
+
+        return ""
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._encoded:
+            return self._decode(key)
+
+        return dict.get(self, key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return dict.__contains__(self, key) or key in self._encoded
+
+    def __len__(self) -> int:
+        return dict.__len__(self) + len(self._encoded)
+
+    def __iter__(self) -> Iterator[str]:
+        # NOTE: accessing a key while iterating decodes it, which moves it from
+        # `_encoded` to the dict, so a snapshot of the keys is iterated instead
+        return iter([*dict.keys(self), *self._encoded])
+
+    def __eq__(self, other: object) -> bool:
+        self._decode_all()
+        if isinstance(other, CompactDocument):
+            other._decode_all()
+
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        self._decode_all()
+        return dict.__repr__(self)
+
+    def keys(self) -> KeysView[str]:  # type: ignore[override]
+        from collections.abc import KeysView
+        return KeysView(self)
+
+    def items(self) -> ItemsView[str, Any]:  # type: ignore[override]
+        self._decode_all()
+        return dict.items(self)
+
+    def values(self) -> ValuesView[Any]:  # type: ignore[override]
+        self._decode_all()
+        return dict.values(self)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._encoded.pop(key, None)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        if self._encoded.pop(key, None) is None:
+            dict.__delitem__(self, key)
+
+    def pop(self, key: str, *args: Any) -> Any:
+        if key in self._encoded:
+            self._decode(key)
+
+        return dict.pop(self, key, *args)
+
+    def popitem(self) -> tuple[str, Any]:
+        self._decode_all()
+        return dict.popitem(self)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key in self._encoded:
+            return self._decode(key)
+
+        return dict.setdefault(self, key, default)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        incoming = dict(*args, **kwargs)
+        for key in incoming:
+            self._encoded.pop(key, None)
+
+        super().update(incoming)
+
+    def clear(self) -> None:
+        self._encoded.clear()
+        dict.clear(self)
+
+    def copy(self) -> CompactDocument:
+        """Make a shallow copy of the :class:`CompactDocument`."""
+        doc = CompactDocument()
+        dict.update(doc, dict.items(self))
+        doc._encoded = self._encoded.copy()
+
+        folder = self.get_main_folder()
+        if folder:
+            doc.set_folder(folder)
+
+        return doc
+
+    # }}}
+
+
+def _rebuild_compact_document(data: dict[str, Any],
+                              encoded: dict[str, bytes],
+                              folder: str | None) -> CompactDocument:
+    doc = CompactDocument()
+    dict.update(doc, data)
+    doc._encoded = encoded
+
+    if folder is not None:
+        doc.set_folder(folder)
+
+    return doc
+
+
 def is_document_folder(path: pathlib.Path) -> bool:
     """Check whether *path* is an existing document folder.
 
@@ -727,6 +1022,12 @@ def move(document: Document, path: str, *, dirumask: int | None = None) -> None:
     os.chmod(path, dirumask)
     document.set_folder(path)
 
+    # NOTE: remove the staging folder used by `new`, if no other documents use it
+    from papis.paths import STAGING_FOLDER_NAME, remove_staging_folder
+
+    if os.path.basename(os.path.dirname(folder)) == STAGING_FOLDER_NAME:
+        remove_staging_folder(folder)
+
 
 def sort(docs: Sequence[Document], key: str, reverse: bool = False) -> list[Document]:
     """Sort a list of documents by the given *key*.
@@ -779,9 +1080,10 @@ def sort(docs: Sequence[Document], key: str, reverse: bool = False) -> list[Docu
 def new(
         data: DocumentLike,
         files: Sequence[str] = (), *,
-        mode: Literal["copy", "link"] = "copy",
+        mode: Literal["copy", "link", "move"] = "copy",
         file_name_format: AnyString | None = None,
-        auto_doctor: bool = False) -> Document:
+        auto_doctor: bool = False,
+        base_path: str | None = None) -> Document:
     """Create a new document from *data* and *files* in a temporary directory.
 
     This function handles all non-interactive steps of creating a document:
@@ -789,30 +1091,35 @@ def new(
     checks, renaming files, and copying or linking them into the document
     folder.
 
-    The document is created in a temporary directory. The caller is
-    responsible for moving it to its final location and adding it to the
-    database.
+    The document is created in a temporary directory inside *base_path* (see
+    :func:`~papis.paths.get_staging_folder`), so that moving it to its final
+    location is cheap. The caller is responsible for this move and for adding
+    the document to the database.
 
     :param data: a :class:`dict` with key and values to be used as metadata
         in the document.
     :param files: a sequence of file paths to add to the document.
     :param mode: how to place files into the document directory: ``"copy"``
-        copies files, ``"link"`` creates symbolic links to the originals.
+        copies files, ``"link"`` creates symbolic links to the originals and
+        ``"move"`` is meant for files that are removed by the caller afterwards.
+        Copies use :func:`~papis.paths.copy_file`, which tries to avoid copying
+        the data (e.g. using reflinks) and, for ``"move"``, creates hard links
+        when possible.
     :param file_name_format: a format pattern used to construct new file names
         from the document data (defaults to :confval:`add-file-name`).
     :param auto_doctor: if *True*, run the doctor auto-fixers on the document
         before saving.
+    :param base_path: the folder where the document will be moved afterwards.
+        If not given, the folder of the current library is used.
     :returns: the new document, residing in a temporary directory.
     """
-    import shutil
-    import tempfile
+    from papis.database import get as get_database
+    from papis.paths import get_staging_folder
 
-    temp_dir = tempfile.mkdtemp()
+    temp_dir = get_staging_folder(base_path)
     doc = Document(folder=temp_dir, data=data)
 
     # Compute a unique Papis ID for the document
-    from papis.database import get as get_database
-
     db = get_database()
     db.maybe_compute_id(doc)
 
@@ -840,7 +1147,7 @@ def new(
         fix_errors(doc)
 
     # Rename files according to the format pattern
-    from papis.paths import rename_document_files, symlink
+    from papis.paths import copy_file, rename_document_files, symlink
 
     renamed_files = rename_document_files(
         doc, files,
@@ -853,8 +1160,11 @@ def new(
 
         if mode == "link":
             symlink(in_file_path, out_file_path)
+        elif mode == "move":
+            copy_file(in_file_path, out_file_path,
+                      methods=("hardlink", "reflink", "copy"))
         else:
-            shutil.copy(in_file_path, out_file_path)
+            copy_file(in_file_path, out_file_path)
 
         document_file_list.append(out_file_name)
 
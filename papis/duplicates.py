@@ -0,0 +1,288 @@
+"""Find clusters of (near-)duplicate documents in a library.
+
+Exact duplicates, i.e. documents that share one of the
+:confval:`unique-document-keys`, are easy to find (see
+:mod:`papis.database.unique`). However, the same paper is often added twice
+from different sources (e.g. once from arXiv and once from the journal), with
+slightly different titles and no common identifier. These near-duplicates are
+found here by comparing the titles, authors and years of the documents.
+
+Comparing all pairs of documents is too slow for large libraries, so the
+documents are first split into (overlapping) blocks that share a cheap key:
+
+* the family name of the first author and a pair of consecutive title words,
+* the year and a pair of consecutive title words, for documents without authors,
+* the value of any of the :confval:`unique-document-keys`.
+
+Only documents in the same block are compared, using the similarity given by
+:func:`get_similarity`. Pairs that are similar enough are then joined into
+clusters, which can be merged using ``papis merge --duplicates``.
+"""
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, NamedTuple
+
+import papis.config
+import papis.logging
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from papis.document import Document
+
+logger = papis.logging.get_logger(__name__)
+
+#: Default minimum similarity (see :func:`get_similarity`) for two documents to
+#: be considered duplicates.
+DUPLICATE_SIMILARITY_THRESHOLD = 0.8
+
+#: Blocks with more documents than this are skipped, since they are given by
+#: very common keys (e.g. a common family name and "neural networks") and would
+#: result in a quadratic number of comparisons.
+MAX_BLOCK_SIZE = 128
+
+#: Minimum number of candidate pairs for which the similarities are computed in
+#: parallel (see :func:`papis.utils.parmap`).
+PARALLEL_SIMILARITY_THRESHOLD = 20000
+
+# NOTE: these are skipped when constructing the blocks from the title words
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "by", "for", "from", "in", "into",
+    "is", "its", "of", "on", "or", "the", "to", "via", "with",
+    })
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+class Fingerprint(NamedTuple):
+    """A summary of a document that is used to compare it to other documents."""
+
+    #: Normalized words in the title of the document.
+    words: tuple[str, ...]
+    #: Character trigrams of the normalized title.
+    trigrams: frozenset[str]
+    #: Normalized family name of the first author.
+    family: str | None
+    #: Publication year of the document.
+    year: int | None
+    #: Normalized values of the :confval:`unique-document-keys`.
+    unique_values: frozenset[tuple[str, str]]
+
+
+def normalize_text(text: str) -> list[str]:
+    """Split *text* into case-folded words without any accents or punctuation.
+
+    >>> normalize_text("Schrödinger's   CAT-states")
+    ['schrodinger', 's', 'cat', 'states']
+    """
+    import unicodedata
+
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+
+    return _WORD_RE.findall(text.casefold())
+
+
+def _get_first_author_family(doc: Document) -> str | None:
+    author_list = doc.get("author_list")
+    if not author_list:
+        author = doc.get("author")
+        if not author:
+            return None
+
+        from papis.document import split_authors_name
+
+        author_list = split_authors_name(str(author))
+
+    family = author_list[0].get("family") if author_list else None
+    words = normalize_text(str(family)) if family else []
+
+    return " ".join(words) or None
+
+
+def _get_year(doc: Document) -> int | None:
+    try:
+        return int(str(doc.get("year", "")).strip()[:4])
+    except ValueError:
+        return None
+
+
+def get_fingerprint(doc: Document,
+                    unique_document_keys: Sequence[str] | None = None,
+                    ) -> Fingerprint:
+    """Construct a :class:`Fingerprint` for the document *doc*.
+
+    :param unique_document_keys: a list of keys that uniquely identify a
+        document. This defaults to :confval:`unique-document-keys`.
+    """
+    from papis.database.unique import get_unique_values
+
+    if unique_document_keys is None:
+        unique_document_keys = papis.config.getlist("unique-document-keys")
+
+    words = tuple(normalize_text(str(doc.get("title", ""))))
+
+    title = " ".join(words)
+    trigrams = frozenset(title[i:i + 3] for i in range(len(title) - 2))
+
+    return Fingerprint(
+        words=words,
+        trigrams=trigrams,
+        family=_get_first_author_family(doc),
+        year=_get_year(doc),
+        unique_values=frozenset(get_unique_values(doc, unique_document_keys)),
+    )
+
+
+def get_blocking_keys(fp: Fingerprint) -> set[tuple[str, ...]]:
+    """Get the keys of all the blocks that contain a document.
+
+    >>> fp = Fingerprint(("the", "theory", "of", "everything"), frozenset(),
+    ...                  "hawking", 2002, frozenset())
+    >>> sorted(get_blocking_keys(fp))
+    [('author', 'hawking', 'theory everything')]
+    """
+    words = [w for w in fp.words if w not in _STOPWORDS]
+    if len(words) == 1:
+        bigrams = {words[0]}
+    else:
+        from itertools import pairwise
+
+        bigrams = {f"{a} {b}" for a, b in pairwise(words)}
+
+    result: set[tuple[str, ...]] = set()
+    if fp.family is not None:
+        result.update(("author", fp.family, bigram) for bigram in bigrams)
+    elif fp.year is not None:
+        result.update(("year", str(fp.year), bigram) for bigram in bigrams)
+
+    result.update(("key", *value) for value in fp.unique_values)
+
+    return result
+
+
+def get_similarity(a: Fingerprint, b: Fingerprint) -> float:
+    """Compute a similarity score between two documents.
+
+    Documents that share any of the :confval:`unique-document-keys` have a
+    similarity of 1. Otherwise, the similarity is a weighted sum of the Jaccard
+    index of the title trigrams, a match of the first author family name and
+    the difference in the publication years.
+
+    :returns: a number between 0 and 1, where 1 means that the documents are
+        (most likely) duplicates.
+    """
+    if not a.unique_values.isdisjoint(b.unique_values):
+        return 1.0
+
+    if not a.trigrams or not b.trigrams:
+        return 0.0
+
+    title = len(a.trigrams & b.trigrams) / len(a.trigrams | b.trigrams)
+
+    if a.family is None or b.family is None:
+        author = 0.5
+    else:
+        author = 1.0 if a.family == b.family else 0.0
+
+    if a.year is None or b.year is None:
+        year = 0.5
+    else:
+        # NOTE: preprints are often published in the following year
+        year = 1.0 if abs(a.year - b.year) <= 1 else 0.0
+
+    return 0.7 * title + 0.2 * author + 0.1 * year
+
+
+def _get_similar_pairs(
+        pairs: list[tuple[int, int, Fingerprint, Fingerprint]],
+        threshold: float) -> list[tuple[int, int]]:
+    return [(i, j) for i, j, a, b in pairs if get_similarity(a, b) >= threshold]
+
+
+def find_duplicates(
+        documents: Sequence[Document],
+        threshold: float = DUPLICATE_SIMILARITY_THRESHOLD,
+        ) -> list[list[Document]]:
+    """Find clusters of duplicate documents in *documents*.
+
+    :param threshold: minimum similarity (see :func:`get_similarity`) for two
+        documents to be considered duplicates.
+    :returns: a list of clusters of duplicate documents, each with at least two
+        documents. Clusters are transitive, so two documents in the same cluster
+        need not be similar themselves.
+    """
+    import time
+
+    begin_t = time.time()
+    unique_document_keys = papis.config.getlist("unique-document-keys")
+    fingerprints = [get_fingerprint(doc, unique_document_keys) for doc in documents]
+
+    blocks: dict[tuple[str, ...], list[int]] = {}
+    for i, fp in enumerate(fingerprints):
+        for key in get_blocking_keys(fp):
+            blocks.setdefault(key, []).append(i)
+
+    candidates: set[tuple[int, int]] = set()
+    for key, block in blocks.items():
+        if len(block) < 2:
+            continue
+
+        if len(block) > MAX_BLOCK_SIZE and key[0] != "key":
+            logger.debug("Skipping block %s with %d documents.", key, len(block))
+            continue
+
+        candidates.update(
+            (block[i], block[j])
+            for i in range(len(block))
+            for j in range(i + 1, len(block)))
+
+    logger.debug("Found %d candidate pairs in %d blocks.",
+                 len(candidates), len(blocks))
+
+    pairs = [(i, j, fingerprints[i], fingerprints[j]) for i, j in candidates]
+    if len(pairs) >= PARALLEL_SIMILARITY_THRESHOLD:
+        from functools import partial
+
+        from papis.utils import get_process_count, parmap
+
+        np = get_process_count()
+        nchunks = max(np, 1)
+        chunk_size = (len(pairs) + nchunks - 1) // nchunks
+        chunks = [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+
+        similar_pairs = [
+            pair
+            for chunk in parmap(partial(_get_similar_pairs, threshold=threshold),
+                                chunks, np=np)
+            for pair in chunk]
+    else:
+        similar_pairs = _get_similar_pairs(pairs, threshold)
+
+    parent = list(range(len(documents)))
+
+    def find_root(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+
+        return i
+
+    for i, j in similar_pairs:
+        root_i, root_j = find_root(i), find_root(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    clusters: dict[int, list[int]] = {}
+    for i in range(len(documents)):
+        clusters.setdefault(find_root(i), []).append(i)
+
+    result = [[documents[i] for i in cluster]
+              for _, cluster in sorted(clusters.items())
+              if len(cluster) > 1]
+
+    logger.debug("Found %d clusters of duplicates in %.1f ms.",
+                 len(result), 1000 * (time.time() - begin_t))
+
+    return result
@@ -21,10 +21,15 @@ def cli(ctx: click.Context, bibfile: str) -> None:
     """
     logger.info("Reading BibTeX file '%s'...", bibfile)
 
-    from papis.bibtex import bibtex_to_dict
+    from papis.bibtex import iter_bibtex_entries
     from papis.document import from_data
 
-    docs = [from_data(d) for d in bibtex_to_dict(bibfile)]
+    docs = []
+    for d in iter_bibtex_entries(bibfile):
+        docs.append(from_data(d))
+        if len(docs) % 10000 == 0:
+            logger.info("Read %d documents...", len(docs))
+
     ctx.obj["documents"] += docs
 
     logger.info("Found %d documents.", len(docs))
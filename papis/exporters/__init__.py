@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator
 from typing import TypeAlias, cast
 
 from papis.document import Document
@@ -9,6 +9,34 @@ from papis.document import Document
 EXPORTER_NAMESPACE_NAME = "papis.exporter"
 #: Type alias for an exporter callable.
 Exporter: TypeAlias = Callable[[list[Document]], str]
+#: Type alias for an exporter callable that produces its output incrementally.
+IterExporter: TypeAlias = Callable[[Iterable[Document]], Iterator[str]]
+
+
+class StreamingExporter:
+    """An exporter that can produce its output incrementally.
+
+    This wraps a function that converts each document as it is consumed from
+    an iterable and yields the resulting strings, so that large libraries can be
+    exported without keeping the whole output in memory. Calling the exporter
+    still returns the full output as a single string, like any other
+    :data:`Exporter`.
+
+    .. code:: python
+
+        def export_iter(documents: Iterable[Document]) -> Iterator[str]:
+            for doc in documents:
+                yield f"{doc['title']}\\n"
+
+        exporter = StreamingExporter(export_iter)
+    """
+
+    def __init__(self, export_iter: IterExporter) -> None:
+        self.export_iter = export_iter
+        self.__doc__ = export_iter.__doc__
+
+    def __call__(self, documents: list[Document]) -> str:
+        return "".join(self.export_iter(documents))
 
 
 def get_available_exporters() -> list[str]:
@@ -36,3 +64,20 @@ def get_exporter_by_name(name: str) -> Exporter:
         raise InvalidPluginTypeError(EXPORTER_NAMESPACE_NAME, name)
 
     return cast("Exporter", func)
+
+
+def get_iter_exporter_by_name(name: str) -> IterExporter:
+    """Get a version of the exporter with name *name* that produces its output
+    incrementally.
+
+    If the exporter is not a :class:`StreamingExporter`, the returned function
+    collects all the documents and calls the exporter once.
+    """
+    exporter = get_exporter_by_name(name)
+    if isinstance(exporter, StreamingExporter):
+        return exporter.export_iter
+
+    def export_iter(documents: Iterable[Document]) -> Iterator[str]:
+        yield exporter(list(documents))
+
+    return export_iter
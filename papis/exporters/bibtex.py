@@ -1,20 +1,113 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import os
+from functools import cache
+from typing import TYPE_CHECKING, Any, NamedTuple
 
 import papis.logging
+from papis.exporters import StreamingExporter
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
     from papis.document import Document
 
 logger = papis.logging.get_logger(__name__)
 
+#: Number of documents that are converted together when exporting. For large
+#: exports, these chunks are converted in parallel (see
+#: :func:`papis.utils.get_process_count`).
+BIBTEX_EXPORT_CHUNK_SIZE = 128
+
+#: Version of the BibTeX export cache (including the output of :func:`to_bibtex`).
+BIBTEX_CACHE_VERSION = 1
+
+#: Maximum number of entries kept in the BibTeX export cache. The least
+#: recently used entries are removed first.
+BIBTEX_CACHE_MAX_ENTRIES = 50000
+
+
+class BibTeXOptions(NamedTuple):
+    """Options used to convert documents with :func:`to_bibtex`."""
+
+    #: If *True*, field values can contain unicode characters.
+    unicode: bool
+    #: Key in the document that is used as the BibTeX ``journal`` field.
+    journal_key: str
+    #: If *True*, a ``file`` field is added to each BibTeX entry.
+    export_file: bool
+    #: Known BibTeX types (see :data:`papis.bibtex.bibtex_types`).
+    types: frozenset[str]
+    #: Known BibTeX fields (see :data:`papis.bibtex.bibtex_keys`).
+    keys: frozenset[str]
+    #: BibTeX fields that are not exported (see
+    #: :data:`papis.bibtex.bibtex_ignore_keys`).
+    ignore_keys: frozenset[str]
+    #: Indentation of the BibTeX fields.
+    indent: int = 2
+
+
+def get_bibtex_options(*,
+                       bibtex_unicode: bool | None = None,
+                       bibtex_journal_key: str | None = None,
+                       bibtex_export_file: bool | None = None,
+                       indent: int = 2) -> BibTeXOptions:
+    """Resolve the options used by :func:`to_bibtex`.
+
+    Any option that is not given is taken from the configuration (see
+    :func:`to_bibtex` for the relevant settings). When exporting many documents,
+    this should be called once and the result passed to each conversion.
+    """
+    from papis.config import getboolean, getstring
+
+    if bibtex_unicode is None:
+        bibtex_unicode = getboolean("bibtex-unicode")
+
+    if bibtex_journal_key is None:
+        bibtex_journal_key = getstring("bibtex-journal-key")
+
+    if bibtex_export_file is None:
+        from papis.exceptions import DefaultSettingValueMissing
+
+        try:
+            # NOTE: this option is deprecated and should be removed in the future
+            bibtex_export_file = getboolean("bibtex-export-zotero-file")
+            logger.warning("The 'bibtex-export-zotero-file' option is deprecated. "
+                           "Use 'bibtex-export-file' instead.")
+        except DefaultSettingValueMissing:
+            bibtex_export_file = getboolean("bibtex-export-file")
+
+    import papis.bibtex
+
+    # NOTE: the known types and keys are included explicitly, since they are
+    # only read from the configuration when `papis.bibtex` is imported
+    return BibTeXOptions(
+        unicode=bool(bibtex_unicode),
+        journal_key=bibtex_journal_key,
+        export_file=bool(bibtex_export_file),
+        types=papis.bibtex.bibtex_types,
+        keys=papis.bibtex.bibtex_keys,
+        ignore_keys=papis.bibtex.bibtex_ignore_keys,
+        indent=indent)
+
+
+@cache
+def _get_bibtex_writer(indent: int) -> Any:
+    from bibtexparser.bwriter import BibTexWriter
+
+    writer = BibTexWriter()
+    writer.add_trailing_comma = True
+    writer.indent = " " * indent
+
+    return writer
+
 
 def to_bibtex(document: Document, *,
               bibtex_unicode: bool | None = None,
               bibtex_journal_key: str | None = None,
               bibtex_export_file: bool | None = None,
-              indent: int = 2) -> str:
+              indent: int = 2,
+              options: BibTeXOptions | None = None) -> str:
     """Convert a document to a BibTeX containing only valid metadata.
 
     To convert a document, it must have a valid BibTeX type
@@ -30,36 +123,25 @@ def to_bibtex(document: Document, *,
       the BibTeX entry, which can be used by e.g. Zotero to import documents.
 
     :param indent: set indentation for the BibTeX fields.
+    :param options: options resolved by :func:`get_bibtex_options`. If given,
+        all the other options are ignored.
     :returns: a string containing the document metadata in a BibTeX format.
     """
+    if options is None:
+        options = get_bibtex_options(
+            bibtex_unicode=bibtex_unicode,
+            bibtex_journal_key=bibtex_journal_key,
+            bibtex_export_file=bibtex_export_file,
+            indent=indent)
 
-    from papis.config import getboolean, getstring
-
-    if bibtex_unicode is None:
-        bibtex_unicode = getboolean("bibtex-unicode")
-
-    if bibtex_journal_key is None:
-        bibtex_journal_key = getstring("bibtex-journal-key")
-
-    if bibtex_export_file is None:
-        from papis.exceptions import DefaultSettingValueMissing
-
-        try:
-            # NOTE: this option is deprecated and should be removed in the future
-            bibtex_export_file = getboolean("bibtex-export-zotero-file")
-            logger.warning("The 'bibtex-export-zotero-file' option is deprecated. "
-                           "Use 'bibtex-export-file' instead.")
-        except DefaultSettingValueMissing:
-            bibtex_export_file = getboolean("bibtex-export-file")
-
-    from papis.bibtex import bibtex_type_converter, bibtex_types
+    from papis.bibtex import bibtex_type_converter
 
     # determine bibtex type
     bibtex_type = ""
     if "type" in document:
         dtype = document["type"]
 
-        if dtype in bibtex_types:
+        if dtype in options.types:
             bibtex_type = dtype
         elif dtype in bibtex_type_converter:
             bibtex_type = bibtex_type_converter[dtype]
@@ -94,30 +176,28 @@ def to_bibtex(document: Document, *,
 
     from papis.bibtex import (
         author_list_to_author,
-        bibtex_ignore_keys,
         bibtex_key_converter,
-        bibtex_keys,
         bibtex_verbatim_fields,
     )
 
     for key in sorted(document):
         bib_key = bibtex_key_converter.get(key, key)
-        if bib_key not in bibtex_keys:
+        if bib_key not in options.keys:
             continue
 
-        if bib_key in bibtex_ignore_keys:
+        if bib_key in options.ignore_keys:
             continue
 
         bib_value = str(document[key])
         logger.debug("Processing BibTeX entry: '%s: %s'.", bib_key, bib_value)
 
         if bib_key == "journal":
-            if bibtex_journal_key in document:
-                bib_value = str(document[bibtex_journal_key])
+            if options.journal_key in document:
+                bib_value = str(document[options.journal_key])
             else:
                 logger.warning(
                     "'journal-key' key '%s' is not present for ref '%s'.",
-                    bibtex_journal_key, document["ref"])
+                    options.journal_key, document["ref"])
         elif bib_key == "author" and "author_list" in document:
             bib_value = author_list_to_author(document, document["author_list"])
 
@@ -125,13 +205,13 @@ def to_bibtex(document: Document, *,
         if override_key in document:
             bib_value = str(document[override_key])
 
-        if not bibtex_unicode and bib_key not in bibtex_verbatim_fields:
+        if not options.unicode and bib_key not in bibtex_verbatim_fields:
             bib_value = string_to_latex(bib_value)
 
         entry[bib_key] = bib_value
 
     # handle file exporting
-    if bibtex_export_file:
+    if options.export_file:
         files = document.get_files()
         if files:
             entry["file"] = ";".join(files)
@@ -139,29 +219,264 @@ def to_bibtex(document: Document, *,
     # dump the BibTeX data using bibtexparser
     from bibtexparser import dumps
     from bibtexparser.bibdatabase import BibDatabase
-    from bibtexparser.bwriter import BibTexWriter
 
     db = BibDatabase()
     db.entries = [entry]
 
-    writer = BibTexWriter()
-    writer.add_trailing_comma = True
-    writer.indent = " " * indent
-
+    writer = _get_bibtex_writer(options.indent)
     return str(dumps(db, writer=writer).strip())
 
 
-def exporter(documents: list[Document]) -> str:
+def get_bibtex_cache_path() -> str:
+    """Get the full path to the BibTeX export cache file."""
+    from papis.utils import get_cache_home
+
+    folder = os.path.join(get_cache_home(), "exporters")
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+
+    return os.path.join(folder, "bibtex.pickle")
+
+
+class BibTeXCache:
+    """A persistent cache of the BibTeX entries created by :func:`to_bibtex`.
+
+    Entries are stored by a hash of the document contents (and its folder,
+    if the files are exported), so any change to the document results in a
+    new entry. The whole cache is discarded when the *options* or any of the
+    settings that affect the output (e.g. :confval:`ref-format`) change.
+    """
+
+    def __init__(self, options: BibTeXOptions) -> None:
+        self.options = options
+        self.path = get_bibtex_cache_path()
+
+        self._signature = self._get_signature()
+        self._entries: dict[str, str] | None = None
+        self._modified = False
+
+    def _get_signature(self) -> str:
+        import hashlib
+        import pickle
+
+        import bibtexparser
+
+        from papis.config import getformatpattern, getstring
+
+        # NOTE: the sets are sorted, since their order is not stable between runs
+        options = self.options
+        fmt = getformatpattern("ref-format")
+        data = (
+            BIBTEX_CACHE_VERSION,
+            options.unicode, options.journal_key, options.export_file, options.indent,
+            sorted(options.keys),
+            sorted(options.types),
+            sorted(options.ignore_keys),
+            fmt.formatter, fmt.pattern,
+            getstring("ref-word-separator"),
+            bibtexparser.__version__,
+        )
+
+        return hashlib.blake2b(pickle.dumps(data)).hexdigest()
+
+    def _load(self) -> dict[str, str]:
+        if self._entries is not None:
+            return self._entries
+
+        self._entries = {}
+        if not os.path.exists(self.path):
+            return self._entries
+
+        import pickle
+
+        try:
+            with open(self.path, "rb") as fd:
+                data = pickle.load(fd)
+        except Exception as exc:
+            logger.debug("Failed to read BibTeX export cache at '%s'.",
+                         self.path, exc_info=exc)
+            return self._entries
+
+        if data.get("signature") != self._signature:
+            logger.debug("BibTeX export cache at '%s' is outdated.", self.path)
+            return self._entries
+
+        self._entries = data["entries"]
+        return self._entries
+
+    def get_key(self, document: Document) -> str | None:
+        """Get the key of *document* in the cache.
+
+        :returns: a hash of the document contents or *None* if the document
+            cannot be cached.
+        """
+        import hashlib
+        import pickle
+
+        folder = document.get_main_folder() if self.options.export_file else None
+        try:
+            data = pickle.dumps((folder, sorted(document.items())),
+                                protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return None
+
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def get(self, key: str | None) -> str | None:
+        """Get the BibTeX entry for the document with the given *key*, if any."""
+        if key is None:
+            return None
+
+        entries = self._load()
+        entry = entries.pop(key, None)
+        if entry is not None:
+            # NOTE: move the entry to the end, so that it is removed last
+            entries[key] = entry
+
+        return entry
+
+    def set(self, key: str | None, entry: str) -> None:
+        """Store the BibTeX *entry* for the document with the given *key*."""
+        if key is None or not entry:
+            return
+
+        self._load()[key] = entry
+        self._modified = True
+
+    def save(self) -> None:
+        """Write the cache to disk, if any entries were added."""
+        if not self._modified or self._entries is None:
+            return
+
+        import pickle
+
+        entries = self._entries
+        if len(entries) > BIBTEX_CACHE_MAX_ENTRIES:
+            entries = dict(list(entries.items())[-BIBTEX_CACHE_MAX_ENTRIES:])
+
+        data = {"signature": self._signature, "entries": entries}
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as fd:
+            pickle.dump(data, fd, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+        self._entries = entries
+        self._modified = False
+
+
+def _render_entries(documents: list[Document], options: BibTeXOptions) -> list[str]:
+    return [to_bibtex(doc, options=options) for doc in documents]
+
+
+def iter_bibtex(documents: Iterable[Document],
+                options: BibTeXOptions | None = None,
+                ) -> Iterator[tuple[Document, str]]:
+    """Convert each document in *documents* to BibTeX with :func:`to_bibtex`.
+
+    The options are only resolved once for all the documents. If
+    :confval:`bibtex-export-cache` is enabled, entries of documents that have
+    not changed since they were last exported are taken from the cache (see
+    :class:`BibTeXCache`). If none of the first :data:`BIBTEX_EXPORT_CHUNK_SIZE`
+    documents were cached, the remaining documents are converted in parallel
+    (see :func:`~papis.utils.parmap_iter`), in chunks of the same size.
+
+    :returns: an iterator over each document and its BibTeX entry, in the same
+        order as *documents*. The entry is empty if the conversion failed.
+    """
+    from collections import deque
+    from functools import partial
+    from itertools import islice
+
+    from papis.config import getboolean
+    from papis.utils import get_process_count, parmap_iter
+
+    if options is None:
+        options = get_bibtex_options()
+
+    bibcache = BibTeXCache(options) if getboolean("bibtex-export-cache") else None
+    docs = iter(documents)
+
+    # NOTE: chunks that were sent to be rendered as (documents, keys, entries),
+    # where the entries are *None* for the documents that were not cached
+    pending: deque[tuple[list[Document], list[str | None], list[str | None]]] = (
+        deque())
+
+    def tasks() -> Iterator[list[Document]]:
+        while True:
+            chunk = list(islice(docs, BIBTEX_EXPORT_CHUNK_SIZE))
+            if not chunk:
+                break
+
+            if bibcache is None:
+                keys: list[str | None] = [None] * len(chunk)
+                entries: list[str | None] = [None] * len(chunk)
+            else:
+                keys = [bibcache.get_key(doc) for doc in chunk]
+                entries = [bibcache.get(key) for key in keys]
+
+            # NOTE: the results are matched to the chunks in order, so the chunk
+            # is recorded before it is sent
+            pending.append((chunk, keys, entries))
+            yield [doc for doc, entry in zip(chunk, entries, strict=True)
+                   if entry is None]
+
+    def convert(doc: Document) -> tuple[str, bool]:
+        key = bibcache.get_key(doc) if bibcache is not None else None
+        entry = bibcache.get(key) if bibcache is not None else None
+        if entry is not None:
+            return entry, True
+
+        entry = to_bibtex(doc, options=options)
+        if bibcache is not None:
+            bibcache.set(key, entry)
+
+        return entry, False
+
+    try:
+        # NOTE: the first documents are converted one by one, so that they can
+        # be returned lazily and to check how many of them are cached
+        nmissing = 0
+        for doc in islice(docs, BIBTEX_EXPORT_CHUNK_SIZE):
+            entry, cached = convert(doc)
+            nmissing += not cached
+
+            yield doc, entry
+
+        # NOTE: worker processes are only used if none of the first documents
+        # were cached, since cached entries do not need to be rendered
+        np = get_process_count() if nmissing == BIBTEX_EXPORT_CHUNK_SIZE else 0
+        render = partial(_render_entries, options=options)
+        for rendered in parmap_iter(render, tasks(), np=np):
+            chunk, keys, entries = pending.popleft()
+
+            it = iter(rendered)
+            for doc, key, cached_entry in zip(chunk, keys, entries, strict=True):
+                if cached_entry is None:
+                    entry = next(it)
+                    if bibcache is not None:
+                        bibcache.set(key, entry)
+                else:
+                    entry = cached_entry
+
+                yield doc, entry
+    finally:
+        if bibcache is not None:
+            bibcache.save()
+
+
+def export_iter(documents: Iterable[Document]) -> Iterator[str]:
     """Convert documents into a list of BibLaTeX entries"""
     from papis.document import describe
 
-    result = []
-    for doc in documents:
-        bib = to_bibtex(doc)
+    separator = ""
+    for doc, bib in iter_bibtex(documents):
         if not bib:
             logger.warning("Skipping document export: '%s'.", describe(doc))
             continue
 
-        result.append(bib)
+        yield f"{separator}{bib}"
+        separator = "\n\n"
+
 
-    return "\n\n".join(result)
+exporter = StreamingExporter(export_iter)
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 import os
+from functools import lru_cache
 from typing import TYPE_CHECKING, Any
 
 import papis.config
 import papis.logging
+from papis.exporters import StreamingExporter
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
+    from citeproc import CitationStylesStyle
     from citeproc.source import Date, Reference
 
     from papis.document import Document
@@ -86,11 +91,14 @@ def _parse_date(doc: Document) -> Date | None:
     return Date(**date)
 
 
-def to_csl(doc: Document) -> Reference:
+def to_csl(doc: Document, ref: str | None = None) -> Reference:
     """Convert a document into a dictionary of keys supported by :mod:`citeproc`.
 
     This function only converts keys that are supported, while other keys in the
     document are ignored.
+
+    :arg ref: the key of the reference in a bibliography. This defaults to the
+        (lower case) ``ref`` of the document.
     """
     from citeproc.source import Name
     from citeproc.source.bibtex import BibTeX
@@ -138,7 +146,10 @@ def to_csl(doc: Document) -> Reference:
     from citeproc.source.bibtex import BibTeX
 
     csl_type = BibTeX.types.get(doc["type"], BibTeX.types["misc"])
-    return Reference(doc["ref"].lower(), csl_type, **result)
+    if ref is None:
+        ref = doc["ref"].lower()
+
+    return Reference(ref, csl_type, **result)
 
 
 def normalize_style_path(name: str) -> str:
@@ -163,15 +174,31 @@ def normalize_style_path(name: str) -> str:
     return ""
 
 
-def export_document(doc: Document,
-                    style_name: str | None = None,
-                    formatter_name: str | None = None) -> str:
-    if style_name is None:
-        style_name = papis.config.getstring("csl-style")
+@lru_cache(maxsize=8)
+def _load_style(style_path: str, mtime: float) -> CitationStylesStyle:
+    from citeproc import CitationStylesStyle
+
+    logger.debug("Loading CSL style from '%s' (mtime %s).", style_path, mtime)
+    return CitationStylesStyle(style_path, validate=False)
+
+
+def load_style(style_path: str) -> CitationStylesStyle:
+    """Load the CSL style at *style_path*.
+
+    Parsing a style is fairly expensive, so styles are cached by their path and
+    modification time. Modifying the style file invalidates the cache.
+    """
+    return _load_style(style_path, os.path.getmtime(style_path))
 
-    if formatter_name is None:
-        formatter_name = papis.config.getstring("csl-formatter")
 
+def get_style_path(style_name: str) -> str:
+    """Find the path to the CSL style *style_name*.
+
+    :arg style_name: an absolute path to a style file or the name of a style,
+        which is looked up in the styles that come with :mod:`citeproc`, in
+        :func:`get_styles_folder` or downloaded from Zotero.
+    :returns: the path to the style or an empty string if it cannot be found.
+    """
     style_name = os.path.normpath(os.path.expanduser(style_name))
     if not os.path.isabs(style_name):
         style_name = normalize_style_path(style_name)
@@ -182,63 +209,150 @@ def export_document(doc: Document,
                      os.path.basename(style_name), get_styles_folder())
         return ""
 
-    from citeproc.source import BibliographySource
+    return style_name
 
-    source = BibliographySource(doc)
-    source.add(to_csl(doc))
 
-    from citeproc import (
-        Citation,
-        CitationItem,
-        CitationStylesBibliography,
-        CitationStylesStyle,
-        formatter,
-    )
+def _render_bibliography(documents: Sequence[Document],
+                         style: CitationStylesStyle,
+                         fmt: Any) -> list[str]:
+    from citeproc import Citation, CitationItem, CitationStylesBibliography
+    from citeproc.source import BibliographySource
 
-    fmt = getattr(formatter, formatter_name, None)
-    if fmt is None:
-        logger.error("Formatter '%s' is not supported for CSL export. "
-                     "Check your 'csl-formatter' setting in the configuration file.",
-                     formatter_name)
-        return ""
+    source = BibliographySource()
+    refs = []
+    citations = []
+    for i, doc in enumerate(documents):
+        ref = doc["ref"].lower()
+        if ref in source:
+            # NOTE: documents with the same ref are still exported separately
+            ref = f"{ref}-{i}"
+
+        source.add(to_csl(doc, ref=ref))
+        refs.append(ref)
+        citations.append(Citation([CitationItem(ref)]))
 
-    style = CitationStylesStyle(style_name, validate=False)
     bib = CitationStylesBibliography(style, source, fmt)
-    citation = Citation([CitationItem(doc["ref"])])
-    bib.register(citation)
+    for citation in citations:
+        bib.register(citation)
 
-    # TODO: the citeproc example says we should strive to cite all the documents
-    # at once, since some of the formatting may depend on the previous citations
     def warn(item: CitationItem) -> None:
         logger.warning("Reference with key '%s' not found in the bibliography",
                        item.key)
 
-    bib.cite(citation, callback=warn)
+    for citation in citations:
+        bib.cite(citation, callback=warn)
+
+    # NOTE: the items are rendered one by one and matched back to their refs,
+    # so that the entries are in the same order as the documents (and not in
+    # the order of the bibliography, which may be sorted by the style)
+    entries = {}
+    for item in bib.items:
+        rendered = style.render_bibliography([item])
+        if rendered:
+            entries[item.key] = str(rendered[0]).replace("..", ".")
+
+    return [entries.get(ref, "") for ref in refs]
+
+
+def export_documents(documents: Sequence[Document],
+                     style_name: str | None = None,
+                     formatter_name: str | None = None) -> list[str]:
+    """Export *documents* to a bibliography in the given CSL style.
+
+    All the documents are cited in a single bibliography, so that formatting
+    that depends on the other citations (e.g. disambiguation of authors or
+    years) is applied consistently. If rendering the bibliography fails, each
+    document is rendered on its own instead.
+
+    :arg style_name: the name of a CSL style (see :func:`get_style_path`). This
+        defaults to :confval:`csl-style`.
+    :arg formatter_name: the name of a :mod:`citeproc` formatter. This defaults
+        to :confval:`csl-formatter`.
+    :returns: a list with an entry for each document in *documents*, in the
+        same order (i.e. not sorted by the style). The entry is empty if the
+        document could not be exported.
+    """
+    if not documents:
+        return []
+
+    if style_name is None:
+        style_name = papis.config.getstring("csl-style")
+
+    if formatter_name is None:
+        formatter_name = papis.config.getstring("csl-formatter")
+
+    style_path = get_style_path(style_name)
+    if not style_path:
+        return [""] * len(documents)
+
+    from citeproc import formatter
+
+    fmt = getattr(formatter, formatter_name, None)
+    if fmt is None:
+        logger.error("Formatter '%s' is not supported for CSL export. "
+                     "Check your 'csl-formatter' setting in the configuration file.",
+                     formatter_name)
+        return [""] * len(documents)
+
+    style = load_style(style_path)
 
     try:
-        for item in bib.bibliography():
-            return str(item).replace("..", ".")
+        result = _render_bibliography(documents, style, fmt)
     except AttributeError as exc:
-        # NOTE: citeproc-py doesn't support all known styles, so the export can fail
-        logger.error("Failed to export citation '%s' to CSL style '%s'.",
-                     doc["ref"], os.path.basename(style_name), exc_info=exc)
+        logger.debug("Failed to export bibliography to CSL style '%s'.",
+                     os.path.basename(style_path), exc_info=exc)
+    else:
+        for doc, entry in zip(documents, result, strict=True):
+            if not entry:
+                logger.error("Failed to export citation '%s' to CSL style '%s'.",
+                             doc["ref"], os.path.basename(style_path))
 
-    return ""
+        return result
+
+    # NOTE: citeproc-py doesn't support all known styles, so the export can fail
+    # and we try to find the documents that cannot be exported
+    result = []
+    for doc in documents:
+        try:
+            entry, = _render_bibliography([doc], style, fmt)
+        except AttributeError as exc:
+            logger.error("Failed to export citation '%s' to CSL style '%s'.",
+                         doc["ref"], os.path.basename(style_path), exc_info=exc)
+            entry = ""
 
+        result.append(entry)
 
-def exporter(documents: list[Document]) -> str:
+    return result
+
+
+def export_document(doc: Document,
+                    style_name: str | None = None,
+                    formatter_name: str | None = None) -> str:
+    """Export a single document in the given CSL style.
+
+    This is equivalent to :func:`export_documents` with a single document.
+    """
+    return export_documents([doc],
+                            style_name=style_name,
+                            formatter_name=formatter_name)[0]
+
+
+def export_iter(documents: Iterable[Document]) -> Iterator[str]:
     """Export documents using the CSL (Citation Style Language) styles."""
 
     try:
         import citeproc  # ruff:ignore[unused-import]
     except ImportError:
         logger.error("CSL export requires the 'citeproc-py' package.")
-        return ""
+        return
+
+    separator = ""
+    for entry in export_documents(list(documents)):
+        if not entry.strip():
+            continue
+
+        yield f"{separator}{entry.strip()}"
+        separator = "\n\n"
 
-    formatter_name = papis.config.getstring("csl-formatter")
-    style_name = papis.config.getstring("csl-style")
 
-    return "\n\n".join(
-        export_document(doc, style_name=style_name, formatter_name=formatter_name)
-        for doc in documents
-    ).strip()
+exporter = StreamingExporter(export_iter)
@@ -4,14 +4,17 @@ from typing import TYPE_CHECKING
 
 import papis.config
 import papis.logging
+from papis.exporters import StreamingExporter
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
     from papis.document import Document
 
 logger = papis.logging.get_logger(__name__)
 
 
-def exporter(documents: list[Document]) -> str:
+def export_iter(documents: Iterable[Document]) -> Iterator[str]:
     """Convert documents to the CSV format"""
 
     delimiter = papis.config.get("exporter-csv-delimiter")
@@ -59,6 +62,15 @@ def exporter(documents: list[Document]) -> str:
     )
     writer.writeheader()
 
+    def flush() -> str:
+        result = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+        return result
+
+    yield flush()
+
     from papis.document import author_list_to_author
 
     au_separator = papis.config.getstring("multiple-authors-separator")
@@ -83,5 +95,7 @@ def exporter(documents: list[Document]) -> str:
                 row[key] = value
 
         writer.writerow(row)
+        yield flush()
+
 
-    return buffer.getvalue()
+exporter = StreamingExporter(export_iter)
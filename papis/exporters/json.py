@@ -3,13 +3,27 @@ from __future__ import annotations
 import json
 from typing import TYPE_CHECKING
 
+from papis.exporters import StreamingExporter
+
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
     from papis.document import Document
 
 
-def exporter(documents: list[Document]) -> str:
+def export_iter(documents: Iterable[Document]) -> Iterator[str]:
     """Convert document to the JSON format."""
     from papis.document import to_dict
-    return json.dumps([to_dict(doc) for doc in documents],
-                      sort_keys=True,
-                      indent=2)
+
+    # NOTE: this writes each document separately, but the output is the same
+    # as dumping the whole list with `indent=2`
+    separator = "[\n  "
+    for doc in documents:
+        data = json.dumps(to_dict(doc), sort_keys=True, indent=2)
+        yield separator + data.replace("\n", "\n  ")
+        separator = ",\n  "
+
+    yield "[]" if separator.startswith("[") else "\n]"
+
+
+exporter = StreamingExporter(export_iter)
@@ -4,8 +4,11 @@ from functools import cache
 from typing import TYPE_CHECKING, Any
 
 import papis.logging
+from papis.exporters import StreamingExporter
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
     from papis.document import Document, KeyConversionPair
 
 logger = papis.logging.get_logger(__name__)
@@ -129,21 +132,23 @@ def to_hayagriva(doc: Document) -> dict[str, Any]:
     return data
 
 
-def exporter(documents: list[Document]) -> str:
+def export_iter(documents: Iterable[Document]) -> Iterator[str]:
     """Convert document to the Hayagriva format used by Typst."""
     import yaml
 
     from papis.bibtex import create_reference
     from papis.paths import unique_suffixes
 
-    results = {}
+    # NOTE: each entry is dumped on its own in the order of the documents, so
+    # only the references need to be kept around to make them unique
+    refs = set()
     for doc in documents:
         ref = create_reference(doc)
-        if ref in results:
+        if ref in refs:
             # ensure that ref is unique
             suffix = unique_suffixes()
             unique_ref = ref
-            while unique_ref in results:
+            while unique_ref in refs:
                 unique_ref = f"{ref}{next(suffix)}"
 
             from papis.document import describe
@@ -152,6 +157,9 @@ def exporter(documents: list[Document]) -> str:
                            ref, unique_ref, describe(doc))
             ref = unique_ref
 
-        results[ref] = to_hayagriva(doc)
+        refs.add(ref)
+        yield str(yaml.dump({ref: to_hayagriva(doc)},
+                            allow_unicode=True, indent=2, sort_keys=True))
+
 
-    return str(yaml.dump(results, allow_unicode=True, indent=2, sort_keys=True))
+exporter = StreamingExporter(export_iter)
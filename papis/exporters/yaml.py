@@ -2,11 +2,15 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+from papis.exporters import StreamingExporter
+
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
     from papis.document import Document
 
 
-def exporter(documents: list[Document]) -> str:
+def export_iter(documents: Iterable[Document]) -> Iterator[str]:
     """Convert document to the YAML format."""
     import yaml
 
@@ -15,9 +19,10 @@ def exporter(documents: list[Document]) -> str:
     # NOTE: 'explicit_start' adds a '---' marker before every document, so that
     # the result can be safely concatenated with an existing YAML file, e.g. by
     # 'papis export --append'.
-    string = yaml.dump_all(
-        [to_dict(document) for document in documents],
-        allow_unicode=True,
-        explicit_start=True)
+    for document in documents:
+        yield str(yaml.dump(to_dict(document),
+                            allow_unicode=True,
+                            explicit_start=True))
+
 
-    return str(string)
+exporter = StreamingExporter(export_iter)
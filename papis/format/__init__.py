@@ -4,6 +4,7 @@ from functools import cached_property
 from typing import TYPE_CHECKING, Any, ClassVar
 
 import papis.logging
+import papis.stats
 
 if TYPE_CHECKING:
     from papis.document import DocumentLike
@@ -114,6 +115,7 @@ def get_cached_formatter(name: str | None = None) -> Formatter:
     return f
 
 
+@papis.stats.timed("format")
 def format(fmt: AnyString,
            doc: DocumentLike,
            doc_key: str = "",
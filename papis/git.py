@@ -6,18 +6,24 @@ manipulate the filesystem first and then use the git functions to record the cha
 to the index. This means that failure of a git operation always just means a failure
 of committing changes.
 
+Commands that modify many documents should wrap their work in a
+:func:`transaction`. Inside a transaction, :func:`add`, :func:`rm_cached` and
+:func:`commit` only record the changes, which are then staged and committed at
+once (one commit per repository) when the transaction ends.
+
 """
 
 from __future__ import annotations
 
 import os
 import subprocess
+from contextlib import contextmanager
 from typing import TYPE_CHECKING
 
 import papis.logging
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Generator, Sequence
 
     from papis.paths import PathLike
 
@@ -41,11 +47,17 @@ def _normalize_resources(
     return [str(r) for r in resources]
 
 
-def git(*args: str, cwd: PathLike) -> str:
+#: Minimum number of paths for which a :func:`transaction` passes the paths to
+#: ``git add`` and ``git rm`` on their standard input instead of as arguments.
+GIT_PATHSPEC_FILE_THRESHOLD = 1024
+
+
+def git(*args: str, cwd: PathLike, stdin: str | None = None) -> str:
     """Run a git command and return its stdout.
 
     :param args: arguments to pass to the ``git`` command.
     :param cwd: a folder with an existing git repository.
+    :param stdin: a string that is passed to the standard input of the command.
 
     :raises GitError: if the git command fails.
     :returns: the stdout of the git command.
@@ -53,7 +65,12 @@ def git(*args: str, cwd: PathLike) -> str:
     from papis.utils import run
 
     try:
-        result = run(["git", *args], cwd=str(cwd), capture_output=True)
+        if stdin is None:
+            result = run(["git", *args], cwd=str(cwd), capture_output=True)
+        else:
+            logger.debug("Running command: '%s'.", ["git", *args])
+            result = subprocess.run(["git", *args], cwd=str(cwd), input=stdin,
+                                    check=True, capture_output=True, text=True)
     except subprocess.CalledProcessError as exc:
         stderr = exc.stderr.strip() if exc.stderr else "(no output)"
         raise GitError(
@@ -106,6 +123,10 @@ def add(
     :param resources: a resource to add to the index (e.g. ``info.yaml``),
         or a sequence of resources.
     """
+    if _TRANSACTION is not None:
+        _TRANSACTION.add(path, resources)
+        return
+
     git("add", "--", *_normalize_resources(resources), cwd=path)
 
 
@@ -115,6 +136,10 @@ def commit(path: PathLike, message: str) -> None:
     :param path: a folder with an existing git repository.
     :param message: a commit message.
     """
+    if _TRANSACTION is not None:
+        _TRANSACTION.commit(path, message)
+        return
+
     logger.info("[GIT] %s", message)
     git("commit", "-m", message, cwd=path)
 
@@ -133,6 +158,10 @@ def rm_cached(
     :param resources: a resource to remove from the index or a sequence of resources.
     :param recursive: if *True*, remove the resource recursively.
     """
+    if _TRANSACTION is not None:
+        _TRANSACTION.rm_cached(path, resources)
+        return
+
     flags = ["--cached"]
     if recursive:
         flags.append("-r")
@@ -154,3 +183,187 @@ def add_and_commit(
     """
     add(path, resources)
     commit(path, message)
+
+
+def get_repo_root(path: PathLike) -> str | None:
+    """Find the root folder of the git repository that contains *path*.
+
+    :returns: the root folder of the repository or *None* if *path* is not
+        inside a git repository.
+    """
+    path = os.path.abspath(path)
+
+    while True:
+        if os.path.exists(os.path.join(path, ".git")):
+            return path
+
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+
+        path = parent
+
+
+class GitTransaction:
+    """Record git changes during a bulk operation (see :func:`transaction`)."""
+
+    def __init__(self,
+                 message: str | None = None,
+                 use_pathspec_file: bool | None = None) -> None:
+        self.message = message
+        self.use_pathspec_file = use_pathspec_file
+
+        self._added: dict[str, list[str]] = {}
+        self._removed: dict[str, list[str]] = {}
+        self._messages: dict[str, list[str]] = {}
+        self._roots: dict[str, str | None] = {}
+
+    def _get_root(self, path: str) -> str | None:
+        folder = path if os.path.isdir(path) else os.path.dirname(path)
+        if folder not in self._roots:
+            self._roots[folder] = get_repo_root(folder)
+
+        return self._roots[folder]
+
+    def _record(self,
+                changes: dict[str, list[str]],
+                path: PathLike,
+                resources: PathLike | Sequence[PathLike]) -> None:
+        for resource in _normalize_resources(resources):
+            abspath = os.path.abspath(os.path.join(path, resource))
+
+            root = self._get_root(abspath)
+            if root is None:
+                raise GitError(f"[GIT] '{abspath}' is not in a git repository", 128)
+
+            changes.setdefault(root, []).append(abspath)
+
+    def add(self,
+            path: PathLike,
+            resources: PathLike | Sequence[PathLike]) -> None:
+        self._record(self._added, path, resources)
+
+    def rm_cached(self,
+                  path: PathLike,
+                  resources: PathLike | Sequence[PathLike]) -> None:
+        self._record(self._removed, path, resources)
+
+    def commit(self, path: PathLike, message: str) -> None:
+        root = self._get_root(os.path.abspath(path))
+        if root is None:
+            raise GitError(f"[GIT] '{path}' is not in a git repository", 128)
+
+        self._messages.setdefault(root, []).append(message)
+
+    def _get_message(self, messages: list[str]) -> str:
+        if len(messages) == 1:
+            return messages[0]
+
+        subject = self.message or f"{messages[0]} (and {len(messages) - 1} more)"
+        return "\n\n".join([subject, "\n".join(f"* {m}" for m in messages)])
+
+    def _stage(self, root: str) -> None:
+        added = self._added.get(root, [])
+        removed = self._removed.get(root, [])
+
+        use_pathspec_file = self.use_pathspec_file
+        if use_pathspec_file is None:
+            use_pathspec_file = (
+                len(added) + len(removed) >= GIT_PATHSPEC_FILE_THRESHOLD)
+
+        def run_bulk(args: list[str], paths: list[str]) -> None:
+            # NOTE: both cases stage the same changes, but a large number of
+            # paths may not fit on the command line
+            if use_pathspec_file:
+                git(*args, "--pathspec-from-file=-", "--pathspec-file-nul",
+                    cwd=root, stdin="\0".join(os.path.relpath(p, root) for p in paths))
+            else:
+                git(*args, "--", *paths, cwd=root)
+
+        def run(args: list[str], paths: list[str]) -> None:
+            try:
+                run_bulk(args, paths)
+            except GitError as exc:
+                if len(paths) == 1:
+                    raise
+
+                # NOTE: git stages nothing if any of the paths is invalid, so
+                # retry each path on its own to stage (and commit) all the others
+                logger.warning("%s", exc)
+                logger.warning("[GIT] Staging %d paths one at a time.", len(paths))
+
+                for path in paths:
+                    try:
+                        git(*args, "--", path, cwd=root)
+                    except GitError as path_exc:
+                        logger.error("%s", path_exc)
+
+        if removed:
+            run(["rm", "--cached", "-r", "--quiet", "--ignore-unmatch"], removed)
+
+        if added:
+            run(["add", "-A"], added)
+
+    def flush(self) -> None:
+        """Stage and commit all the recorded changes.
+
+        :raises GitError: if any of the git commands fail.
+        """
+        roots = {*self._added, *self._removed, *self._messages}
+        for root in sorted(roots):
+            self._stage(root)
+
+            messages = self._messages.get(root)
+            if messages:
+                message = self._get_message(messages)
+                logger.info("[GIT] %s", message.split("\n")[0])
+                git("commit", "-m", message, cwd=root)
+
+        self._added.clear()
+        self._removed.clear()
+        self._messages.clear()
+
+
+_TRANSACTION: GitTransaction | None = None
+
+
+@contextmanager
+def transaction(message: str | None = None,
+                use_pathspec_file: bool | None = None,
+                ) -> Generator[GitTransaction, None, None]:
+    """A context manager that batches all git changes into a single commit.
+
+    All calls to :func:`add`, :func:`rm_cached` and :func:`commit` inside the
+    context are recorded and only executed when the context exits, with a
+    single ``git add`` and ``git commit`` for each repository. The commit message
+    lists all the individual messages. If git fails to stage all the paths at
+    once (e.g. because one of them does not exist), they are staged one at a
+    time, so that only the invalid paths are left out of the commit. Any
+    :class:`GitError` raised at that point is logged instead of raised, since
+    the file system changes have already been made at that point.
+
+    Nested transactions are merged into the outermost transaction.
+
+    :param message: a subject for the aggregated commit message. If not given,
+        the first recorded commit message is used instead.
+    :param use_pathspec_file: if *True*, the changed paths are passed to git
+        on its standard input, so that any number of paths can be staged at
+        once. By default, this is used when more than
+        :data:`GIT_PATHSPEC_FILE_THRESHOLD` paths are changed.
+    """
+    global _TRANSACTION
+
+    if _TRANSACTION is not None:
+        yield _TRANSACTION
+        return
+
+    _TRANSACTION = tx = GitTransaction(message, use_pathspec_file=use_pathspec_file)
+    try:
+        yield tx
+    finally:
+        _TRANSACTION = None
+
+        try:
+            tx.flush()
+        except GitError as exc:
+            logger.error("%s", exc)
@@ -1,14 +1,16 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, TypeVar
 
 import papis.logging
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Sequence
 
 logger = papis.logging.get_logger(__name__)
 
+F = TypeVar("F", bound="Callable[..., None]")
+
 #: Name format of the entrypoint group for hooks e.g. ``papis.hook.on_edit_done``.
 HOOKS_EXTENSION_FORMAT = "papis.hook.{name}"
 
@@ -16,6 +18,85 @@ HOOKS_EXTENSION_FORMAT = "papis.hook.{name}"
 #: or from other places that do not use the entrypoint framework.
 CUSTOM_LOCAL_HOOKS: dict[str, list[Callable[..., None]]] = {}
 
+#: A dictionary of the callbacks loaded from the entry points of each hook.
+#: Loading the entry points is fairly expensive and hooks can be run for every
+#: document in a bulk operation, so they are only loaded once.
+_ENTRYPOINT_HOOKS_CACHE: dict[str, list[Callable[..., None]]] = {}
+
+# NOTE: attribute set by `batch` on callbacks that take a list of items
+_BATCH_ATTRIBUTE = "__papis_hook_batch__"
+
+
+def batch(fun: F) -> F:
+    """Mark a hook callback as supporting batch dispatch.
+
+    When a hook is run for many items at once with :func:`run_batch`, callbacks
+    marked with this decorator receive the whole list of items in a single call,
+    instead of being called once for each item. This can be used to amortize
+    any expensive setup (e.g. starting an external program) in bulk operations.
+
+    .. code:: python
+
+        @papis.hooks.batch
+        def callback(docs: list[papis.document.Document]) -> None:
+            ...
+
+        papis.hooks.add("on_add_done", callback)
+    """
+    setattr(fun, _BATCH_ATTRIBUTE, True)
+    return fun
+
+
+def is_batch(fun: Callable[..., None]) -> bool:
+    """Check if a callback was marked with :func:`batch`."""
+    return bool(getattr(fun, _BATCH_ATTRIBUTE, False))
+
+
+def get_callbacks(name: str) -> list[Callable[..., None]]:
+    """Get all the callbacks for the hook given by its *name*.
+
+    The callbacks defined by entry points are loaded once and cached, while the
+    callbacks in :data:`CUSTOM_LOCAL_HOOKS` are always added at the end.
+    """
+    hook_name = HOOKS_EXTENSION_FORMAT.format(name=name)
+
+    callbacks = _ENTRYPOINT_HOOKS_CACHE.get(hook_name)
+    if callbacks is None:
+        from papis.plugin import get_plugins
+
+        callbacks = list(get_plugins(hook_name).values())
+        _ENTRYPOINT_HOOKS_CACHE[hook_name] = callbacks
+
+    return callbacks + CUSTOM_LOCAL_HOOKS.get(hook_name, [])
+
+
+def clear_cache() -> None:
+    """Clear the cached callbacks loaded from entry points.
+
+    This is only needed if new entry points were installed while Papis is
+    running.
+    """
+    _ENTRYPOINT_HOOKS_CACHE.clear()
+
+
+def _run_callback(callback: Callable[..., None], hook_name: str,
+                  *args: Any, **kwargs: Any) -> None:
+    import time
+
+    t_start = time.perf_counter()
+    try:
+        callback(*args, **kwargs)
+    except TypeError as exc:
+        logger.error("Callback '%s' for hook '%s' got unexpected arguments.",
+                     callback.__name__, hook_name, exc_info=exc)
+    except Exception as exc:
+        logger.error("Callback '%s' for hook '%s' failed.",
+                     callback.__name__, hook_name, exc_info=exc)
+
+    logger.debug("Callback '%s' for hook '%s' took %.2fms.",
+                 callback.__name__, hook_name,
+                 1000 * (time.perf_counter() - t_start))
+
 
 def run(name: str, *args: Any, **kwargs: Any) -> None:
     """Run a hook given by its *name*.
@@ -27,25 +108,42 @@ def run(name: str, *args: Any, **kwargs: Any) -> None:
 
     1. The hooks defined by an entry point.
     2. The hooks defined in :data:`CUSTOM_LOCAL_HOOKS`.
-    """
-    from papis.plugin import get_plugins
 
+    The time taken by each callback is shown in the debug output. Callbacks
+    marked with :func:`batch` are called with a list containing the first
+    positional argument.
+    """
     hook_name = HOOKS_EXTENSION_FORMAT.format(name=name)
     logger.debug("Running callbacks for hook '%s'.", hook_name)
 
-    callbacks = list(get_plugins(hook_name).values())
-    if hook_name in CUSTOM_LOCAL_HOOKS:
-        callbacks += CUSTOM_LOCAL_HOOKS[hook_name]
-
-    for callback in callbacks:
-        try:
-            callback(*args, **kwargs)
-        except TypeError as exc:
-            logger.error("Callback '%s' for hook '%s' got unexpected arguments.",
-                         callback.__name__, hook_name, exc_info=exc)
-        except Exception as exc:
-            logger.error("Callback '%s' for hook '%s' failed.",
-                         callback.__name__, hook_name, exc_info=exc)
+    for callback in get_callbacks(name):
+        if args and is_batch(callback):
+            _run_callback(callback, hook_name, [args[0]], *args[1:], **kwargs)
+        else:
+            _run_callback(callback, hook_name, *args, **kwargs)
+
+
+def run_batch(name: str, items: Sequence[Any], *args: Any, **kwargs: Any) -> None:
+    """Run a hook given by its *name* for each item in *items*.
+
+    This is equivalent to calling :func:`run` with each item as the first
+    argument, except that callbacks marked with :func:`batch` are only called
+    once with the whole list of *items*. Each callback is run for all the items
+    before the next callback is run.
+    """
+    if not items:
+        return
+
+    hook_name = HOOKS_EXTENSION_FORMAT.format(name=name)
+    logger.debug("Running callbacks for hook '%s' on %d items.",
+                 hook_name, len(items))
+
+    for callback in get_callbacks(name):
+        if is_batch(callback):
+            _run_callback(callback, hook_name, list(items), *args, **kwargs)
+        else:
+            for item in items:
+                _run_callback(callback, hook_name, item, *args, **kwargs)
 
 
 def add(name: str, fun: Callable[..., None]) -> None:
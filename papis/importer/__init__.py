@@ -3,9 +3,10 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any, TypeVar
 
 import papis.logging
+import papis.stats
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Iterable
+    from collections.abc import Callable, Generator, Iterable, Sequence
 
     from papis.document import DocumentLike
 
@@ -349,12 +350,50 @@ def get_matching_importers_by_doc(
     return result
 
 
+class RateLimiter:
+    """Limit the rate at which each service (i.e. importer) is accessed.
+
+    This is meant to be shared by multiple threads that fetch data from the
+    same services, so that no service receives more than *rate* requests per
+    second, e.g. to respect the rate limits of the Crossref or arXiv APIs.
+
+    :param rate: maximum number of requests per second for each service. If
+        this is not positive, no limit is enforced.
+    """
+
+    def __init__(self, rate: float) -> None:
+        import threading
+
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+
+        self._lock = threading.Lock()
+        self._next_time: dict[str, float] = {}
+
+    def wait(self, name: str) -> None:
+        """Block until the service *name* can be accessed again."""
+        if self.interval <= 0:
+            return
+
+        import time
+
+        with self._lock:
+            now = time.monotonic()
+            next_time = max(now, self._next_time.get(name, now))
+            self._next_time[name] = next_time + self.interval
+
+        if next_time > now:
+            time.sleep(next_time - now)
+
+
 def fetch_importers(importers: Iterable[Importer], *,
-                    download_files: bool = True) -> list[Importer]:
+                    download_files: bool = True,
+                    rate_limiter: RateLimiter | None = None) -> list[Importer]:
     """Fetch data from the given importers.
 
     :param download_files: if *True*, importers also try to download files
         (PDFs, etc.) instead of just metadata.
+    :param rate_limiter: if given, it is used to limit the rate at which each
+        importer fetches its data.
     :returns: a list of importers that have not failed to fetch their metadata.
     """
     if not importers:
@@ -364,16 +403,20 @@ def fetch_importers(importers: Iterable[Importer], *,
 
     result = []
     for importer in importers:
+        if rate_limiter is not None:
+            rate_limiter.wait(importer.name)
+
         try:
-            if download_files:
-                importer.fetch()
-            else:
-                # NOTE: not all importers can (or do) separate the fetching
-                # of data and files, so we try both cases for now
-                try:
-                    importer.fetch_data()
-                except NotImplementedError:
+            with papis.stats.span(f"importer.fetch.{importer.name}"):
+                if download_files:
                     importer.fetch()
+                else:
+                    # NOTE: not all importers can (or do) separate the fetching
+                    # of data and files, so we try both cases for now
+                    try:
+                        importer.fetch_data()
+                    except NotImplementedError:
+                        importer.fetch()
         except RequestException as exc:
             # NOTE: this is probably some HTTP error, so we better let the
             # user know if there's something wrong with their network
@@ -392,6 +435,61 @@ def fetch_importers(importers: Iterable[Importer], *,
     return result
 
 
+def iter_fetched_importers(groups: Iterable[Sequence[Importer]], *,
+                           download_files: bool = True,
+                           max_workers: int = 1,
+                           rate_limit: float = 0.0,
+                           ) -> Generator[list[Importer], None, None]:
+    """Fetch data from several groups of importers concurrently.
+
+    Each group (e.g. all the importers matching a document) is fetched using
+    :func:`fetch_importers` in a thread pool. The groups are consumed lazily
+    and at most ``2 * max_workers`` of them are fetched ahead of the consumer,
+    so that the results of earlier groups can be processed while the later
+    ones are still being fetched.
+
+    :param groups: an iterable of importer groups. The importers should not
+        be shared between groups, since they are fetched concurrently.
+    :param max_workers: number of threads used to fetch the groups. If this
+        is not larger than one, the groups are fetched sequentially.
+    :param rate_limit: maximum number of requests per second for each
+        importer (see :class:`RateLimiter`).
+    :returns: an iterator over the fetched importers of each group, in the
+        same order as *groups* (see :func:`fetch_importers`). If it is not
+        consumed completely, it should be closed, so that the pending fetches
+        are cancelled.
+    """
+    rate_limiter = RateLimiter(rate_limit)
+    if max_workers <= 1:
+        for group in groups:
+            yield fetch_importers(group,
+                                  download_files=download_files,
+                                  rate_limiter=rate_limiter)
+
+        return
+
+    from collections import deque
+    from concurrent.futures import Future, ThreadPoolExecutor
+    from functools import partial
+
+    fetch = partial(fetch_importers,
+                    download_files=download_files,
+                    rate_limiter=rate_limiter)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending: deque[Future[list[Importer]]] = deque()
+    try:
+        for group in groups:
+            pending.append(executor.submit(fetch, group))
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
 def collect_from_importers(
         importers: Iterable[Importer],
         *,
@@ -9,7 +9,7 @@ import papis.config
 import papis.logging
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Iterator
+    from collections.abc import Iterable, Iterator, Sequence
 
     from papis.document import DocumentLike
     from papis.strings import AnyString
@@ -19,9 +19,19 @@ logger = papis.logging.get_logger(__name__)
 #: A union type for allowable paths.
 PathLike: TypeAlias = pathlib.Path | str
 
+#: Name of the folder (inside a library) used to create new documents before
+#: they are moved to their final location (see :func:`get_staging_folder`).
+STAGING_FOLDER_NAME = ".papis-staging"
+
+#: A method used to place a file in a new location (see :func:`copy_file`).
+FileCopyMethod: TypeAlias = Literal["reflink", "hardlink", "copy"]
+
 # NOTE: private error codes for Windows
 WIN_ERROR_PRIVILEGE_NOT_HELD = 1314
 
+# NOTE: private ioctl request code for FICLONE on Linux (see `ioctl_ficlone(2)`)
+_LINUX_FICLONE = 0x40049409
+
 # NOTE: private placeholder used to allow hyphens in slugified paths.
 _SLUGIFY_HYPHEN_PLACEHOLDER = "slugifyhyphenplaceholder"
 
@@ -171,6 +181,164 @@ def symlink(src: PathLike, dst: PathLike) -> None:
                           ) from None
 
 
+def _reflink(src: PathLike, dst: PathLike) -> None:
+    if sys.platform != "linux":
+        raise OSError(f"Reflinks are not supported on '{sys.platform}'")
+
+    import fcntl
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        fcntl.ioctl(fdst.fileno(), _LINUX_FICLONE, fsrc.fileno())
+
+
+def _copy_file_range(src: PathLike, dst: PathLike) -> None:
+    import shutil
+
+    if not hasattr(os, "copy_file_range"):
+        shutil.copyfile(src, dst)
+        return
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        nbytes = os.fstat(fsrc.fileno()).st_size
+        try:
+            while nbytes > 0:
+                n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), nbytes)
+                if n == 0:
+                    break
+
+                nbytes -= n
+        except OSError:
+            # NOTE: copy_file_range fails across file systems on older kernels,
+            # so fall back to the standard copy (which uses `sendfile` on Linux)
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+            shutil.copyfileobj(fsrc, fdst)
+
+
+def copy_file(src: PathLike,
+              dst: PathLike,
+              methods: Sequence[FileCopyMethod] = ("reflink", "copy"),
+              ) -> FileCopyMethod:
+    """Copy the file *src* to *dst* using the fastest available method.
+
+    The *methods* are tried in order until one succeeds:
+
+    * ``"reflink"``: create a copy-on-write clone of the file (using
+      ``FICLONE`` on Linux). This is instantaneous and does not use any
+      additional space, but is only supported by some file systems (e.g.
+      Btrfs or XFS) and only when *src* and *dst* are on the same file system.
+    * ``"hardlink"``: create a hard link to *src*. Note that the two files will
+      share their contents, so this should only be used when *src* is removed
+      afterwards (e.g. when moving a file).
+    * ``"copy"``: copy the file contents using :func:`os.copy_file_range`
+      (if available), which allows the kernel to avoid copying the data to user
+      space (or offload the copy to the file system), or :func:`shutil.copyfile`.
+
+    In all cases, the permission bits are also copied, like :func:`shutil.copy`.
+
+    :returns: the method that was used to copy the file.
+    """
+    import shutil
+    import time
+
+    begin_t = time.time()
+    for method in methods:
+        try:
+            if method == "reflink":
+                _reflink(src, dst)
+            elif method == "hardlink":
+                os.link(src, dst)
+            elif method == "copy":
+                _copy_file_range(src, dst)
+            else:
+                raise ValueError(f"Unknown file copy method: '{method}'")
+        except OSError as exc:
+            logger.debug("Failed to copy '%s' using '%s': %s.", src, method, exc)
+            if os.path.lexists(dst):
+                os.remove(dst)
+            continue
+
+        if method != "hardlink":
+            shutil.copymode(src, dst)
+        break
+    else:
+        raise OSError(f"Failed to copy '{src}' to '{dst}' (tried {list(methods)})")
+
+    elapsed = time.time() - begin_t
+    size = os.path.getsize(dst)
+    logger.debug("Copied '%s' (%.1f MiB) using '%s' in %.1f ms (%.1f MiB/s).",
+                 src, size / 2**20, method, 1000 * elapsed,
+                 size / 2**20 / max(elapsed, 1.0e-6))
+
+    return method
+
+
+def get_staging_folder(libdir: PathLike | None = None) -> str:
+    """Create a new temporary folder for a document.
+
+    New documents are created in a temporary folder and then moved to their
+    final location in the library. The temporary folder is created inside the
+    :data:`STAGING_FOLDER_NAME` folder of the library, so that this final move
+    is a cheap rename on the same file system. If the library folder is not
+    writable, a standard temporary folder is used instead.
+
+    :param libdir: the folder of the library where the document will be added.
+        If not given, the current library is used.
+    """
+    import tempfile
+
+    if libdir is None:
+        libdir = papis.config.get_lib().path
+
+    staging_dir = os.path.join(os.path.expanduser(libdir), STAGING_FOLDER_NAME)
+    try:
+        os.makedirs(staging_dir, exist_ok=True)
+        folder = tempfile.mkdtemp(dir=staging_dir)
+    except OSError as exc:
+        logger.debug("Failed to create staging folder in '%s': %s.", libdir, exc)
+        return tempfile.mkdtemp()
+
+    # NOTE: the staging folder should never be committed if the library is
+    # tracked with git (e.g. when a document is left behind by a crash)
+    gitignore = os.path.join(staging_dir, ".gitignore")
+    if not os.path.exists(gitignore):
+        try:
+            with open(gitignore, "w", encoding="utf-8") as fd:
+                fd.write("*\n")
+        except OSError as exc:
+            logger.debug("Failed to create '%s': %s.", gitignore, exc)
+
+    return folder
+
+
+def remove_staging_folder(folder: PathLike) -> None:
+    """Remove a temporary document folder created by :func:`get_staging_folder`.
+
+    The :data:`STAGING_FOLDER_NAME` folder of the library is also removed, if
+    no other documents are staged in it.
+
+    :param folder: a folder returned by :func:`get_staging_folder`. If it
+        does not exist anymore (e.g. the document was moved to its final
+        location), only the staging folder of the library is cleaned up.
+    """
+    import shutil
+    from contextlib import suppress
+
+    folder = os.fspath(folder)
+    shutil.rmtree(folder, ignore_errors=True)
+
+    parent = os.path.dirname(folder)
+    if os.path.basename(parent) != STAGING_FOLDER_NAME:
+        return
+
+    with suppress(OSError):
+        if set(os.listdir(parent)) <= {".gitignore"}:
+            with suppress(FileNotFoundError):
+                os.remove(os.path.join(parent, ".gitignore"))
+            os.rmdir(parent)
+
+
 def get_document_file_name(
         doc: DocumentLike,
         orig_path: PathLike,
@@ -0,0 +1,274 @@
+"""Lightweight timing instrumentation for the hot paths in Papis.
+
+Some expensive operations (e.g. loading the database, parsing YAML files or
+fetching data from the network) are wrapped in named *spans* using :func:`span`
+or the :func:`timed` decorator. Additionally, simple event counts can be
+recorded with :func:`increment`.
+
+Collection is disabled by default, in which case the instrumentation only costs
+a global lookup. It is enabled by the ``papis --stats`` flag, which prints an
+aggregated table of all the spans (see :func:`format_stats`) when the command
+finishes, or by ``papis --stats-trace FILE``, which also records every span
+and writes it to *FILE* in the
+`Chrome trace event format <https://docs.google.com/document/d/1CvAClvFfyA5R-PhYUmn5OOQtYMH4h6I0nSsKchNAySU>`__.
+This file can then be viewed as a flame graph in, e.g.,
+`Perfetto <https://ui.perfetto.dev>`__ or ``chrome://tracing``.
+
+Note that spans recorded in worker processes (see :func:`papis.utils.parmap`)
+are not collected.
+
+.. code:: python
+
+    import papis.stats
+
+    @papis.stats.timed("mymodule.load")
+    def load(filename: str) -> None:
+        ...
+
+    with papis.stats.span("mymodule.save"):
+        ...
+"""
+from __future__ import annotations
+
+import functools
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, ParamSpec, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from contextlib import AbstractContextManager
+    from types import TracebackType
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+_STATS_LOCK = threading.Lock()
+_STATS_ENABLED = False
+_STATS_ORIGIN = time.perf_counter()
+
+_SPANS: dict[str, SpanStats] = {}
+_COUNTERS: dict[str, int] = {}
+_TRACE_EVENTS: list[dict[str, Any]] | None = None
+
+_NULL_SPAN: AbstractContextManager[None] = nullcontext()
+
+
+class SpanStats:
+    """Aggregated timings of all the spans with the same name."""
+
+    __slots__ = ("count", "max", "min", "total")
+
+    def __init__(self) -> None:
+        #: Number of times the span was recorded.
+        self.count = 0
+        #: Total time spent in the span (in seconds).
+        self.total = 0.0
+        #: Minimum time spent in a single span (in seconds).
+        self.min = float("inf")
+        #: Maximum time spent in a single span (in seconds).
+        self.max = 0.0
+
+    @property
+    def mean(self) -> float:
+        """Mean time spent in a single span (in seconds)."""
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        self.min = min(self.min, duration)
+        self.max = max(self.max, duration)
+
+    def __repr__(self) -> str:
+        return (f"{type(self).__name__}(count={self.count}, total={self.total:.6f}, "
+                f"min={self.min:.6f}, max={self.max:.6f})")
+
+
+def enable(trace: bool = False) -> None:
+    """Start collecting statistics.
+
+    :param trace: if *True*, every span is also stored individually, so that
+        it can be written out by :func:`write_trace`.
+    """
+    global _STATS_ENABLED, _TRACE_EVENTS
+
+    _STATS_ENABLED = True
+    if trace and _TRACE_EVENTS is None:
+        _TRACE_EVENTS = []
+
+
+def disable() -> None:
+    """Stop collecting statistics. Any existing statistics are kept."""
+    global _STATS_ENABLED
+    _STATS_ENABLED = False
+
+
+def is_enabled() -> bool:
+    """Check if statistics are currently being collected."""
+    return _STATS_ENABLED
+
+
+def reset() -> None:
+    """Remove all the collected statistics.
+
+    This also stops storing trace events, until :func:`enable` is called again
+    with *trace* set to *True*.
+    """
+    global _TRACE_EVENTS
+
+    with _STATS_LOCK:
+        _SPANS.clear()
+        _COUNTERS.clear()
+        _TRACE_EVENTS = None
+
+
+def record(name: str, duration: float, start: float | None = None) -> None:
+    """Record a span that has already finished.
+
+    This is useful when the duration is known from another source, e.g. the
+    ``elapsed`` time of an HTTP response.
+
+    :param duration: the time spent in the span (in seconds).
+    :param start: the value of :func:`time.perf_counter` at the start of the
+        span. This is only used for traces and defaults to the current time
+        minus *duration*.
+    """
+    if not _STATS_ENABLED:
+        return
+
+    with _STATS_LOCK:
+        stats = _SPANS.get(name)
+        if stats is None:
+            _SPANS[name] = stats = SpanStats()
+        stats.add(duration)
+
+        if _TRACE_EVENTS is not None:
+            if start is None:
+                start = time.perf_counter() - duration
+
+            _TRACE_EVENTS.append({
+                "name": name,
+                "cat": name.split(".", maxsplit=1)[0],
+                "ph": "X",
+                "ts": 1.0e6 * (start - _STATS_ORIGIN),
+                "dur": 1.0e6 * duration,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+            })
+
+
+def increment(name: str, value: int = 1) -> None:
+    """Increment the counter given by *name* by *value*."""
+    if not _STATS_ENABLED:
+        return
+
+    with _STATS_LOCK:
+        _COUNTERS[name] = _COUNTERS.get(name, 0) + value
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self,
+                 exc_type: type[BaseException] | None,
+                 exc_val: BaseException | None,
+                 exc_tb: TracebackType | None) -> None:
+        record(self.name, time.perf_counter() - self.start, start=self.start)
+
+
+def span(name: str) -> AbstractContextManager[None]:
+    """Measure the time spent in a block of code.
+
+    Spans with the same *name* are aggregated. By convention, names are dotted,
+    e.g. ``"database.query"``, where the first component gives the category.
+    """
+    if not _STATS_ENABLED:
+        return _NULL_SPAN
+
+    return _Span(name)
+
+
+def timed(name: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """A decorator that wraps every call of the function in a :func:`span`."""
+
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        @functools.wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            if not _STATS_ENABLED:
+                return func(*args, **kwargs)
+
+            with _Span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def get_span_stats() -> dict[str, SpanStats]:
+    """Get the aggregated statistics of all the recorded spans."""
+    with _STATS_LOCK:
+        return dict(_SPANS)
+
+
+def get_counters() -> dict[str, int]:
+    """Get the values of all the recorded counters."""
+    with _STATS_LOCK:
+        return dict(_COUNTERS)
+
+
+def format_stats() -> str:
+    """Format all the collected statistics as a table.
+
+    Spans are sorted by their total time, so that the most expensive operations
+    come first. Times are given in milliseconds.
+    """
+    spans = sorted(get_span_stats().items(), key=lambda item: -item[1].total)
+    counters = sorted(get_counters().items())
+    if not spans and not counters:
+        return "No statistics were collected."
+
+    width = max(len("Span"), *(len(name) for name, _ in spans + counters))
+
+    lines = []
+    if spans:
+        lines.append(f"{'Span':<{width}} {'Count':>8} {'Total (ms)':>12} "
+                     f"{'Mean (ms)':>10} {'Max (ms)':>10}")
+        lines.extend(
+            f"{name:<{width}} {s.count:>8} {1000 * s.total:>12.2f} "
+            f"{1000 * s.mean:>10.2f} {1000 * s.max:>10.2f}"
+            for name, s in spans)
+
+    if counters:
+        if lines:
+            lines.append("")
+
+        lines.append(f"{'Counter':<{width}} {'Value':>8}")
+        lines.extend(f"{name:<{width}} {value:>8}" for name, value in counters)
+
+    return "\n".join(lines)
+
+
+def write_trace(filename: str) -> None:
+    """Write all the recorded spans to *filename* as Chrome trace events.
+
+    This only writes the spans recorded after calling :func:`enable` with
+    *trace* set to *True*.
+    """
+    import json
+
+    with _STATS_LOCK:
+        events = list(_TRACE_EVENTS or [])
+
+    with open(filename, "w", encoding="utf-8") as fd:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fd)
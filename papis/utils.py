@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import os
-import re
 import subprocess
 import sys
 from typing import TYPE_CHECKING, Any, Literal, TypeVar, overload
@@ -19,6 +18,7 @@ import platformdirs
 
 import papis.config
 import papis.logging
+import papis.stats
 
 logger = papis.logging.get_logger(__name__)
 
@@ -58,13 +58,37 @@ def get_session() -> requests.Session:
             "https": proxy,
         }
 
+    if papis.stats.is_enabled():
+        session.hooks["response"].append(_record_response_stats)
+
     return session
 
 
+def _record_response_stats(response: requests.Response,
+                           *args: Any, **kwargs: Any) -> None:
+    # NOTE: `elapsed` is the time until the headers were received, so this
+    # does not include downloading the content of streamed responses
+    method = (response.request.method or "GET").lower()
+    papis.stats.record(f"http.{method}", response.elapsed.total_seconds())
+
+
 def has_multiprocessing() -> bool:
     return HAS_MULTIPROCESSING
 
 
+def get_process_count() -> int:
+    """Get the number of processes that should be used for parallel work.
+
+    This is given by the ``PAPIS_NP`` environment variable and defaults to
+    :func:`os.cpu_count`. If :mod:`multiprocessing` is not available on the
+    current platform, this always returns ``0``.
+    """
+    if not HAS_MULTIPROCESSING or sys.platform == "darwin":
+        return 0
+
+    return int(os.environ.get("PAPIS_NP", str(os.cpu_count())))
+
+
 def parmap(f: Callable[[A], B],
            xs: Iterable[A],
            np: int | None = None) -> list[B]:
@@ -90,7 +114,7 @@ def parmap(f: Callable[[A], B],
         parallel. This value defaults to ``PAPIS_NP`` or :func:`os.cpu_count`.
     """
     if np is None:
-        np = int(os.environ.get("PAPIS_NP", str(os.cpu_count())))
+        np = get_process_count()
 
     if np and HAS_MULTIPROCESSING and sys.platform != "darwin":
         with Pool(np) as pool:
@@ -99,6 +123,49 @@ def parmap(f: Callable[[A], B],
         return list(map(f, xs))
 
 
+def parmap_iter(f: Callable[[A], B],
+                xs: Iterable[A],
+                np: int | None = None) -> Iterator[B]:
+    """Lazily apply the function *f* to all elements of *xs*.
+
+    This is similar to :func:`parmap`, but the results are returned (in order)
+    as soon as they are available and *xs* is consumed while the worker
+    processes are running. Each element is sent to a worker on its own, so *xs*
+    should generally contain chunks of work, e.g. lists of documents.
+
+    The workers are started using the ``fork`` method, so that they share the
+    configuration of the current process (including any settings given on the
+    command-line). If this is not available, *f* is applied sequentially.
+
+    :param np: number of processes to use when applying the function *f* in
+        parallel. This value defaults to :func:`get_process_count`.
+    """
+    if np is None:
+        np = get_process_count()
+
+    it = iter(xs)
+
+    # NOTE: the first element is always processed here, so that small inputs are
+    # not delayed by starting any worker processes
+    for x in it:
+        yield f(x)
+        break
+    else:
+        return
+
+    import multiprocessing
+
+    if (np > 1
+            and HAS_MULTIPROCESSING
+            and "fork" in multiprocessing.get_all_start_methods()):
+        with multiprocessing.get_context("fork").Pool(np) as pool:
+            # NOTE: `imap` consumes the elements in a separate thread and returns
+            # the results in order, so *xs* is read while the workers run
+            yield from pool.imap(f, it)
+    else:
+        yield from map(f, it)
+
+
 @overload
 def run(
     cmd: Sequence[str],
@@ -247,26 +314,134 @@ def open_file(file_path: str, wait: bool = True) -> None:
     general_open(file_name=file_path, key="opentool", wait=wait)
 
 
+def _scan_folder(path: str,
+                 info_name: str,
+                 ignore: Sequence[str],
+                 descend_into_documents: bool) -> tuple[bool, list[str]]:
+    from fnmatch import fnmatch
+
+    from papis.paths import STAGING_FOLDER_NAME
+
+    is_document = False
+    subfolders = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                name = entry.name
+                if name == info_name:
+                    is_document = True
+                elif (entry.is_dir(follow_symlinks=False)
+                        and name != STAGING_FOLDER_NAME
+                        and not any(fnmatch(name, pattern) for pattern in ignore)):
+                    subfolders.append(entry.path)
+    except OSError as exc:
+        logger.debug("Failed to list folder '%s': %s.", path, exc)
+        return False, []
+
+    if is_document and not descend_into_documents:
+        subfolders = []
+
+    return is_document, sorted(subfolders)
+
+
+def iter_folders(folder: str, *,
+                 ignore: Sequence[str] | None = None,
+                 descend_into_documents: bool | None = None,
+                 max_workers: int | None = None) -> Iterator[str]:
+    """Iterate over all folders with ``papis`` documents inside of *folder*.
+
+    The directory tree is crawled using :func:`os.scandir`, so that the
+    ``info`` file (see :confval:`info-name`) is found from the directory
+    listing without any additional calls to :func:`os.stat`. Directories are
+    listed in a thread pool, which mostly helps on network file systems. The
+    document folders are always yielded in the same (depth-first and sorted by
+    name) order, regardless of the number of threads. Documents that
+    are still being created (see :func:`papis.paths.get_staging_folder`) and
+    symbolic links to directories are always skipped.
+
+    :param folder: root folder to look into.
+    :param ignore: a list of glob patterns for folder names that are not
+        crawled. This defaults to :confval:`crawler-ignore`.
+    :param descend_into_documents: if *False*, the subfolders of document
+        folders are not crawled. This defaults to
+        :confval:`crawler-descend-into-documents`.
+    :param max_workers: number of threads used to list the directories. This
+        defaults to :confval:`crawler-threads` and the directories are listed
+        sequentially if it is not larger than one.
+    """
+    if ignore is None:
+        ignore = papis.config.getlist("crawler-ignore")
+
+    if descend_into_documents is None:
+        descend_into_documents = papis.config.getboolean(
+            "crawler-descend-into-documents")
+
+    if max_workers is None:
+        max_workers = papis.config.getint("crawler-threads")
+
+    from functools import partial
+
+    scan = partial(_scan_folder,
+                   info_name=papis.config.getstring("info-name"),
+                   ignore=ignore,
+                   descend_into_documents=bool(descend_into_documents))
+
+    if max_workers is None or max_workers <= 1:
+        stack = [folder]
+        while stack:
+            path = stack.pop()
+            is_document, subfolders = scan(path)
+            if is_document:
+                yield path
+
+            stack.extend(reversed(subfolders))
+
+        return
+
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+    # NOTE: this visits the folders in the same order as the sequential version
+    # above, but all the subfolders are submitted as soon as they are found, so
+    # that they are listed in the background while the stack is consumed
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        pending: list[tuple[str, Future[tuple[bool, list[str]]]]] = [
+            (folder, executor.submit(scan, folder))
+        ]
+        while pending:
+            path, future = pending.pop()
+            is_document, subfolders = future.result()
+            if is_document:
+                yield path
+
+            pending.extend(reversed([
+                (subfolder, executor.submit(scan, subfolder))
+                for subfolder in subfolders
+            ]))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
 def get_folders(folder: str) -> list[str]:
     """Get all folders with ``papis`` documents inside of *folder*.
 
     This is the main indexing routine. It looks inside *folder* and crawls
     the whole directory structure in search of subfolders containing an ``info``
     file. The name of the file must match the configured
-    :confval:`info-name`.
+    :confval:`info-name`. See :func:`iter_folders` for details.
 
     :param folder: root folder to look into.
     :returns: List of folders containing an ``info`` file.
     """
+    import time
+
     logger.debug("Indexing folders in '%s'.", folder)
-    info_name = papis.config.getstring("info-name")
 
-    folders = []
-    for root, _, _ in os.walk(folder):
-        if os.path.exists(os.path.join(root, info_name)):
-            folders.append(root)
+    begin_t = time.time()
+    folders = list(iter_folders(folder))
 
-    logger.debug("Retrieved %d valid folders.", len(folders))
+    logger.debug("Retrieved %d valid folders in %.1f ms.",
+                 len(folders), 1000 * (time.time() - begin_t))
 
     return folders
 
@@ -301,7 +476,9 @@ def locate_document_in_lib(document: Document,
 
     This function falls back to :confval:`unique-document-keys` to determine if the
     current document matches any document in the library. The first document
-    for which one of the keys in the list matches exactly will be returned.
+    for which one of the keys in the list matches exactly will be returned. If
+    :confval:`use-unique-key-index` is enabled, the keys are looked up in a
+    :class:`~papis.database.unique.UniqueKeyIndex` instead of the database.
 
     :param library: the name of a valid Papis library.
     :param unique_document_keys: a list of keys to match when locating a document.
@@ -313,16 +490,28 @@ def locate_document_in_lib(document: Document,
         unique_document_keys = papis.config.getlist("unique-document-keys")
 
     from papis.database import get
+
     db = get(library_name=library)
 
+    index = None
+    if papis.config.getboolean("use-unique-key-index"):
+        from papis.database.unique import get_unique_key_index
+        index = get_unique_key_index(db.lib)
+
     for key in unique_document_keys:
-        value = document.get(key)
-        if value is None:
-            continue
+        if index is not None and key in index.keys:
+            for papis_id in index.find(document, keys=[key]):
+                found = db.find_by_id(papis_id)
+                if found is not None:
+                    return found
+        else:
+            value = document.get(key)
+            if value is None:
+                continue
 
-        docs = db.query_dict({key: value})
-        if docs:
-            return docs[0]
+            docs = db.query_dict({key: value})
+            if docs:
+                return docs[0]
 
     from papis.document import describe
     raise IndexError(f"Document not found in library: '{describe(document)}'")
@@ -344,35 +533,141 @@ def locate_document(
         or *None* if no document is found.
     """
 
-    # if these keys exist in the documents, then check those first
-    # TODO: find a way to really match well titles and author
+    from papis.database.unique import get_unique_values
+
     comparing_keys = papis.config.getlist("unique-document-keys")
-    assert comparing_keys is not None
+    values = set(get_unique_values(document, comparing_keys))
+    if not values:
+        return None
 
     for d in documents:
-        for key in comparing_keys:
-            if key in document and key in d:
-                if re.match(document[key], d[key], re.I):
-                    return d
+        if not values.isdisjoint(get_unique_values(d, comparing_keys)):
+            return d
 
     return None
 
 
+#: Smallest number of folders loaded by a single worker in
+#: :func:`iter_documents_from_folders`.
+LOAD_CHUNK_MIN_SIZE = 16
+
+#: Largest number of folders loaded by a single worker in
+#: :func:`iter_documents_from_folders`.
+LOAD_CHUNK_MAX_SIZE = 512
+
+
+def _iter_load_chunks(folders: Iterable[str], np: int) -> Iterator[list[str]]:
+    from collections.abc import Sized
+
+    if isinstance(folders, Sized):
+        # NOTE: aim for a few chunks per process, so that the work is balanced
+        size = -(-len(folders) // (4 * max(np, 1)))
+        size = max(LOAD_CHUNK_MIN_SIZE, min(size, LOAD_CHUNK_MAX_SIZE))
+        grow = False
+    else:
+        # NOTE: the number of folders is not known for a stream, so start small
+        # (to get the workers going quickly) and grow for larger libraries
+        size = LOAD_CHUNK_MIN_SIZE
+        grow = True
+
+    chunk: list[str] = []
+    for folder in folders:
+        chunk.append(folder)
+        if len(chunk) >= size:
+            yield chunk
+
+            chunk = []
+            if grow:
+                size = min(2 * size, LOAD_CHUNK_MAX_SIZE)
+
+    if chunk:
+        yield chunk
+
+
+def _load_info_files(folders: list[str],
+                     info_name: str) -> list[tuple[str, dict[str, Any]]]:
+    from papis.yaml import yaml_to_data
+
+    result = []
+    for folder in folders:
+        info_file = os.path.join(folder, info_name)
+
+        data: dict[str, Any] = {}
+        if os.path.exists(info_file):
+            try:
+                data = yaml_to_data(info_file, raise_exception=True)
+            except Exception as exc:
+                logger.error(
+                    "Error reading info file at '%s'. Please check it!",
+                    info_file, exc_info=exc)
+
+        result.append((folder, data))
+
+    return result
+
+
+def iter_documents_from_folders(folders: Iterable[str],
+                                np: int | None = None) -> Iterator[Document]:
+    """Load documents from their respective *folders*.
+
+    The folders are split into chunks and the ``info`` files in each chunk are
+    read and parsed by a worker process. The workers only send back the parsed
+    data, which is much cheaper to pickle than a full
+    :class:`~papis.document.Document`, and the documents are constructed in
+    the current process. The chunks start small and grow for large libraries,
+    so that *folders* can be a stream (e.g. from :func:`iter_folders`) and
+    documents are yielded while the crawling is still in progress.
+
+    :param folders: an iterable of folder paths to load from.
+    :param np: number of processes to use (see :func:`parmap`).
+    :returns: an iterator over the documents, in the same order as *folders*.
+    """
+    from functools import partial
+
+    from papis.document import Document
+
+    if np is None:
+        np = get_process_count()
+
+    load = partial(_load_info_files,
+                   info_name=papis.config.getstring("info-name"))
+    chunks = _iter_load_chunks(folders, np)
+
+    def make_documents(
+            results: list[tuple[str, dict[str, Any]]]) -> Iterator[Document]:
+        for folder, data in results:
+            doc = Document(data=data)
+            doc.set_folder(folder)
+
+            yield doc
+
+    if np and HAS_MULTIPROCESSING and sys.platform != "darwin":
+        # NOTE: `imap` consumes the chunks in a separate thread, so the workers
+        # can start parsing before the crawling has finished
+        with Pool(np) as pool:
+            for results in pool.imap(load, chunks):
+                yield from make_documents(results)
+    else:
+        for chunk in chunks:
+            yield from make_documents(load(chunk))
+
+
+@papis.stats.timed("documents.load")
 def folders_to_documents(folders: Iterable[str]) -> list[Document]:
     """Load a list of documents from their respective *folders*.
 
-    :param folders: a list of folder paths to load from.
+    :param folders: a list of folder paths to load from. See
+        :func:`iter_documents_from_folders` for details.
     :returns: a list of document objects.
     """
 
     import time
 
-    from papis.document import from_folder
-
     begin_t = time.time()
-    result = parmap(from_folder, folders)
+    result = list(iter_documents_from_folders(folders))
 
-    logger.debug("Finished in %.1f ms.", 1000 * (time.time() - begin_t))
+    logger.debug("Loaded %d documents in %.1f ms.",
+                 len(result), 1000 * (time.time() - begin_t))
     return result
 
 
@@ -1,16 +1,14 @@
 from __future__ import annotations
 
-import re
-
 import dominate.tags as t
 
 import papis.config
 import papis.web.header
 import papis.web.html as wh
 import papis.web.navbar
+from papis.database.facets import TAGS_SPLIT_RX
 
 Tags = str | list[str]
-TAGS_SPLIT_RX = re.compile(r"\s*[,\s]\s*")
 PAPIS_TAGS_CLASS = "papis-tags"
 PAPIS_TAG_CLASS = "papis-tag"
 
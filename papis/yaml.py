@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING, Any
 import yaml
 
 import papis.logging
+import papis.stats
 
 # NOTE: try to use the CLoader when possible, as it's a lot faster than the
 # python version, at least at the time of writing
@@ -22,6 +23,7 @@ if TYPE_CHECKING:
 logger = papis.logging.get_logger(__name__)
 
 
+@papis.stats.timed("yaml.dump")
 def data_to_yaml(yaml_path: str,
                  data: dict[str, Any], *,
                  allow_unicode: bool | None = True) -> None:
@@ -38,6 +40,7 @@ def data_to_yaml(yaml_path: str,
                   default_flow_style=False)
 
 
+@papis.stats.timed("yaml.dump")
 def list_to_path(data: Sequence[dict[str, Any]],
                  filepath: str, *,
                  allow_unicode: bool | None = True) -> None:
@@ -54,6 +57,7 @@ def list_to_path(data: Sequence[dict[str, Any]],
                       default_flow_style=False)
 
 
+@papis.stats.timed("yaml.load")
 def yaml_to_data(yaml_path: str,
                  raise_exception: bool = False) -> dict[str, Any]:
     """Read a YAML document from *yaml_path*.
@@ -79,6 +83,7 @@ def yaml_to_data(yaml_path: str,
             return data
 
 
+@papis.stats.timed("yaml.load")
 def yaml_to_list(yaml_path: str,
                  raise_exception: bool = False) -> list[dict[str, Any]]:
     """Read a list of YAML documents.
@@ -111,6 +111,108 @@ def test_add_auto_doctor_run(tmp_library: TemporaryLibrary) -> None:
     assert doc["ref"] == "2FJT2E3A"
 
 
+@pytest.mark.parametrize("threshold", [0, 64])
+def test_add_run_many(tmp_library: TemporaryLibrary,
+                      monkeypatch: pytest.MonkeyPatch,
+                      threshold: int) -> None:
+    import papis.commands.add
+    from papis.database import get_database
+    from papis.id import ID_KEY_NAME
+
+    monkeypatch.setattr(papis.commands.add, "BULK_ADD_PARALLEL_THRESHOLD", threshold)
+
+    db = get_database()
+    ndocs = len(db.get_all_documents())
+
+    entries = [
+        ({"author": "Kutzelnigg, Werner", "title": "Many-body perturbation theory",
+          "doi": "10.1002/qua.22384"},
+         [tmp_library.create_random_file() for _ in range(2)]),
+        # NOTE: duplicate of an existing document in the library
+        ({"author": "Turing, Alan", "title": "On Computable Numbers",
+          "doi": "10.1112/PLMS/S2-42.1.230"}, []),
+        # NOTE: duplicate of another document in the same batch
+        ({"author": "Werner Kutzelnigg", "title": "Many-body perturbation theory",
+          "doi": "10.1002/qua.22384"}, []),
+        ({"author": "Evangelista", "title": "MRCI"}, []),
+        ]
+
+    docs = papis.commands.add.run_many(entries, batch=True)
+    assert [doc["title"] for doc in docs] == [
+        "Many-body perturbation theory", "MRCI"]
+    assert len(docs[0].get_files()) == 2
+    assert len({doc[ID_KEY_NAME] for doc in docs}) == 2
+
+    db = get_database()
+    assert len(db.get_all_documents()) == ndocs + 2
+
+    doc, = db.query_dict({"author": "Kutzelnigg"})
+    assert doc[ID_KEY_NAME] == docs[0][ID_KEY_NAME]
+    assert doc.get_main_folder() == docs[0].get_main_folder()
+    assert os.path.exists(doc.get_info_file())
+
+
+def test_add_staging_cleanup(tmp_library: TemporaryLibrary,
+                             monkeypatch: pytest.MonkeyPatch) -> None:
+    import papis.commands.add
+    import papis.document
+    from papis.paths import STAGING_FOLDER_NAME
+
+    def move(doc: Document, path: str) -> None:
+        raise RuntimeError("Failed to move document")
+
+    monkeypatch.setattr(papis.document, "move", move)
+    staging_dir = os.path.join(tmp_library.libdir, STAGING_FOLDER_NAME)
+
+    # check that staged documents are removed when adding them fails
+    with pytest.raises(RuntimeError, match="Failed to move"):
+        papis.commands.add.run(
+            [tmp_library.create_random_file()],
+            data={"author": "Evangelista", "title": "MRCI"},
+            batch=True)
+    assert not os.path.exists(staging_dir)
+
+    with pytest.raises(RuntimeError, match="Failed to move"):
+        papis.commands.add.run_many(
+            [({"author": "Evangelista", "title": "MRCI"}, []),
+             ({"author": "Kutzelnigg", "title": "MBPT"}, [])],
+            batch=True)
+    assert not os.path.exists(staging_dir)
+
+
+def test_add_staging_base_path(tmp_library: TemporaryLibrary,
+                               monkeypatch: pytest.MonkeyPatch) -> None:
+    import papis.commands.add
+    import papis.document
+    from papis.paths import STAGING_FOLDER_NAME
+
+    staged_folders = []
+    move = papis.document.move
+
+    def staged_move(doc: Document, path: str) -> None:
+        staged_folders.append(doc.get_main_folder())
+        move(doc, path)
+
+    monkeypatch.setattr(papis.document, "move", staged_move)
+    base_path = os.path.join(tmp_library.tmpdir, "other-library")
+    staging_dir = os.path.join(base_path, STAGING_FOLDER_NAME)
+
+    # check that documents are staged next to their destination
+    papis.commands.add.run(
+        [tmp_library.create_random_file()],
+        data={"author": "Evangelista", "title": "MRCI"},
+        base_path=base_path,
+        batch=True)
+
+    papis.commands.add.run_many(
+        [({"author": "Kutzelnigg", "title": "MBPT"}, [])],
+        base_path=base_path,
+        batch=True)
+
+    assert len(staged_folders) == 2
+    assert all(os.path.dirname(folder) == staging_dir for folder in staged_folders)
+
+
 def test_add_set_cli(tmp_library: TemporaryLibrary) -> None:
     from papis.commands.add import cli
     cli_runner = PapisRunner()
@@ -2,10 +2,18 @@ from __future__ import annotations
 
 import os
 import tempfile
+from typing import TYPE_CHECKING, Any
 
 import papis.database
 from papis.testing import PapisRunner, TemporaryLibrary
 
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    import pytest
+
+    from papis.document import Document
+
 
 def test_export_run(tmp_library: TemporaryLibrary) -> None:
     from papis.commands.export import run
@@ -48,6 +56,32 @@ def test_export_run(tmp_library: TemporaryLibrary) -> None:
     assert data == docs
 
 
+def test_export_run_iter(tmp_library: TemporaryLibrary) -> None:
+    from papis.commands.export import run, run_iter
+
+    db = papis.database.get()
+    docs = db.get_all_documents()
+
+    for fmt in ("bibtex", "csv", "json", "typst", "yaml"):
+        consumed = 0
+
+        def iter_docs() -> Iterator[Document]:
+            nonlocal consumed
+            for doc in docs:
+                consumed += 1
+                yield doc
+
+        # NOTE: documents are consumed lazily while the output is produced
+        chunks = run_iter(iter_docs(), to_format=fmt)
+        first = next(chunks)
+        assert first
+        assert consumed < len(docs)
+
+        result = first + "".join(chunks)
+        assert consumed == len(docs)
+        assert result == run(docs, to_format=fmt)
+
+
 def test_export_json_cli(tmp_library: TemporaryLibrary) -> None:
     from papis.commands.export import cli
     cli_runner = PapisRunner()
@@ -86,6 +120,42 @@ def test_export_json_cli(tmp_library: TemporaryLibrary) -> None:
     assert data_out == data
 
 
+def test_export_cli_failure(tmp_library: TemporaryLibrary,
+                            monkeypatch: pytest.MonkeyPatch) -> None:
+    import papis.document
+    from papis.commands.export import cli
+
+    to_dict = papis.document.to_dict
+    ncalls = 0
+
+    def failing_to_dict(doc: Document) -> dict[str, Any]:
+        nonlocal ncalls
+        ncalls += 1
+        if ncalls == 2:
+            raise ValueError("failed to convert document")
+
+        return to_dict(doc)
+
+    outfile = os.path.join(tmp_library.tmpdir, "test.json")
+    with open(outfile, "w", encoding="utf-8") as fd:
+        fd.write("[]")
+
+    # NOTE: the existing file is left untouched if the export fails midway
+    monkeypatch.setattr(papis.document, "to_dict", failing_to_dict)
+
+    cli_runner = PapisRunner()
+    result = cli_runner.invoke(
+        cli,
+        ["--format", "json", "--batch", "--out", outfile, "--all"])
+
+    assert result.exit_code == 1
+    assert ncalls == 2
+    assert not os.path.exists(f"{outfile}.tmp")
+
+    with open(outfile, encoding="utf-8") as fd:
+        assert fd.read() == "[]"
+
+
 def test_export_yaml_cli(tmp_library: TemporaryLibrary) -> None:
     from papis.commands.export import cli
     cli_runner = PapisRunner()
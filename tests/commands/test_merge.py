@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import papis.database
+from papis.testing import PapisRunner, TemporaryLibrary
+
+if TYPE_CHECKING:
+    from _pytest.monkeypatch import MonkeyPatch
+
+    from papis.document import Document
+
+
+def test_merge_duplicates_cli(tmp_library: TemporaryLibrary,
+                              monkeypatch: MonkeyPatch) -> None:
+    import papis.commands.merge
+    import papis.duplicates
+
+    docs = papis.database.get().get_all_documents()[:3]
+    monkeypatch.setattr(papis.duplicates, "find_duplicates",
+                        lambda documents, threshold: [docs])
+
+    merged = []
+
+    def merge_documents(documents: list[Document],
+                        **kwargs: Any) -> tuple[Document, Document]:
+        merged.append(list(documents))
+        return documents[0], documents[1]
+
+    monkeypatch.setattr(papis.commands.merge, "merge_documents", merge_documents)
+
+    # check that clusters are merged until a single document is left
+    cli_runner = PapisRunner()
+    result = cli_runner.invoke(papis.commands.merge.cli, ["--duplicates", "."])
+    assert result.exit_code == 0
+    assert merged == [docs, [docs[0], docs[2]]]
+
+    # check that a cluster is only merged once if both documents are kept
+    merged.clear()
+    result = cli_runner.invoke(papis.commands.merge.cli,
+                               ["--duplicates", "--keep", "."])
+    assert result.exit_code == 0
+    assert merged == [docs]
@@ -197,3 +197,19 @@ def test_tag_rename_missing_value_cli(
         ["--rename", "tag_nonexistent", "tag_renamed1", "krishnamurti"],
     )
     assert result.exit_code == 1
+
+
+def test_tag_list_cli(tmp_library: TemporaryLibrary) -> None:
+    from papis.commands.tag import cli
+
+    cli_runner = PapisRunner()
+    result = cli_runner.invoke(cli, ["--add", "tag2", "krishnamurti"])
+    assert result.exit_code == 0
+
+    result = cli_runner.invoke(cli, ["--list"])
+    assert result.exit_code == 0
+    assert result.stdout.splitlines() == [
+        "     1 1234",
+        "     1 tag1",
+        "     1 tag2",
+    ]
@@ -817,3 +817,118 @@ def test_update_bibtex_cli(
 
     (doc,) = db.query_dict({"author": "Wannier"})
     assert doc["doi"] == data["doi"]
+
+
+def test_update_resume_cli(
+    tmp_library: TemporaryLibrary,
+    resource_cache: ResourceCache,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    import papis.commands.update
+    from papis.commands.update import cli
+
+    db = papis.database.get()
+    ndocuments = len(db.get_all_documents())
+    cli_runner = PapisRunner()
+
+    filename = os.path.join(resource_cache.cachedir, "update", "russell.yaml")
+    args = ["--from", "yaml", filename, "--all", "--batch"]
+
+    # interrupt the run after updating the first document
+    run = papis.commands.update.run
+    ncalls = 0
+
+    def interrupted_run(*args, **kwargs) -> None:  # type: ignore[no-untyped-def]
+        nonlocal ncalls
+        ncalls += 1
+        if ncalls > 1:
+            raise KeyboardInterrupt
+
+        run(*args, **kwargs)
+
+    def run_interrupted(batch_size: int = 1) -> None:
+        nonlocal ncalls
+        ncalls = 0
+
+        with monkeypatch.context() as m:
+            m.setattr(papis.commands.update, "run", interrupted_run)
+            m.setattr(papis.commands.update, "UPDATE_BATCH_SIZE", batch_size)
+
+            result = cli_runner.invoke(cli, args)
+            assert result.exit_code != 0
+
+    # resume the run and check that the first document is skipped
+    # NOTE: the interruption happens before the batch is full, so this checks
+    # that the checkpoint is also written when the run is interrupted
+    run_interrupted(batch_size=100)
+
+    caplog.clear()
+    with caplog.at_level("INFO"):
+        result = cli_runner.invoke(cli, [*args, "--resume"])
+        assert result.exit_code == 0
+
+    messages = [r.message for r in caplog.records]
+    assert any("skipping 1 already processed" in msg for msg in messages)
+    assert any(f"Updated {ndocuments - 1} / {ndocuments - 1} documents." in msg
+               for msg in messages)
+
+    # check that the checkpoint is not used by default
+    run_interrupted()
+
+    caplog.clear()
+    with caplog.at_level("INFO"):
+        result = cli_runner.invoke(cli, args)
+        assert result.exit_code == 0
+
+    messages = [r.message for r in caplog.records]
+    assert not any("already processed" in msg for msg in messages)
+    assert any(f"Updated {ndocuments} / {ndocuments} documents." in msg
+               for msg in messages)
+
+
+def test_update_abort_keeps_checkpoint_cli(
+    tmp_library: TemporaryLibrary,
+    resource_cache: ResourceCache,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    import papis.commands.update
+    import papis.tui.utils
+    from papis.commands.update import cli
+
+    db = papis.database.get()
+    ndocuments = len(db.get_all_documents())
+    cli_runner = PapisRunner()
+
+    filename = os.path.join(resource_cache.cachedir, "update", "russell.yaml")
+    args = ["--from", "yaml", filename, "--all"]
+
+    # fail on the last document and do not continue when asked
+    run = papis.commands.update.run
+    ncalls = 0
+
+    def failing_run(*args, **kwargs) -> None:  # type: ignore[no-untyped-def]
+        nonlocal ncalls
+        ncalls += 1
+        if ncalls == ndocuments:
+            raise RuntimeError("Failed to update document")
+
+        run(*args, **kwargs)
+
+    monkeypatch.setattr(papis.tui.utils, "confirm", lambda *args, **kwargs: False)
+    with monkeypatch.context() as m:
+        m.setattr(papis.commands.update, "run", failing_run)
+
+        result = cli_runner.invoke(cli, args)
+        assert result.exit_code != 0
+
+    # check that the checkpoint is kept for the aborted run
+    caplog.clear()
+    with caplog.at_level("INFO"):
+        result = cli_runner.invoke(cli, [*args, "--resume"])
+        assert result.exit_code == 0
+
+    messages = [r.message for r in caplog.records]
+    assert any(f"skipping {ndocuments - 1} already processed" in msg
+               for msg in messages)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+
+import papis.config
+import papis.database
+
+if TYPE_CHECKING:
+    from papis.testing import TemporaryLibrary
+
+PAPIS_DB_BACKENDS = ["papis", "sqlite"]
+
+try:
+    import whoosh  # ruff:ignore[unused-import]
+    PAPIS_DB_BACKENDS.append("whoosh")
+except ImportError:
+    pass
+
+PAPIS_DB_SETTINGS = [
+    {"settings": {"database-backend": b, "use-completion-index": True}}
+    for b in PAPIS_DB_BACKENDS]
+
+
+@pytest.mark.parametrize("tmp_library", PAPIS_DB_SETTINGS, indirect=True)
+def test_completion_index_search(tmp_library: TemporaryLibrary) -> None:
+    from papis.database.completion import get_completion_index
+
+    papis.config.set("completion-format", "{doc[title]}")
+    index = get_completion_index(papis.config.get_lib())
+    assert os.path.exists(index.path)
+
+    db = papis.database.get()
+    ndocs = len(db.get_all_documents())
+    assert len(index.search()) == ndocs
+    assert len(index.search(limit=2)) == 2
+
+    entries = index.search("Test Document")
+    assert len(entries) == 2
+    assert all(e.completion.startswith("Test Document") for e in entries)
+    assert not index.search("test document")
+
+
+@pytest.mark.parametrize("tmp_library", PAPIS_DB_SETTINGS, indirect=True)
+def test_completion_index_update(tmp_library: TemporaryLibrary) -> None:
+    from papis.database.completion import CompletionIndex, get_completion_index
+
+    papis.config.set("completion-format", "{doc[title]}")
+    index = get_completion_index(papis.config.get_lib())
+
+    db = papis.database.get()
+    doc, = db.query_dict({"title": "Freedom"})
+    doc["title"] = "Absolute freedom"
+    doc.save()
+    db.update(doc)
+
+    index = CompletionIndex(papis.config.get_lib())
+    assert index.load()
+    assert [e.completion for e in index.search("Absolute")] == ["Absolute freedom"]
+    assert not index.search("Freedom")
+
+    db.delete(doc)
+
+    index = CompletionIndex(papis.config.get_lib())
+    assert index.load()
+    assert not index.search("Absolute")
+
+    db.clear()
+    assert not os.path.exists(index.path)
+
+
+@pytest.mark.library_setup(settings={
+    "database-backend": "papis",
+    "use-completion-index": True,
+    })
+def test_completion_index_format_change(tmp_library: TemporaryLibrary) -> None:
+    from papis.database.completion import CompletionIndex, get_completion_index
+
+    papis.config.set("completion-format", "{doc[title]}")
+    get_completion_index(papis.config.get_lib())
+
+    papis.config.set("completion-format", "{doc[year]}")
+    index = CompletionIndex(papis.config.get_lib())
+    assert not index.load()
+
+    index = get_completion_index(papis.config.get_lib())
+    assert [e.completion for e in index.search("2019")] == ["2019", "2019"]
+
+
+@pytest.mark.library_setup(settings={
+    "database-backend": "papis",
+    "use-completion-index": True,
+    })
+def test_completion_index_journal(tmp_library: TemporaryLibrary) -> None:
+    from papis.database import base
+    from papis.database.completion import CompletionIndex, get_completion_index
+
+    papis.config.set("completion-format", "{doc[title]}")
+    index = get_completion_index(papis.config.get_lib())
+    mtime = os.stat(index.path).st_mtime_ns
+
+    db = papis.database.get()
+    doc, = db.query_dict({"title": "Freedom"})
+    doc["title"] = "Absolute freedom"
+    doc.save()
+    db.update(doc)
+
+    # check that single updates are only appended to the journal
+    assert os.stat(index.path).st_mtime_ns == mtime
+    with open(index.journal_path, encoding="utf-8") as fd:
+        assert len(fd.readlines()) == 2
+
+    index = CompletionIndex(papis.config.get_lib())
+    assert index.load()
+    assert [e.completion for e in index.search("Absolute")] == ["Absolute freedom"]
+
+    # check that the journal is merged into the index once it is too long
+    base.INDEX_JOURNAL_MAX_RECORDS = 0
+    try:
+        index = CompletionIndex(papis.config.get_lib())
+        assert index.load()
+    finally:
+        base.INDEX_JOURNAL_MAX_RECORDS = 1000
+
+    with open(index.journal_path, encoding="utf-8") as fd:
+        assert len(fd.readlines()) == 1
+
+    index = CompletionIndex(papis.config.get_lib())
+    assert index.load()
+    assert [e.completion for e in index.search("Absolute")] == ["Absolute freedom"]
+
+    # check that changes with a different format are not added to the journal
+    papis.config.set("completion-format", "{doc[year]}")
+    db.delete(doc)
+
+    papis.config.set("completion-format", "{doc[title]}")
+    index = CompletionIndex(papis.config.get_lib())
+    assert index.load()
+    assert [e.completion for e in index.search("Absolute")] == ["Absolute freedom"]
+
+
+@pytest.mark.library_setup(settings={"database-backend": "papis"})
+def test_query_shell_complete(tmp_library: TemporaryLibrary) -> None:
+    import click
+
+    from papis.cli import _query_shell_complete
+
+    papis.config.set("completion-format", "{doc[title]}")
+    ctx = click.Context(click.Command("test"))
+    param = click.Argument(["query"])
+
+    db = papis.database.get()
+    ndocs = len(db.get_all_documents())
+
+    def complete(incomplete: str) -> list[str]:
+        return sorted(c.value for c in _query_shell_complete(ctx, param, incomplete))
+
+    for use_index in (False, True):
+        papis.config.set("use-completion-index", use_index)
+        papis.config.set("prefix-only-completions", False)
+
+        assert len(complete("")) == ndocs
+        assert complete("reedom") == ["Freedom from the known"]
+
+        papis.config.set("default-query-string", "title:Freedom")
+        assert complete("") == ["Freedom from the known"]
+        papis.config.set("default-query-string", ".")
+
+        papis.config.set("prefix-only-completions", True)
+        assert complete("Free") == ["Freedom from the known"]
+        assert complete("reedom") == []
+
+    # check that completing an empty query does not load the database
+    papis.config.set("use-completion-index", True)
+    papis.config.set("prefix-only-completions", False)
+    papis.database.clear_cached()
+
+    assert len(complete("")) == ndocs
+    assert not papis.database.DATABASES
@@ -96,6 +96,77 @@ def test_database_add(tmp_library: TemporaryLibrary) -> None:
         assert ndocs == ndocs_after_add - 1
 
 
+@pytest.mark.parametrize("tmp_library", PAPIS_DB_SETTINGS, indirect=True)
+def test_database_add_many(tmp_library: TemporaryLibrary) -> None:
+    db = papis.database.get()
+    ndocs = len(db.get_all_documents())
+
+    import os
+
+    from papis.document import from_data
+
+    new_docs = []
+    for i in range(3):
+        folder = os.path.join(tmp_library.libdir, f"critique-{i}")
+        os.makedirs(folder)
+
+        doc = from_data({"author": "Kant", "title": f"Critique {i}"})
+        doc.set_folder(folder)
+        doc.save()
+        new_docs.append(doc)
+
+    db.add_many(new_docs)
+
+    assert len(db.get_all_documents()) == ndocs + 3
+    assert len(db.query_dict({"author": "Kant"})) == 3
+
+
+@pytest.mark.parametrize("tmp_library", PAPIS_DB_SETTINGS, indirect=True)
+def test_database_batch(tmp_library: TemporaryLibrary) -> None:
+    from papis.database.unique import get_unique_key_index
+
+    papis.config.set("use-unique-key-index", True)
+    get_unique_key_index(papis.config.get_lib())
+
+    db = papis.database.get()
+    docs = db.get_all_documents()
+
+    with db.batch():
+        for doc in docs[1:]:
+            doc["note"] = "updated in batch"
+            doc.save()
+            db.update(doc)
+
+        # NOTE: nested batches are committed with the outer one
+        with db.batch():
+            db.delete(docs[0])
+
+    # check that the changes were committed to disk
+    papis.database.clear_cached()
+    db = papis.database.get()
+
+    new_docs = db.get_all_documents()
+    assert len(new_docs) == len(docs) - 1
+    assert all(doc["note"] == "updated in batch" for doc in new_docs)
+
+    index = get_unique_key_index(db.lib)
+    assert docs[0]["papis_id"] not in index._values_by_id
+
+    # check that the changes made before an exception are kept
+    with pytest.raises(KeyboardInterrupt), db.batch():
+        for doc in new_docs[:2]:
+            doc["tags"] = "NEWTAG"
+            doc.save()
+            db.update(doc)
+
+        raise KeyboardInterrupt
+
+    papis.database.clear_cached()
+    db = papis.database.get()
+
+    assert len(db.query_dict({"tags": "NEWTAG"})) == 2
+
+
 @pytest.mark.parametrize("tmp_library", PAPIS_DB_SETTINGS, indirect=True)
 def test_database_cache_same_library_via_different_paths(
     tmp_library: TemporaryLibrary,
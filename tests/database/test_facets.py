@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+
+import papis.config
+import papis.database
+
+if TYPE_CHECKING:
+    from papis.testing import TemporaryLibrary
+
+PAPIS_DB_BACKENDS = ["papis", "sqlite"]
+
+try:
+    import whoosh  # ruff:ignore[unused-import]
+    PAPIS_DB_BACKENDS.append("whoosh")
+except ImportError:
+    pass
+
+PAPIS_DB_SETTINGS = [
+    {"settings": {"database-backend": b, "use-facet-index": True}}
+    for b in PAPIS_DB_BACKENDS]
+
+
+@pytest.mark.parametrize("tmp_library", PAPIS_DB_SETTINGS, indirect=True)
+def test_database_facets(tmp_library: TemporaryLibrary) -> None:
+    from papis.database.facets import FacetIndex, count_facet_values
+
+    db = papis.database.get()
+    docs = db.get_all_documents()
+
+    tags = db.facets("tags")
+    assert tags == count_facet_values(docs, "tags")
+    assert tags == {"tag1": 1, "1234": 1}
+
+    index = FacetIndex(papis.config.get_lib())
+    assert os.path.exists(index.path)
+
+    # NOTE: keys that are not in the index are counted from all documents
+    assert db.facets("year") == count_facet_values(docs, "year")
+    assert db.facets("year")["2019"] == 2
+
+    doc, = db.query_dict({"title": "Freedom"})
+    doc["tags"] = ["tag1", "tag2"]
+    doc.save()
+    db.update(doc)
+
+    other, = db.query_dict({"author": "Turing"})
+    other["tags"] = "tag2, tag3"
+    other.save()
+    db.update(other)
+
+    expected = {"tag1": 1, "tag2": 2, "tag3": 1}
+    assert db.facets("tags") == expected
+
+    index = FacetIndex(papis.config.get_lib())
+    assert index.load()
+    assert index.get_counts("tags") == expected
+
+    db.delete(doc)
+    assert db.facets("tags") == {"tag2": 1, "tag3": 1}
+
+    db.clear()
+    assert not os.path.exists(index.path)
+
+
+@pytest.mark.library_setup(settings={
+    "facet-keys": ["tags", "year"],
+    "use-facet-index": True,
+    })
+def test_database_facets_keys(tmp_library: TemporaryLibrary) -> None:
+    from papis.database.facets import FacetIndex
+
+    db = papis.database.get()
+    assert db.facets("year")["2019"] == 2
+
+    index = FacetIndex(papis.config.get_lib())
+    assert index.load()
+    assert index.get_counts("year") == db.facets("year")
+    assert index.get_counts("author") is None
+
+
+@pytest.mark.library_setup(settings={"use-facet-index": True})
+def test_database_facets_journal(tmp_library: TemporaryLibrary) -> None:
+    from papis.database.facets import FacetIndex, get_facet_index
+
+    index = get_facet_index(papis.config.get_lib())
+    mtime = os.stat(index.path).st_mtime_ns
+
+    db = papis.database.get()
+    doc, = db.query_dict({"title": "Freedom"})
+    doc["tags"] = ["tag1", "tag2"]
+    doc.save()
+    db.update(doc)
+
+    # check that the index file is not rewritten on a single update
+    assert os.stat(index.path).st_mtime_ns == mtime
+
+    index = FacetIndex(papis.config.get_lib())
+    assert index.load()
+    assert index.get_counts("tags") == {"tag1": 1, "tag2": 1}
@@ -91,3 +91,122 @@ def test_cache_path(tmp_library: TemporaryLibrary) -> None:
     db.clear()
 
     assert not os.path.exists(db.get_cache_path())
+
+
+@pytest.mark.library_setup(settings={"database-backend": "papis"})
+def test_cache_file_lazy(tmp_library: TemporaryLibrary) -> None:
+    from papis.database import get_database
+    from papis.database.cachefile import DocumentList
+    from papis.id import ID_KEY_NAME
+
+    db = get_database()
+    expected = {doc[ID_KEY_NAME]: doc for doc in db.get_all_documents()}
+
+    docs = DocumentList.from_file(db.get_cache_path())
+    assert docs is not None
+    assert len(docs) == len(expected)
+    assert {docs.get_papis_id(i) for i in range(len(docs))} == set(expected)
+    assert all(doc is None for doc in docs._docs)
+
+    doc = docs[1]
+    assert doc == expected[doc[ID_KEY_NAME]]
+    assert doc.get_main_folder() == expected[doc[ID_KEY_NAME]].get_main_folder()
+    assert sum(doc is not None for doc in docs._docs) == 1
+
+    # check that saving keeps undecoded and modified documents
+    doc["title"] = "Modified title"
+    del docs[0]
+    docs.save(db.get_cache_path())
+    docs.close()
+
+    docs = DocumentList.from_file(db.get_cache_path())
+    assert docs is not None
+    assert len(docs) == len(expected) - 1
+    assert docs[0]["title"] == "Modified title"
+    assert all(d == expected[d[ID_KEY_NAME]] for d in docs[1:])
+    docs.close()
+
+
+@pytest.mark.library_setup(settings={"database-backend": "papis"})
+def test_cache_file_match_strings(tmp_library: TemporaryLibrary) -> None:
+    import papis.config
+    from papis.database import get_database
+    from papis.database.cache import PickleDatabase
+
+    db = get_database()
+    doc = db.get_all_documents()[0]
+    query = doc["title"].split()[0]
+    expected = db.query(query)
+    assert doc in expected
+
+    # check that querying a term uses the match strings from the cache file
+    db = PickleDatabase(db.lib)
+    assert db.query(query) == expected
+    assert db.documents is not None
+    assert sum(d is not None for d in db.documents._docs) == len(expected)
+
+    # check that a different match format falls back to formatting documents
+    papis.config.set("match-format", "{doc[author]}")
+    db = PickleDatabase(db.lib)
+    result = db.query(query)
+    assert doc not in result
+    assert db.documents is not None
+    assert all(d is not None for d in db.documents._docs)
+
+
+@pytest.mark.library_setup(settings={"database-backend": "papis"})
+def test_cache_file_migration(tmp_library: TemporaryLibrary) -> None:
+    import pickle
+
+    from papis.database import get_database
+    from papis.database.cache import PickleDatabase
+    from papis.database.cachefile import CACHE_FILE_MAGIC
+
+    db = get_database()
+    docs = db.get_all_documents()
+    db.clear()
+
+    with open(db.get_cache_path(), "wb") as fd:
+        pickle.dump(docs, fd)
+
+    db = PickleDatabase(db.lib)
+    assert db.get_all_documents() == docs
+
+    with open(db.get_cache_path(), "rb") as fd:
+        assert fd.read(len(CACHE_FILE_MAGIC)) == CACHE_FILE_MAGIC
+
+    doc = docs[0]
+    assert db.find_by_id(doc["papis_id"]) == doc
+
+
+@pytest.mark.library_setup(settings={
+    "database-backend": "papis",
+    "compact-documents": True,
+    })
+def test_database_compact_documents(tmp_library: TemporaryLibrary) -> None:
+    from papis.database import get_database
+    from papis.database.cache import PickleDatabase
+    from papis.document import CompactDocument, from_folder
+
+    db = get_database()
+    docs = db.get_all_documents()
+    assert docs
+    assert all(isinstance(doc, CompactDocument) for doc in docs)
+
+    for doc in docs:
+        folder = doc.get_main_folder()
+        assert folder is not None
+        assert doc == from_folder(folder)
+
+    # check that documents are still compact after they are read from the cache
+    db = PickleDatabase(db.lib)
+    doc = db.get_all_documents()[0]
+    assert isinstance(doc, CompactDocument)
+
+    doc["title"] = "Modified title"
+    db.update(doc)
+
+    db = PickleDatabase(db.lib)
+    doc = db.find_by_id(doc["papis_id"])
+    assert isinstance(doc, CompactDocument)
+    assert doc["title"] == "Modified title"
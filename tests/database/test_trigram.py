@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+
+import papis.config
+import papis.database
+
+if TYPE_CHECKING:
+    from papis.testing import TemporaryLibrary
+
+TRIGRAM_QUERIES = [
+    "",
+    "einstein",
+    "test document",
+    "author:einstein",
+    "title:freedom",
+    "author:turing or title:freedom",
+    "not einstein",
+    "year:20[0-9]",
+    "author:einstein and 19[0-9]",
+    "doesnotexist",
+]
+
+
+@pytest.mark.library_setup(settings={"database-backend": "papis"})
+def test_trigram_index_query(tmp_library: TemporaryLibrary) -> None:
+    db = papis.database.get()
+    expected = {q: sorted(str(d.get_main_folder()) for d in db.query(q))
+                for q in TRIGRAM_QUERIES}
+
+    papis.config.set("use-trigram-index", True)
+    db = papis.database.get()
+    db._indices = None
+
+    for q in TRIGRAM_QUERIES:
+        result = sorted(str(d.get_main_folder()) for d in db.query(q))
+        assert result == expected[q], q
+
+
+@pytest.mark.library_setup(settings={
+    "database-backend": "papis",
+    "use-trigram-index": True,
+    })
+def test_trigram_index_update(tmp_library: TemporaryLibrary) -> None:
+    from papis.database.trigram import TrigramIndex
+    from papis.docmatcher import parse_query
+
+    db = papis.database.get()
+    doc, = db.query_dict({"title": "Freedom"})
+    assert db.query("title:absolute") == []
+
+    index = TrigramIndex(papis.config.get_lib())
+    assert index.load()
+
+    doc["title"] = "Absolute freedom"
+    doc.save()
+    db.update(doc)
+
+    index = TrigramIndex(papis.config.get_lib())
+    assert index.load()
+    candidates = index.candidates(parse_query("title:absolute"))
+    assert candidates is not None
+    assert len(candidates) == 1
+    assert db.query("title:absolute") == [doc]
+
+    db.delete(doc)
+
+    index = TrigramIndex(papis.config.get_lib())
+    assert index.load()
+    assert index.candidates(parse_query("title:absolute")) == set()
+    assert index.candidates(parse_query("title:freedom")) == set()
+    assert db.query("title:absolute") == []
+
+    db.clear()
+    assert not os.path.exists(index.path)
+
+
+@pytest.mark.library_setup(settings={
+    "database-backend": "papis",
+    "use-trigram-index": True,
+    })
+def test_trigram_index_candidates(tmp_library: TemporaryLibrary) -> None:
+    from papis.database.trigram import TrigramIndex
+    from papis.docmatcher import parse_query
+
+    db = papis.database.get()
+    db.query("")
+
+    index = TrigramIndex(papis.config.get_lib())
+    assert index.load()
+
+    # NOTE: regex-only terms and negations cannot use the index
+    assert index.candidates(parse_query("20[0-9]")) is None
+    assert index.candidates(parse_query("not einstein")) is None
+    # NOTE: keys that are not indexed cannot use the index
+    assert index.candidates(parse_query("publisher:foo")) is None
+
+    ndocs = len(db.get_all_documents())
+    candidates = index.candidates(parse_query("test document"))
+    assert candidates is not None
+    assert 0 < len(candidates) < ndocs
+
+
+@pytest.mark.library_setup(settings={
+    "database-backend": "papis",
+    "use-trigram-index": True,
+    })
+def test_trigram_index_outdated(tmp_library: TemporaryLibrary) -> None:
+    db = papis.database.get()
+    assert db.query("title:zanzibarian") == []
+
+    # NOTE: changes made while the index is disabled are not applied to it
+    papis.config.set("use-trigram-index", False)
+    papis.database.clear_cached()
+    db = papis.database.get()
+
+    doc = db.get_all_documents()[0]
+    doc["title"] = "zanzibarian title"
+    doc.save()
+    db.update(doc)
+
+    papis.config.set("use-trigram-index", True)
+    papis.database.clear_cached()
+    db = papis.database.get()
+
+    assert db.query("title:zanzibarian") == [doc]
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+
+import papis.config
+import papis.database
+
+if TYPE_CHECKING:
+    from papis.testing import TemporaryLibrary
+
+PAPIS_DB_BACKENDS = ["papis", "sqlite"]
+
+try:
+    import whoosh  # ruff:ignore[unused-import]
+    PAPIS_DB_BACKENDS.append("whoosh")
+except ImportError:
+    pass
+
+PAPIS_DB_SETTINGS = [
+    {"settings": {"database-backend": b, "use-unique-key-index": True}}
+    for b in PAPIS_DB_BACKENDS]
+
+
+def test_normalize_unique_value() -> None:
+    from papis.database.unique import normalize_unique_value
+
+    assert normalize_unique_value("doi", "DOI: 10.1000/ABC") == "10.1000/abc"
+    assert normalize_unique_value("doi", "http://dx.doi.org/10.1000/x") == "10.1000/x"
+    assert normalize_unique_value("eprint", "https://arxiv.org/abs/1712.03134v1") \
+        == "1712.03134"
+    assert normalize_unique_value("isbn10", "0-306-40615-X") == "030640615x"
+    assert normalize_unique_value("url", "https://www.example.com/a/") \
+        == "example.com/a"
+    assert normalize_unique_value("ref", "  ") is None
+    assert normalize_unique_value("ref", None) is None
+
+
+@pytest.mark.parametrize("tmp_library", PAPIS_DB_SETTINGS, indirect=True)
+def test_unique_key_index_find(tmp_library: TemporaryLibrary) -> None:
+    from papis.database.unique import get_unique_key_index
+    from papis.id import ID_KEY_NAME
+
+    index = get_unique_key_index(papis.config.get_lib())
+    assert os.path.exists(index.path)
+
+    db = papis.database.get()
+    doc, = db.query_dict({"author": "Turing"})
+
+    ids = index.find({"doi": "https://doi.org/10.1112/PLMS/S2-42.1.230"})
+    assert ids == [doc[ID_KEY_NAME]]
+    assert index.find({"doi": "10.1112/plms"}) == []
+    assert index.find({"title": doc["title"]}) == []
+    assert index.find_duplicates() == []
+
+
+@pytest.mark.parametrize("tmp_library", PAPIS_DB_SETTINGS, indirect=True)
+def test_unique_key_index_update(tmp_library: TemporaryLibrary) -> None:
+    from papis.database.unique import UniqueKeyIndex, get_unique_key_index
+    from papis.id import ID_KEY_NAME
+
+    get_unique_key_index(papis.config.get_lib())
+
+    db = papis.database.get()
+    doc, = db.query_dict({"author": "Turing"})
+    other, = db.query_dict({"title": "Freedom"})
+
+    other["doi"] = "10.1112/plms/s2-42.1.230"
+    other["url"] = "https://example.com/freedom"
+    other.save()
+    db.update(other)
+
+    index = UniqueKeyIndex(papis.config.get_lib())
+    assert index.load()
+    assert index.find({"url": "http://example.com/freedom/"}) == [other[ID_KEY_NAME]]
+    assert index.find_duplicates() == [
+        sorted([doc[ID_KEY_NAME], other[ID_KEY_NAME]])]
+
+    db.delete(other)
+
+    index = UniqueKeyIndex(papis.config.get_lib())
+    assert index.load()
+    assert index.find({"url": "example.com/freedom"}) == []
+    assert index.find_duplicates() == []
+
+    db.clear()
+    assert not os.path.exists(index.path)
+
+
+@pytest.mark.library_setup(settings={
+    "database-backend": "papis",
+    "use-unique-key-index": True,
+    })
+def test_locate_document_in_lib(tmp_library: TemporaryLibrary) -> None:
+    from papis.document import from_data
+    from papis.utils import locate_document_in_lib
+
+    db = papis.database.get()
+    doc, = db.query_dict({"author": "Turing"})
+
+    found = locate_document_in_lib(from_data({"doi": "DOI:10.1112/PLMS/S2-42.1.230"}))
+    assert found == doc
+
+    # NOTE: keys that are not in the index fall back to querying the database
+    found = locate_document_in_lib(from_data({"title": doc["title"]}),
+                                   unique_document_keys=["title"])
+    assert found == doc
+
+    with pytest.raises(IndexError):
+        locate_document_in_lib(from_data({"doi": "10.1112"}))
@@ -5,7 +5,9 @@ from typing import TYPE_CHECKING
 
 import pytest
 
+import papis.config
 import papis.database
+import papis.document
 
 if TYPE_CHECKING:
     from papis.testing import TemporaryLibrary
@@ -36,3 +38,92 @@ def test_cache_path(tmp_library: TemporaryLibrary) -> None:
     db.clear()
 
     assert not os.path.exists(db.get_cache_path())
+
+
+@pytest.mark.library_setup(settings={"database-backend": "whoosh"})
+def test_query_stored_documents(tmp_library: TemporaryLibrary,
+                                monkeypatch: pytest.MonkeyPatch) -> None:
+    pytest.importorskip("whoosh")
+
+    db = papis.database.get()
+    ndocs = len(db.get_all_documents())
+
+    def from_folder(folder_path: str) -> papis.document.Document:
+        raise AssertionError(f"document loaded from disk: '{folder_path}'")
+
+    # NOTE: documents should be reconstructed from the index only
+    with monkeypatch.context() as m:
+        m.setattr(papis.document, "from_folder", from_folder)
+
+        docs = db.get_all_documents()
+        assert len(docs) == ndocs
+        assert all(doc.get_main_folder() for doc in docs)
+
+        doc, = db.query_dict({"title": "Freedom"})
+        assert doc["author"] == "J. Krishnamurti"
+        assert doc["tags"] == ["tag1", 1234]
+
+
+@pytest.mark.library_setup(settings={"database-backend": "whoosh"})
+def test_query_verify_mtime(tmp_library: TemporaryLibrary) -> None:
+    pytest.importorskip("whoosh")
+
+    db = papis.database.get()
+    doc, = db.query_dict({"title": "Freedom"})
+
+    # NOTE: modify the document behind the database's back
+    doc["note"] = "changed on disk"
+    doc.save()
+    os.utime(doc.get_info_file(), (0, 0))
+
+    doc, = db.query_dict({"title": "Freedom"})
+    assert "note" not in doc
+
+    papis.config.set("whoosh-verify-mtime", True)
+    doc, = db.query_dict({"title": "Freedom"})
+    assert doc["note"] == "changed on disk"
+
+
+@pytest.mark.library_setup(settings={"database-backend": "whoosh"})
+def test_batch(tmp_library: TemporaryLibrary) -> None:
+    pytest.importorskip("whoosh")
+
+    from papis.database.whoosh import WhooshDatabase
+
+    db = papis.database.get()
+    assert isinstance(db, WhooshDatabase)
+
+    generation = db._get_index().latest_generation()
+    docs = db.get_all_documents()
+    with db.batch():
+        for doc in docs:
+            doc["note"] = "updated in batch"
+            db.update(doc)
+
+    assert db._get_index().latest_generation() == generation + 1
+    docs = db.get_all_documents()
+    assert all(doc["note"] == "updated in batch" for doc in docs)
+
+    # NOTE: changes made before an exception are still committed
+    with pytest.raises(RuntimeError), db.batch():
+        db.delete(docs[0])
+        raise RuntimeError("failed batch")
+
+    assert len(db.get_all_documents()) == len(docs) - 1
+
+
+@pytest.mark.library_setup(settings={"database-backend": "whoosh"})
+def test_index_multiprocess(tmp_library: TemporaryLibrary,
+                            monkeypatch: pytest.MonkeyPatch) -> None:
+    pytest.importorskip("whoosh")
+
+    import papis.database.whoosh
+    monkeypatch.setenv("PAPIS_NP", "2")
+    monkeypatch.setattr(papis.database.whoosh, "WHOOSH_MIN_DOCUMENTS_PER_PROCESS", 1)
+
+    db = papis.database.get()
+    ndocs = len(db.get_all_documents())
+
+    db.clear()
+    db.initialize()
+    assert len(db.get_all_documents()) == ndocs
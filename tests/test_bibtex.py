@@ -2,11 +2,12 @@ from __future__ import annotations
 
 import os
 import re
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import pytest
 
 if TYPE_CHECKING:
+    from papis.document import Document
     from papis.testing import ResourceCache, TemporaryConfiguration
 
 BIBTEX_RESOURCES = os.path.join(os.path.dirname(__file__), "resources", "bibtex")
@@ -221,6 +222,15 @@ def test_ignore_keys(tmp_config: TemporaryConfiguration,
         "  author = {Einstein, Albert},\n"
         "}")
 
+    # check that the keys in the options are used
+    from papis.exporters.bibtex import get_bibtex_options, to_bibtex
+
+    options = get_bibtex_options()._replace(ignore_keys=frozenset(["author"]))
+    assert to_bibtex(from_data(doc), options=options) == (
+        "@report{MyDocument,\n"
+        "  year = {2350},\n"
+        "}")
+
 
 def test_import_institution(tmp_config: TemporaryConfiguration) -> None:
     from papis.bibtex import bibtex_to_dict
@@ -244,3 +254,125 @@ def test_import_institution(tmp_config: TemporaryConfiguration) -> None:
 
     from_result = exporter([from_data(to_result)])
     assert from_result == orig
+
+
+@pytest.mark.parametrize("np", [0, 2])
+def test_export_cache(tmp_config: TemporaryConfiguration,
+                      monkeypatch: pytest.MonkeyPatch,
+                      np: int) -> None:
+    import papis.exporters.bibtex
+    from papis.config import set as setboolean
+    from papis.document import from_data
+    from papis.exporters.bibtex import exporter
+
+    docs = [from_data({
+        "type": "article",
+        "ref": f"Einstein{i}",
+        "author": "Albert Einstein",
+        "title": f"The Theory of Everything, Part {i}",
+        "year": 2350 + i,
+        }) for i in range(5)]
+    docs.append(from_data({"type": "fictional", "ref": "Invalid"}))
+
+    monkeypatch.setenv("PAPIS_NP", str(np))
+    monkeypatch.setattr(papis.exporters.bibtex, "BIBTEX_EXPORT_CHUNK_SIZE", 2)
+
+    setboolean("bibtex-export-cache", False)
+    expected = exporter(docs)
+    assert expected.count("@article") == 5
+
+    setboolean("bibtex-export-cache", True)
+    assert exporter(docs) == expected
+
+    # NOTE: all the valid documents should now be taken from the cache
+    to_bibtex = papis.exporters.bibtex.to_bibtex
+    converted = []
+
+    def to_bibtex_wrapper(doc: Document, **kwargs: Any) -> str:
+        converted.append(doc)
+        return to_bibtex(doc, **kwargs)
+
+    monkeypatch.setattr(papis.exporters.bibtex, "to_bibtex", to_bibtex_wrapper)
+    docs[0]["year"] = 1905
+    result = exporter(docs)
+
+    assert result == expected.replace("2350", "1905")
+    assert converted == [docs[0], docs[-1]]
+
+
+@pytest.mark.parametrize("np", [0, 2])
+def test_iter_bibtex_entries(tmp_config: TemporaryConfiguration,
+                             monkeypatch: pytest.MonkeyPatch,
+                             np: int) -> None:
+    import papis.bibtex
+    from papis.bibtex import bibtex_to_dict, iter_bibtex_entries
+
+    entries = [
+        "@string{nat = {Nature}}",
+        "Some free text between the entries with an e-mail (me@example.com).",
+        *(
+            f"@article{{ref{i},\n"
+            f"  author = {{Einstein, Albert}},\n"
+            f"  title = {{The {{Theory}} of Everything (Part {i})}},\n"
+            f"  journal = nat,\n"
+            f"  year = {{{2350 + i}}},\n"
+            "}"
+            for i in range(5)
+        ),
+        "@comment{this is ignored}",
+        "@string(phys = {Physics @ Large})",
+        "@book(ref5, title = {Why (Not)?}, publisher = phys # { Press}, year = 2355)",
+        '@article(ref6, title = "A (B) C", year = 2000)',
+        "@misc{ref7, title = {Unfinished",
+    ]
+    bib = "\n\n".join(entries)
+
+    monkeypatch.setenv("PAPIS_NP", str(np))
+    monkeypatch.setattr(papis.bibtex, "BIBTEX_READ_CHUNK_SIZE", 2)
+
+    it = iter_bibtex_entries(bib)
+    assert next(it)["ref"] == "ref0"
+
+    result = bibtex_to_dict(bib)
+    assert [d.get("ref") for d in result] == [f"ref{i}" for i in range(7)]
+    assert all(d["journal"] == "Nature" for d in result[:5])
+    assert result[2]["title"] == "The Theory of Everything (Part 2)"
+    assert result[5]["title"] == "Why (Not)?"
+    assert result[5]["publisher"] == "Physics @ Large Press"
+    assert result[6]["title"] == "A (B) C"
+
+
+def test_get_cited_keys(tmp_config: TemporaryConfiguration) -> None:
+    from papis.bibtex import get_cited_keys
+
+    files = {
+        "main.tex": r"""
+            \documentclass{article}
+            \usepackage{graphicx}
+            \begin{document}
+            As shown in \cite{einstein1905, bohr1913} and \citep[see][p.~3]{planck1900}.
+            % \cite{commented}
+            Costs 5\% \parencites(pre)(post)[p. 1]{multi1}[p. 2]{multi2}
+            and \textcite*{starred}.
+            \includegraphics{figure}
+            \input{chapters/ch1}
+            \include chapters/ch2
+            \nocite{
+              nocite1,
+              nocite2}
+            \end{document}
+            """,
+        # NOTE: includes are relative to the main file and cycles are ignored
+        "chapters/ch1.tex": r"In chapter one \autocite{ch1key} and \input{main}.",
+        "chapters/ch2.tex": r"\Cite{ch2key} \cite{a}{b}",
+    }
+
+    os.makedirs(os.path.join(tmp_config.tmpdir, "chapters"))
+    for name, text in files.items():
+        with open(os.path.join(tmp_config.tmpdir, name), "w", encoding="utf-8") as fd:
+            fd.write(text)
+
+    assert get_cited_keys(os.path.join(tmp_config.tmpdir, "main.tex")) == {
+        "einstein1905", "bohr1913", "planck1900", "multi1", "multi2", "starred",
+        "ch1key", "ch2key", "nocite1", "nocite2", "a",
+    }
@@ -314,3 +314,41 @@ def test_get_list(tmp_config: TemporaryConfiguration) -> None:
     with pytest.raises(UnexpectedSettingTypeError,
                        match="must be a valid Python list"):
         papis.config.getlist("super-key-list")
+
+
+def test_settings_cache(tmp_config: TemporaryConfiguration) -> None:
+    import papis.config
+
+    papis.config.set("cached-key", "hello")
+    assert papis.config.getstring("cached-key") == "hello"
+
+    stats = papis.config.get_settings_cache_stats()
+    assert papis.config.getstring("cached-key") == "hello"
+    assert papis.config.get_settings_cache_stats().hits == stats.hits + 1
+
+    # check that modifying the configuration invalidates the cache
+    papis.config.set("cached-key", "world")
+    assert papis.config.getstring("cached-key") == "world"
+
+    config = papis.config.get_configuration()
+    config["settings"]["cached-key"] = "section"
+    assert papis.config.getstring("cached-key") == "section"
+
+    config[papis.config.get_lib_name()] = {"cached-key": "library"}
+    assert papis.config.getstring("cached-key") == "library"
+
+    papis.config.set("cached-list", ["a", "b"])
+    result = papis.config.getlist("cached-list")
+    result.append("c")
+    assert papis.config.getlist("cached-list") == ["a", "b"]
+
+    # check that missing keys are also cached
+    from papis.exceptions import DefaultSettingValueMissing
+
+    for _ in range(2):
+        with pytest.raises(DefaultSettingValueMissing):
+            papis.config.get("missing-cached-key")
+
+    papis.config.reset_configuration()
+    with pytest.raises(DefaultSettingValueMissing):
+        papis.config.get("cached-key")
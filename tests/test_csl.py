@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import pytest
 
@@ -62,3 +62,49 @@ def test_csl_style_download(tmp_config: TemporaryConfiguration) -> None:
     result = exporter([doc])
 
     assert result == "Einstein, A. 2350. The Theory of Everything. Nature."
+
+
+def test_csl_export_batched(tmp_config: TemporaryConfiguration,
+                            monkeypatch: pytest.MonkeyPatch) -> None:
+    citeproc = pytest.importorskip("citeproc")
+
+    import papis.exporters.csl
+    from papis.document import from_data
+    from papis.exporters.csl import export_document, export_documents
+
+    docs = [from_data({
+        "type": "article",
+        "author": "Albert Einstein",
+        "author_list": [{"given": "Albert", "family": "Einstein"}],
+        "title": f"The Theory of Everything, Part {i}",
+        "journal": "Nature",
+        "year": 2350 + i,
+        "ref": "MyDocument"}) for i in range(10)]
+
+    nparsed = 0
+    style_cls = citeproc.CitationStylesStyle
+
+    def make_style(*args: Any, **kwargs: Any) -> Any:
+        nonlocal nparsed
+        nparsed += 1
+        return style_cls(*args, **kwargs)
+
+    monkeypatch.setattr(citeproc, "CitationStylesStyle", make_style)
+    papis.exporters.csl._load_style.cache_clear()
+
+    # NOTE: the style comes with citeproc-py, so it does not need downloading
+    style_name = "harvard-cite-them-right"
+    expected = [
+        export_document(doc, style_name=style_name, formatter_name="plain")
+        for doc in docs]
+    assert nparsed == 1
+
+    # NOTE: documents with the same ref are still rendered separately
+    result = export_documents(docs, style_name=style_name, formatter_name="plain")
+    assert result == expected
+    assert len(set(result)) == len(docs)
+    assert nparsed == 1
+
+    # NOTE: the style sorts by year, but the entries follow the documents
+    result = export_documents(docs[::-1], style_name=style_name, formatter_name="plain")
+    assert result == expected[::-1]
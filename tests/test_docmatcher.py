@@ -221,3 +221,46 @@ def test_regex_patterns(tmp_config: TemporaryConfiguration) -> None:
     matched_docs = [doc for doc in docs if matcher(doc)]
     assert len(matched_docs) > 0
     assert all("f-center" in doc.get("title", "").lower() for doc in matched_docs)
+
+
+def test_plan_query(tmp_config: TemporaryConfiguration) -> None:
+    from papis.docmatcher import And, Not, Or, Pair, Term, parse_query, plan_query
+
+    rs = plan_query(parse_query("quantum year:2023 author:smith"))
+    assert isinstance(rs, And)
+    assert [type(child) for child in rs.children] == [Pair, Pair, Term]
+    assert [
+        child.query for child in rs.children if isinstance(child, (Pair, Term))
+        ] == ["2023", "smith", "quantum"]
+
+    rs = plan_query(parse_query("(quantum OR author:smith) AND NOT tags:physics"))
+    assert isinstance(rs, And)
+    assert isinstance(rs.children[0], Not)
+    assert isinstance(rs.children[1], Or)
+    assert [type(child) for child in rs.children[1].children] == [Pair, Term]
+
+
+def test_document_index(tmp_config: TemporaryConfiguration) -> None:
+    import papis.config
+    from papis.docmatcher import DocumentIndex, get_regex_from_search, parse_query
+
+    docs = get_docs()
+    index = DocumentIndex(docs)
+    match_format = papis.config.getformatpattern("match-format")
+
+    queries = [
+        "Lithium",
+        "author:Seitz",
+        "Lithium author:Iwata",
+        "year:200[0-9]",
+        "year:200[0-9] OR author:Seitz",
+        "NOT year:200[0-9]",
+        "chloride NOT (author:Iwata OR year:19)",
+        "nonexistentkey:value",
+    ]
+    for search in queries:
+        query = parse_query(search)
+        expected = [doc for doc in docs if query.match(doc, match_format)]
+        assert index.filter(query, match_format) == expected, search
+
+    assert index.lookup("nonexistentkey", get_regex_from_search(".*")) == set()
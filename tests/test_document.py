@@ -249,6 +249,145 @@ def test_pickle() -> None:
     assert gotdocs[1]["author"] == docs[1]["author"]
 
 
+def test_pickle_folder(tmp_config: TemporaryConfiguration) -> None:
+    doc = papis.document.from_data({"title": "Hello World"})
+    doc.set_folder(tmp_config.tmpdir)
+
+    gotdoc = pickle.loads(pickle.dumps(doc))
+    assert gotdoc == doc
+    assert gotdoc.get_main_folder() == tmp_config.tmpdir
+    assert gotdoc.get_info_file() == os.path.join(tmp_config.tmpdir, "info.yaml")
+
+
+def test_compact(tmp_config: TemporaryConfiguration) -> None:
+    import gc
+    import tracemalloc
+
+    import yaml
+
+    text = """
+    title: On the Electrodynamics of Moving Bodies {}
+    author_list:
+    - {{family: Einstein, given: Albert}}
+    - {{family: Planck, given: Max}}
+    journal: Annalen der Physik
+    tags: [physics, relativity]
+    year: 1905
+    """
+
+    def make_documents() -> list[papis.document.Document]:
+        # NOTE: load each document separately so that no strings are shared
+        return [papis.document.from_data(yaml.safe_load(text.format(i)))
+                for i in range(500)]
+
+    expected = make_documents()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        docs = make_documents()
+        size, _ = tracemalloc.get_traced_memory()
+
+        for doc in docs:
+            papis.document.compact(doc)
+
+        gc.collect()
+        compact_size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert docs == expected
+    assert compact_size < 0.75 * size
+
+
+def test_compact_document(tmp_config: TemporaryConfiguration) -> None:
+    import gc
+    import tracemalloc
+
+    import yaml
+
+    text = """
+    title: On the Electrodynamics of Moving Bodies {0}
+    abstract: It is known that Maxwell's electrodynamics leads to asymmetries {0}
+    author_list:
+    - {{family: Einstein, given: Albert}}
+    - {{family: Planck, given: Max}}
+    journal: Annalen der Physik
+    year: 1905
+    """
+
+    def make_documents() -> list[papis.document.Document]:
+        docs = []
+        for i in range(500):
+            doc = papis.document.from_data(yaml.safe_load(text.format(i)))
+            doc.set_folder(os.path.join(tmp_config.tmpdir, f"document-{i}"))
+            docs.append(doc)
+
+        return docs
+
+    expected = make_documents()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        docs = make_documents()
+        size, _ = tracemalloc.get_traced_memory()
+
+        docs = [papis.document.CompactDocument.from_document(d) for d in docs]
+
+        gc.collect()
+        compact_size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert compact_size < 0.5 * size
+
+    doc = docs[0]
+    assert doc.get_main_folder() == expected[0].get_main_folder()
+    assert doc.get_info_file() == expected[0].get_info_file()
+    assert doc.subfolder == expected[0].subfolder
+
+    # check that lazy values are only decoded when accessed
+    assert "abstract" in doc
+    assert set(doc) == set(expected[0])
+    assert doc.to_dict() == expected[0]
+    assert not dict.__contains__(doc, "abstract")
+    assert not dict.__contains__(doc, "author_list")
+
+    assert doc["author_list"] == expected[0]["author_list"]
+    assert dict.__contains__(doc, "author_list")
+    assert doc.get("abstract") == expected[0]["abstract"]
+
+    assert docs == expected
+    assert pickle.loads(pickle.dumps(docs[1])) == expected[1]
+
+    doc = docs[2]
+    doc.update({"abstract": "", "title": "Another title"})
+    assert "abstract" not in doc
+    assert doc["title"] == "Another title"
+
+
+def test_compact_document_iter(tmp_config: TemporaryConfiguration) -> None:
+    from papis.doctor import empty_fields_check
+
+    # NOTE: empty values are dropped by `Document.update`, but they can still
+    # be loaded from the cache or from an info file
+    doc = papis.document.Document()
+    dict.update(doc, {
+        "title": "On the Electrodynamics of Moving Bodies",
+        "abstract": "",
+        "author_list": [{"family": "Einstein", "given": "Albert"}],
+        })
+    doc = papis.document.CompactDocument.from_document(doc)
+
+    # check that decoding the lazy values while iterating works
+    assert {key: doc[key] for key in doc} == doc.to_dict()
+
+    doc = papis.document.CompactDocument.from_document(doc)
+    errors = empty_fields_check(doc)
+    assert [error.payload for error in errors] == ["abstract"]
+
+
 def test_sort(tmp_config: TemporaryConfiguration) -> None:
     docs = [
         papis.document.from_data({"title": "Hello world", "year": 1990}),
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from papis.document import Document
+    from papis.testing import TemporaryConfiguration
+
+
+def make_documents() -> list[Document]:
+    from papis.document import from_data
+
+    return [
+        from_data({"title": "Quantum Monte Carlo for Molecules",
+                   "author": "Ceperley, David", "year": 2017,
+                   "eprint": "1712.03134v1"}),
+        from_data({"title": "A Quantum Monte-Carlo for molecules",
+                   "author": "Ceperley, D.", "year": 2018,
+                   "doi": "10.1000/qmc"}),
+        from_data({"title": "Quantum Monte Carlo for Solids",
+                   "author": "Ceperley, David", "year": 2018}),
+        from_data({"title": "Unrelated Paper on Bees",
+                   "author": "Smith, John", "year": 1985,
+                   "doi": "10.1000/QMC"}),
+        from_data({"title": "Unrelated Paper on Bees",
+                   "author": "Smith, John", "year": 1999}),
+    ]
+
+
+def test_get_similarity(tmp_config: TemporaryConfiguration) -> None:
+    from papis.duplicates import get_fingerprint, get_similarity
+
+    fps = [get_fingerprint(doc) for doc in make_documents()]
+
+    assert get_similarity(fps[0], fps[0]) == pytest.approx(1.0)
+    assert get_similarity(fps[0], fps[1]) > 0.8
+    assert get_similarity(fps[0], fps[2]) < 0.8
+    # NOTE: shared DOI
+    assert get_similarity(fps[1], fps[3]) == pytest.approx(1.0)
+    # NOTE: same title and author, but the year is too far apart
+    assert 0.8 < get_similarity(fps[3], fps[4]) < 1.0
+
+
+@pytest.mark.parametrize("parallel_threshold", [0, 20000])
+def test_find_duplicates(tmp_config: TemporaryConfiguration,
+                         monkeypatch: pytest.MonkeyPatch,
+                         parallel_threshold: int) -> None:
+    import papis.duplicates
+
+    monkeypatch.setattr(papis.duplicates,
+                        "PARALLEL_SIMILARITY_THRESHOLD", parallel_threshold)
+
+    docs = make_documents()
+    clusters = papis.duplicates.find_duplicates(docs)
+    assert clusters == [[docs[0], docs[1], docs[3], docs[4]]]
+
+    clusters = papis.duplicates.find_duplicates(docs, threshold=0.99)
+    assert clusters == [[docs[1], docs[3]]]
+
+    clusters = papis.duplicates.find_duplicates(docs[:3] + docs[4:])
+    assert clusters == [[docs[0], docs[1]]]
@@ -151,3 +151,99 @@ def test_git_operations_raise_on_failure(tmp_library: TemporaryLibrary) -> None:
     with tempfile.TemporaryDirectory() as tmp:
         with pytest.raises(GitError):
             git_commit(tmp, "not a repo — should fail")
+
+
+@pytest.mark.parametrize("use_pathspec_file", [False, True])
+@pytest.mark.library_setup(use_git=True)
+def test_transaction(tmp_library: TemporaryLibrary, use_pathspec_file: bool) -> None:
+    from papis.git import transaction as git_transaction
+
+    libdir = tmp_library.libdir
+
+    subdir = os.path.join(libdir, "subdir")
+    os.makedirs(subdir)
+    for name in ("a.txt", "b.txt"):
+        with open(os.path.join(subdir, name), "w", encoding="utf-8") as f:
+            f.write(name)
+
+    # NOTE: ignored files should not be staged, while deleted files inside the
+    # added folders should be removed from the index
+    folder_c = os.path.join(libdir, "c")
+    os.makedirs(folder_c)
+    with open(os.path.join(folder_c, "old.txt"), "w", encoding="utf-8") as f:
+        f.write("old")
+
+    with open(os.path.join(libdir, ".gitignore"), "w", encoding="utf-8") as f:
+        f.write("*.log\n")
+
+    git_add(libdir, ["subdir", "c", ".gitignore"])
+    git_commit(libdir, "add subdir")
+    ncommits = _git_commits(libdir)
+
+    with git_transaction("Bulk change", use_pathspec_file=use_pathspec_file):
+        shutil.rmtree(subdir)
+        git_rm_cached(libdir, "subdir", recursive=True)
+        git_commit(libdir, "remove subdir")
+
+        for name in ("c", "d"):
+            folder = os.path.join(libdir, name)
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, "info.yaml"), "w", encoding="utf-8") as f:
+                f.write(f"title: {name}\n")
+
+            with open(os.path.join(folder, "ignored.log"), "w", encoding="utf-8") as f:
+                f.write(name)
+
+            with git_transaction():
+                git_add_and_commit(folder, "info.yaml", f"add {name}")
+
+        os.remove(os.path.join(folder_c, "old.txt"))
+        git_add(libdir, "c")
+
+        # NOTE: nothing is committed before the transaction ends
+        assert _git_commits(libdir) == ncommits
+
+    assert _git_commits(libdir) == ncommits + 1
+
+    stdout = git_cmd("log", "-1", "--format=%B", cwd=libdir)
+    assert stdout.startswith("Bulk change")
+    assert "* remove subdir" in stdout
+    assert "* add d" in stdout
+
+    stdout = git_cmd("ls-files", cwd=libdir)
+    assert "subdir" not in stdout
+    assert "c/info.yaml" in stdout.split("\n")
+    assert "d/info.yaml" in stdout.split("\n")
+    assert "c/old.txt" not in stdout
+    assert ".log" not in stdout
+
+
+@pytest.mark.parametrize("use_pathspec_file", [False, True])
+@pytest.mark.library_setup(use_git=True)
+def test_transaction_invalid_path(tmp_library: TemporaryLibrary,
+                                  use_pathspec_file: bool,
+                                  caplog: pytest.LogCaptureFixture) -> None:
+    from papis.git import transaction as git_transaction
+
+    libdir = tmp_library.libdir
+    ncommits = _git_commits(libdir)
+
+    # NOTE: an invalid path should not stop the other paths from being committed
+    with git_transaction("Bulk change", use_pathspec_file=use_pathspec_file):
+        for name in ("a", "b"):
+            folder = os.path.join(libdir, name)
+            os.makedirs(folder)
+            with open(os.path.join(folder, "info.yaml"), "w", encoding="utf-8") as f:
+                f.write(f"title: {name}\n")
+
+            git_add_and_commit(folder, "info.yaml", f"add {name}")
+
+        git_add(libdir, "missing.txt")
+
+    assert _git_commits(libdir) == ncommits + 1
+
+    stdout = git_cmd("ls-files", cwd=libdir)
+    assert "a/info.yaml" in stdout.split("\n")
+    assert "b/info.yaml" in stdout.split("\n")
+    assert any("missing.txt" in r.message for r in caplog.records
+               if r.levelname == "ERROR")
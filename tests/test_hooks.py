@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import papis.hooks
+
+if TYPE_CHECKING:
+    import pytest
+
+    from papis.testing import TemporaryConfiguration
+
+
+def test_hooks_run(tmp_config: TemporaryConfiguration,
+                   monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(papis.hooks, "CUSTOM_LOCAL_HOOKS", {})
+
+    calls = []
+    papis.hooks.add("on_test_done", lambda doc: calls.append(("single", doc)))
+    papis.hooks.run("on_test_done", 1)
+    assert calls == [("single", 1)]
+
+    # NOTE: callbacks added after the hook was run are still called
+    @papis.hooks.batch
+    def callback(docs: list[int]) -> None:
+        calls.append(("batch", docs))
+
+    papis.hooks.add("on_test_done", callback)
+    assert papis.hooks.is_batch(callback)
+
+    calls.clear()
+    papis.hooks.run("on_test_done", 2)
+    assert calls == [("single", 2), ("batch", [2])]
+
+    calls.clear()
+    papis.hooks.run_batch("on_test_done", [3, 4])
+    assert calls == [("single", 3), ("single", 4), ("batch", [3, 4])]
+
+
+def test_hooks_failure(tmp_config: TemporaryConfiguration,
+                       monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(papis.hooks, "CUSTOM_LOCAL_HOOKS", {})
+
+    calls = []
+
+    def callback(doc: int) -> None:
+        if doc == 1:
+            raise ValueError(doc)
+
+        calls.append(doc)
+
+    papis.hooks.add("on_test_done", callback)
+    papis.hooks.run_batch("on_test_done", [1, 2])
+    papis.hooks.run("on_test_done", 3, 4)
+    assert calls == [2]
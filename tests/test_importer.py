@@ -174,3 +174,37 @@ def test_matching_importers_by_doc(tmp_config: TemporaryConfiguration) -> None:
     importers = get_matching_importers_by_doc(doc)
     assert len(importers) == 1
     assert isinstance(importers[0], DOIImporter)
+
+
+def test_iter_fetched_importers(tmp_config: TemporaryConfiguration) -> None:
+    import threading
+
+    from papis.importer import Importer, iter_fetched_importers
+
+    fetched: list[str] = []
+    lock = threading.Lock()
+
+    class SleepyImporter(Importer):
+        def __init__(self, uri: str = "", **kwargs: Any) -> None:
+            super().__init__(uri=uri, name="sleepy")
+
+        @classmethod
+        def match(cls, uri: str) -> SleepyImporter:
+            return SleepyImporter(uri=uri)
+
+        def fetch(self) -> None:
+            # NOTE: sleep longer for earlier groups to shuffle the fetch order
+            time.sleep(0.01 * (8 - int(self.uri)))
+            self.ctx.data = {"uri": self.uri}
+            with lock:
+                fetched.append(self.uri)
+
+    groups = [[SleepyImporter(str(i))] for i in range(8)]
+    for max_workers in (1, 4):
+        fetched.clear()
+        result = list(iter_fetched_importers(
+            groups, download_files=False, max_workers=max_workers))
+
+        assert [imp.uri for group in result for imp in group] == \
+            [str(i) for i in range(8)]
+        assert sorted(fetched) == [str(i) for i in range(8)]
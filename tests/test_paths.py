@@ -268,3 +268,68 @@ def test_rename_document_files(tmp_config: TemporaryConfiguration) -> None:
     assert new_files == [
         normalize_path_part(os.path.basename(filename)) for filename in orig_files
         ]
+
+
+def test_copy_file(tmp_config: TemporaryConfiguration) -> None:
+    from papis.paths import FileCopyMethod, copy_file
+
+    src = tmp_config.create_random_file("pdf")
+    os.chmod(src, 0o640)
+    with open(src, "rb") as fd:
+        contents = fd.read()
+
+    all_methods: list[tuple[FileCopyMethod, ...]] = [
+        ("reflink", "copy"), ("copy",), ("hardlink",)]
+    for i, methods in enumerate(all_methods):
+        dst = os.path.join(tmp_config.tmpdir, f"copy-{i}.pdf")
+        method = copy_file(src, dst, methods=methods)
+
+        assert method in methods
+        assert os.stat(dst).st_mode & 0o777 == 0o640
+        with open(dst, "rb") as fd:
+            assert fd.read() == contents
+
+        if method == "hardlink":
+            assert os.path.samefile(src, dst)
+        else:
+            assert not os.path.samefile(src, dst)
+
+
+def test_get_staging_folder(tmp_library: TemporaryLibrary) -> None:
+    from papis.paths import STAGING_FOLDER_NAME, get_staging_folder
+    from papis.utils import get_folders
+
+    folder = get_staging_folder()
+    staging_dir = os.path.join(tmp_library.libdir, STAGING_FOLDER_NAME)
+    assert os.path.dirname(folder) == staging_dir
+
+    # check that the staging folder is ignored by git
+    with open(os.path.join(staging_dir, ".gitignore"), encoding="utf-8") as fd:
+        assert fd.read() == "*\n"
+
+    # check that documents in the staging folder are not part of the library
+    nfolders = len(get_folders(tmp_library.libdir))
+    with open(os.path.join(folder, "info.yaml"), "w", encoding="utf-8") as fd:
+        fd.write("title: Staged document\n")
+
+    assert len(get_folders(tmp_library.libdir)) == nfolders
+
+
+def test_remove_staging_folder(tmp_library: TemporaryLibrary) -> None:
+    from papis.paths import (
+        STAGING_FOLDER_NAME,
+        get_staging_folder,
+        remove_staging_folder,
+    )
+
+    staging_dir = os.path.join(tmp_library.libdir, STAGING_FOLDER_NAME)
+    folder_a = get_staging_folder()
+    folder_b = get_staging_folder()
+
+    # check that the staging folder is kept while other documents use it
+    remove_staging_folder(folder_a)
+    assert not os.path.exists(folder_a)
+    assert os.path.exists(folder_b)
+
+    remove_staging_folder(folder_b)
+    assert not os.path.exists(staging_dir)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import TYPE_CHECKING
+
+import papis.stats
+
+if TYPE_CHECKING:
+    from papis.testing import TemporaryConfiguration
+
+
+def test_stats_disabled() -> None:
+    papis.stats.reset()
+    assert not papis.stats.is_enabled()
+
+    with papis.stats.span("test.span"):
+        pass
+
+    papis.stats.increment("test.counter")
+    assert papis.stats.get_span_stats() == {}
+    assert papis.stats.get_counters() == {}
+
+
+def test_stats_spans(tmp_config: TemporaryConfiguration) -> None:
+    @papis.stats.timed("test.timed")
+    def func(x: int) -> int:
+        return 2 * x
+
+    papis.stats.reset()
+    papis.stats.enable(trace=True)
+    try:
+        with papis.stats.span("test.span"):
+            pass
+
+        assert [func(i) for i in range(3)] == [0, 2, 4]
+        papis.stats.record("test.span", 0.5)
+        papis.stats.increment("test.counter", 2)
+    finally:
+        papis.stats.disable()
+
+    stats = papis.stats.get_span_stats()
+    assert stats["test.timed"].count == 3
+    assert stats["test.span"].count == 2
+    assert stats["test.span"].total >= 0.5
+    assert papis.stats.get_counters() == {"test.counter": 2}
+
+    table = papis.stats.format_stats().splitlines()
+    assert table[1].startswith("test.span")
+    assert table[-1].split() == ["test.counter", "2"]
+
+    filename = os.path.join(tmp_config.tmpdir, "trace.json")
+    papis.stats.write_trace(filename)
+
+    with open(filename, encoding="utf-8") as fd:
+        events = json.load(fd)["traceEvents"]
+
+    assert len(events) == 5
+    assert all(event["ph"] == "X" for event in events)
+
+    # check that resetting also stops tracing
+    papis.stats.reset()
+    papis.stats.enable()
+    try:
+        with papis.stats.span("test.span"):
+            pass
+    finally:
+        papis.stats.disable()
+
+    papis.stats.write_trace(filename)
+    with open(filename, encoding="utf-8") as fd:
+        assert json.load(fd)["traceEvents"] == []
+
+    papis.stats.reset()
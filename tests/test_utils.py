@@ -23,6 +23,65 @@ def test_get_cache_home(tmp_config: TemporaryConfiguration,
         assert get_cache_home() == tmp
 
 
+@pytest.mark.parametrize("max_workers", [0, 4])
+def test_iter_folders(tmp_config: TemporaryConfiguration, max_workers: int) -> None:
+    from papis.utils import iter_folders
+
+    def make_document(*parts: str) -> str:
+        folder = os.path.join(tmp_config.tmpdir, "lib", *parts)
+        os.makedirs(folder)
+        with open(os.path.join(folder, "info.yaml"), "w", encoding="utf-8") as fd:
+            fd.write("title: Test\n")
+
+        return folder
+
+    root = os.path.join(tmp_config.tmpdir, "lib")
+    doc_a = make_document("a")
+    doc_b = make_document("sub", "b")
+    doc_c = make_document("a", "supplementary", "c")
+    make_document(".git", "d")
+    os.makedirs(os.path.join(root, "empty"))
+
+    folders = iter_folders(root, ignore=[".git"], max_workers=max_workers)
+    assert list(folders) == [doc_a, doc_c, doc_b]
+
+    folders = iter_folders(root, ignore=[".git"],
+                           descend_into_documents=False,
+                           max_workers=max_workers)
+    assert list(folders) == [doc_a, doc_b]
+
+
+@pytest.mark.parametrize("np", [0, 2])
+def test_iter_documents_from_folders(tmp_config: TemporaryConfiguration,
+                                     np: int) -> None:
+    from papis.utils import iter_documents_from_folders
+
+    folders = []
+    for i in range(40):
+        folder = os.path.join(tmp_config.tmpdir, "lib", f"doc-{i}")
+        os.makedirs(folder)
+        with open(os.path.join(folder, "info.yaml"), "w", encoding="utf-8") as fd:
+            fd.write(f"title: Document {i}\nyear: {2000 + i}\n")
+
+        folders.append(folder)
+
+    # add a broken info file and a folder without any info file
+    with open(os.path.join(folders[3], "info.yaml"), "w", encoding="utf-8") as fd:
+        fd.write("title: [Broken\n")
+    os.remove(os.path.join(folders[5], "info.yaml"))
+
+    # NOTE: use a generator to check that streams are also handled correctly
+    docs = list(iter_documents_from_folders((f for f in folders), np=np))
+    assert [doc.get_main_folder() for doc in docs] == folders
+
+    for i, doc in enumerate(docs):
+        if i in {3, 5}:
+            assert not doc
+        else:
+            assert doc["title"] == f"Document {i}"
+            assert doc["year"] == 2000 + i
+
+
 @pytest.mark.skipif(sys.platform != "linux", reason="uses linux tools")
 def test_general_open_with_spaces(tmp_config: TemporaryConfiguration) -> None:
     suffix = "File with at least a couple of spaces"
@@ -68,6 +127,10 @@ def test_locate_document(tmp_config: TemporaryConfiguration) -> None:
     found_doc = locate_document(doc, docs)
     assert found_doc is not None
 
+    doc = from_data({"doi": "https://doi.org/10.1021/ct5004252"})
+    found_doc = locate_document(doc, docs)
+    assert found_doc is docs[0]
+
     doc = from_data({"doi": "CT5004252"})
     found_doc = locate_document(doc, docs)
     assert found_doc is None
@@ -111,3 +174,24 @@ def test_yaml_unicode_dump(tmp_config: TemporaryConfiguration) -> None:
 
     doc = yaml_to_data(filename)
     assert doc["doi"] == doi
+
+
+def _get_chunk_setting(chunk: list[int]) -> list[str]:
+    import papis.config
+
+    return [f"{papis.config.getstring('test-setting')}-{i}" for i in chunk]
+
+
+@pytest.mark.parametrize("np", [0, 2])
+def test_parmap_iter(tmp_config: TemporaryConfiguration, np: int) -> None:
+    import papis.config
+    from papis.utils import parmap_iter
+
+    # NOTE: settings that are not in the configuration file should also be
+    # available to the worker processes
+    papis.config.set("test-setting", "value")
+
+    chunks = [[3 * i, 3 * i + 1, 3 * i + 2] for i in range(5)]
+    result = list(parmap_iter(_get_chunk_setting, iter(chunks), np=np))
+    assert result == [[f"value-{i}" for i in chunk] for chunk in chunks]
+    assert list(parmap_iter(_get_chunk_setting, [], np=np)) == []